@@ -5,6 +5,8 @@ import dash
 import os
 import time
 from scheduler import initialize_scheduler
+from engine import initialize_engine_follower
+import config
 
 def initialize_data_stream():
     stop_event = Event()
@@ -28,26 +30,31 @@ app = create_dashboard_app()
 
 server = app.server
 
-# Initialize data stream with retry mechanism for production environments
-max_retries = 3
-retry_count = 0
-while retry_count < max_retries:
-    try:
-        stop_event, data_thread = initialize_data_stream()
-        # Check if thread is alive
-        time.sleep(2)
-        if data_thread.is_alive():
-            print("Data stream initialized successfully")
-            break
-        else:
-            print("Data thread failed to start, retrying...")
+if config.PROCESS_ROLE == "dashboard":
+    # Trading runs in the engine process (engine.py); this worker only
+    # mirrors the state it publishes
+    follower_stop_event, follower_thread = initialize_engine_follower()
+else:
+    # Initialize data stream with retry mechanism for production environments
+    max_retries = 3
+    retry_count = 0
+    while retry_count < max_retries:
+        try:
+            stop_event, data_thread = initialize_data_stream()
+            # Check if thread is alive
+            time.sleep(2)
+            if data_thread.is_alive():
+                print("Data stream initialized successfully")
+                break
+            else:
+                print("Data thread failed to start, retrying...")
+                retry_count += 1
+        except Exception as e:
+            print(f"Error initializing data stream: {e}")
             retry_count += 1
-    except Exception as e:
-        print(f"Error initializing data stream: {e}")
-        retry_count += 1
-        time.sleep(2)
+            time.sleep(2)
 
-scheduler = initialize_scheduler()
+    scheduler = initialize_scheduler()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8050))
@@ -0,0 +1,151 @@
+// Browser side of livePush.py. Events from /live/stream are buffered here and
+// applied by a clientside callback on a client-only interval, so the charts
+// grow through extendData and nothing is requested from the server per tick.
+(function () {
+    var state = {
+        source: null,
+        ticks: [],
+        ordersVersion: null,
+        metrics: null,
+        orderbook: null,
+        index: null,
+        pollingStopped: false
+    };
+
+    function connect() {
+        state.source = new EventSource("/live/stream");
+        state.source.addEventListener("ticks", function (event) {
+            state.ticks.push(JSON.parse(event.data));
+        });
+        state.source.addEventListener("orders", function (event) {
+            state.ordersVersion = JSON.parse(event.data).version;
+        });
+        state.source.addEventListener("metrics", function (event) {
+            state.metrics = JSON.parse(event.data);
+        });
+        state.source.addEventListener("orderbook", function (event) {
+            state.orderbook = JSON.parse(event.data);
+        });
+    }
+
+    function component(type, props) {
+        return {type: type, namespace: "dash_html_components", props: props};
+    }
+
+    function orderbookTable(orderbook) {
+        var header = component("Thead", {
+            style: {borderBottom: "2px solid #444"},
+            children: [component("Tr", {
+                children: ["Bid Price", "Bid Liquidity", "Ask Price", "Ask Liquidity"].map(function (title) {
+                    return component("Th", {children: title, style: {padding: "10px", textAlign: "right", width: "25%"}});
+                })
+            })]
+        });
+        var bids = orderbook.bids || [];
+        var asks = orderbook.asks || [];
+        var rows = [];
+        for (var i = 0; i < Math.max(bids.length, asks.length, 1); i++) {
+            var cells = [];
+            [[bids[i], "#00ff00"], [asks[i], "red"]].forEach(function (side) {
+                var level = side[0];
+                if (level) {
+                    var price = parseFloat(level.price);
+                    cells.push(component("Td", {children: isNaN(price) ? "N/A" : price.toFixed(5), style: {padding: "8px", textAlign: "right", color: side[1]}}));
+                    cells.push(component("Td", {children: level.liquidity || "N/A", style: {padding: "8px", textAlign: "right"}}));
+                } else {
+                    cells.push(component("Td", {children: "", style: {padding: "8px"}}));
+                    cells.push(component("Td", {children: "", style: {padding: "8px"}}));
+                }
+            });
+            rows.push(component("Tr", {style: {borderBottom: "1px solid #333"}, children: cells}));
+        }
+        return component("Table", {
+            style: {width: "100%", borderCollapse: "collapse"},
+            children: [header, component("Tbody", {children: rows})]
+        });
+    }
+
+    function markers(x, bid, flags) {
+        var xs = [], ys = [];
+        flags.forEach(function (flag, i) {
+            if (flag) {
+                xs.push(x[i]);
+                ys.push(bid[i]);
+            }
+        });
+        return [xs, ys];
+    }
+
+    function apply(n, chartIndex, maxPoints) {
+        var noUpdate = window.dash_clientside.no_update;
+        if (!state.source) {
+            connect();
+        }
+
+        // Wait for the server to render the initial figures; ticks already in
+        // them are skipped using the chart index they were rendered at
+        if (chartIndex === null || chartIndex === undefined) {
+            return [noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, false];
+        }
+        if (state.index === null) {
+            state.index = chartIndex;
+        }
+
+        var outputs = [noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, state.pollingStopped ? noUpdate : true];
+        state.pollingStopped = true;
+
+        var batches = state.ticks.splice(0).map(function (batch) {
+            var skip = Math.max(0, state.index - batch.first + 1);
+            if (!skip) {
+                return batch;
+            }
+            var sliced = {first: batch.first + skip};
+            Object.keys(batch).forEach(function (key) {
+                if (key !== "first") {
+                    sliced[key] = batch[key].slice(skip);
+                }
+            });
+            return sliced;
+        }).filter(function (batch) { return batch.x.length; });
+
+        if (batches.length) {
+            var column = function (key) {
+                return [].concat.apply([], batches.map(function (batch) { return batch[key]; }));
+            };
+            var last = batches[batches.length - 1];
+            state.index = last.first + last.x.length - 1;
+            var x = column("x"), bid = column("bid");
+            var buy = markers(x, bid, column("buy")), sell = markers(x, bid, column("sell"));
+            var profit = markers(x, bid, column("profit")), stop = markers(x, bid, column("stop"));
+            outputs[0] = [{x: [x, x], y: [bid, column("ask")]}, [0, 1], maxPoints];
+            outputs[1] = [{x: [x], y: [column("spread")]}, [0], maxPoints];
+            outputs[2] = [{
+                x: [x, x, x, buy[0], sell[0], profit[0], stop[0]],
+                y: [bid, column("sma_50"), column("sma_200"), buy[1], sell[1], profit[1], stop[1]]
+            }, [0, 1, 2, 3, 4, 5, 6], maxPoints];
+        }
+
+        if (state.ordersVersion) {
+            outputs[3] = state.ordersVersion;
+            state.ordersVersion = null;
+        }
+
+        if (state.orderbook) {
+            outputs[4] = orderbookTable(state.orderbook);
+            state.orderbook = null;
+        }
+
+        if (state.metrics) {
+            var pnl = state.metrics.total_pnl || 0;
+            outputs[5] = component("Span", {children: "$" + pnl.toFixed(2), style: {color: pnl >= 0 ? "#00ff00" : "red"}});
+            outputs[6] = "$" + state.metrics.buy_avg_price.toFixed(5);
+            outputs[7] = "$" + state.metrics.sell_avg_price.toFixed(5);
+            state.metrics = null;
+        }
+        return outputs;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        livePush: {apply: apply}
+    });
+})();
@@ -0,0 +1,1028 @@
+import sys
+import time
+import datetime
+import numpy as np
+import pandas as pd
+from indicators import IndicatorEngine, calculate_rsi
+from priceBuffer import PriceRingBuffer
+
+def _random_walk(n, seed=42, start=1.08):
+    rng = np.random.default_rng(seed)
+    return start + np.cumsum(rng.normal(0, 0.0001, n))
+
+def check_indicator_parity(n=5000, tolerance=1e-9):
+    prices = _random_walk(n)
+    engine = IndicatorEngine(50, 200, 14)
+    mids = pd.Series(prices)
+    sma_50 = mids.rolling(window=50, min_periods=1).mean()
+    sma_200 = mids.rolling(window=200, min_periods=1).mean()
+    rsi = calculate_rsi(mids, window=14)
+
+    for i, mid in enumerate(prices):
+        snapshot = engine.update(mid)
+        assert abs(snapshot["sma_50"] - sma_50[i]) < tolerance, f"SMA_50 mismatch at {i}"
+        if i + 1 >= 200:
+            assert abs(snapshot["sma_200"] - sma_200[i]) < tolerance, f"SMA_200 mismatch at {i}"
+            assert abs(snapshot["prev_sma_200"] - sma_200[i - 1]) < tolerance, f"previous SMA_200 mismatch at {i}"
+        else:
+            assert snapshot["sma_200"] is None
+        if np.isnan(rsi[i]):
+            assert np.isnan(snapshot["rsi"]), f"RSI should be undefined at {i}"
+        else:
+            assert abs(snapshot["rsi"] - rsi[i]) < 1e-6, f"RSI mismatch at {i}"
+
+    print(f"Indicator parity check passed for {n} ticks")
+
+def benchmark_indicators(ticks=2000):
+    print("Per-tick indicator cost (window = rows kept in memory)")
+    for window in (1000, 10000, 100000):
+        prices = _random_walk(window + ticks)
+
+        engine = IndicatorEngine(50, 200, 14)
+        for mid in prices[:window]:
+            engine.update(mid)
+        start = time.perf_counter()
+        for mid in prices[window:]:
+            engine.update(mid)
+        engine_cost = (time.perf_counter() - start) / ticks
+
+        # Previous implementation: rebuild the DataFrame and recompute every tick
+        rows = [{"Mid": mid} for mid in prices[:window]]
+        sample = min(ticks, 50)
+        start = time.perf_counter()
+        for mid in prices[window:window + sample]:
+            rows.append({"Mid": mid})
+            df = pd.DataFrame(rows[-window:])
+            df["SMA_50"] = df["Mid"].rolling(window=50, min_periods=1).mean()
+            df["SMA_200"] = df["Mid"].rolling(window=200, min_periods=1).mean()
+            df["RSI"] = calculate_rsi(df["Mid"], window=14)
+        dataframe_cost = (time.perf_counter() - start) / sample
+
+        print(f"  window={window:>6}: engine {engine_cost * 1e6:8.2f} us/tick, DataFrame {dataframe_cost * 1e6:10.2f} us/tick")
+
+def benchmark_price_buffer(ticks=200000):
+    prices = _random_walk(ticks)
+    buffer = PriceRingBuffer(86400)
+    start = time.perf_counter()
+    for i, bid in enumerate(prices):
+        buffer.append(i, bid, bid + 0.0002)
+    append_cost = (time.perf_counter() - start) / ticks
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        window = buffer.view(86400)
+    view_cost = (time.perf_counter() - start) / 1000
+    assert window["Bid"].base is not None and window["Bid"][-1] == prices[-1]
+
+    # Previous storage: list of dicts capped with a slice copy
+    rows = []
+    start = time.perf_counter()
+    for i, bid in enumerate(prices):
+        rows.append({"Timestamp": i, "Bid": bid, "Ask": bid + 0.0002, "Mid": bid + 0.0001})
+        if len(rows) > 1000:
+            rows = rows[-1000:]
+    list_cost = (time.perf_counter() - start) / ticks
+
+    print(f"Ring buffer: append {append_cost * 1e6:.2f} us, 86400-row view {view_cost * 1e6:.2f} us, {buffer.nbytes() / 1e6:.1f} MB")
+    print(f"List of dicts capped at 1000 rows: append {list_cost * 1e6:.2f} us")
+
+def benchmark_order_gateway(orders=200, broker_latency=0.05, workers=8):
+    import contextlib
+    import os
+    import config
+    import orderHistory
+    import orderManager
+    from mockBroker import MockBroker
+    from orderGateway import OrderGateway
+    from orderStore import OrderStore
+
+    orderHistory.journal = orderHistory.OrderJournal("/tmp/benchmark_order_history.jsonl")
+    config.orders_history = OrderStore()
+    gateway = OrderGateway(lambda: MockBroker(latency=broker_latency, price_source=lambda instrument, units: 1.08),
+                           orderManager.execute_order, workers=workers)
+    gateway.start()
+
+    # The order workers log every order; keep that out of the report
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            futures = [gateway.submit("BUY", 1.08, 1000, "Benchmark", "EUR_USD") for _ in range(orders)]
+            submit_cost = (time.perf_counter() - start) / orders
+            results = [future.result() for future in futures]
+            total = time.perf_counter() - start
+    finally:
+        gateway.stop()
+
+    latencies = [order["latency_ms"]["filled"] for order in config.orders_history]
+    print(f"Order gateway: submit {submit_cost * 1e6:.1f} us/order (tick loop cost), {orders} orders filled in {total:.2f}s "
+          f"with {workers} workers at {broker_latency * 1000:.0f} ms broker latency (synchronous: {orders * broker_latency:.2f}s)")
+    print(f"  signal-to-fill p50 {np.percentile(latencies, 50):.1f} ms, p99 {np.percentile(latencies, 99):.1f} ms, all filled: {all(results)}")
+
+def benchmark_order_journal(sizes=(10000, 1000000), directory="/tmp"):
+    import json
+    import os
+    from orderHistory import OrderJournal, read_journal
+
+    def make_order(i):
+        return {"order_id": str(i), "type": "BUY" if i % 2 else "SELL", "quantity": 100000, "price": 1.08 + i * 1e-7,
+                "timestamp": "2024-01-02T10:00:00.000000", "instrument": "EUR_USD", "strategy": "Golden Cross"}
+
+    for size in sizes:
+        path = os.path.join(directory, f"benchmark_journal_{size}.jsonl")
+        if os.path.exists(path):
+            os.remove(path)
+        journal = OrderJournal(path)
+        latencies = np.empty(size)
+        for i in range(size):
+            order = make_order(i)
+            start = time.perf_counter()
+            journal.append(order)
+            latencies[i] = time.perf_counter() - start
+        journal.close()
+
+        start = time.perf_counter()
+        loaded = read_journal(path)
+        load_time = time.perf_counter() - start
+        assert len(loaded) == size
+
+        # Previous implementation: rewrite the whole list on every fill, so the
+        # cost of the next write grows with the number of orders already stored
+        orders = [make_order(i) for i in range(size)]
+        legacy_path = os.path.join(directory, "benchmark_order_history.json")
+        start = time.perf_counter()
+        with open(legacy_path, "w") as f:
+            json.dump(orders, f)
+        rewrite_time = time.perf_counter() - start
+
+        print(f"Order journal at {size:>7} orders: append p50 {np.percentile(latencies, 50) * 1e6:.1f} us, "
+              f"p99 {np.percentile(latencies, 99) * 1e6:.1f} us, load {load_time:.2f}s; "
+              f"whole-file rewrite per fill {rewrite_time * 1e3:.1f} ms")
+        os.remove(path)
+        os.remove(legacy_path)
+
+def benchmark_order_store(size=20000):
+    from orderStore import OrderStore
+
+    orders = [{"order_id": str(i), "type": "BUY" if i % 2 else "SELL", "price": 1.08, "quantity": 1000,
+               "timestamp": f"2024-01-02T{10 + i // 3600 % 10:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+               "strategy": "Golden Cross" if i % 3 else "Death Cross"} for i in range(size)]
+
+    store = OrderStore()
+    start = time.perf_counter()
+    for order in orders:
+        store.add(order)
+    store_cost = (time.perf_counter() - start) / size
+
+    # Previous dedupe: scan the whole list for the order_id before appending
+    history = []
+    sample = min(size, 5000)
+    start = time.perf_counter()
+    for order in orders[:sample]:
+        if not any(existing["order_id"] == order["order_id"] for existing in history):
+            history.append(order)
+    scan_cost = (time.perf_counter() - start) / sample
+
+    start = time.perf_counter()
+    window = store.between(datetime.datetime(2024, 1, 2, 11), datetime.datetime(2024, 1, 2, 12), strategy="Golden Cross")
+    range_cost = time.perf_counter() - start
+    print(f"Order store: add with dedupe {store_cost * 1e6:.2f} us/order at {size} orders, "
+          f"list scan {scan_cost * 1e6:.2f} us/order averaged over the first {sample}; "
+          f"1h range query {range_cost * 1e3:.2f} ms ({len(window)} orders)")
+
+def _reference_buy_sell_signal(data):
+    # The original row-by-row loop from predict.py, kept as the parity reference
+    buy_signal = []
+    sell_signal = []
+    open_position = []
+    funds = [100000] * len(data)
+    last_funds = 100000
+    flag = 0
+
+    for i in range(len(data)):
+        if data['SMA50'][i] > data['SMA200'][i]:
+            if flag == 0:
+                flag = 1
+                buy_signal.append(data['Price'][i])
+                last_pos = last_funds / data['Price'][i]
+                funds[i] = last_funds
+                open_position.append(last_pos)
+                sell_signal.append(np.nan)
+            else:
+                buy_signal.append(np.nan)
+                last_funds = data['Price'][i] * last_pos
+                funds[i] = last_funds
+                open_position.append(last_pos)
+                sell_signal.append(np.nan)
+        elif data['SMA50'][i] < data['SMA200'][i]:
+            if flag == 1:
+                flag = 0
+                buy_signal.append(np.nan)
+                last_funds = last_pos * data['Price'][i]
+                funds[i] = last_funds
+                open_position.append(0)
+                sell_signal.append(data['Price'][i])
+            else:
+                buy_signal.append(np.nan)
+                funds[i] = last_funds
+                open_position.append(0)
+                sell_signal.append(np.nan)
+        else:
+            buy_signal.append(np.nan)
+            open_position.append(0)
+            sell_signal.append(np.nan)
+    return buy_signal, sell_signal, open_position, funds, flag
+
+def _signal_frame(prices):
+    close = pd.Series(prices)
+    data = pd.DataFrame()
+    data['Price'] = close
+    data['SMA50'] = close.rolling(window=50).mean()
+    data['SMA200'] = close.rolling(window=200).mean()
+    return data
+
+def check_backtest_parity(sizes=(1300, 20000), seeds=(1, 2, 3)):
+    from predict import buy_sell_signal
+
+    for size in sizes:
+        for seed in seeds:
+            data = _signal_frame(_random_walk(size, seed=seed, start=1.1))
+            # Exact equalities (SMA50 == SMA200) exercise the neutral branch
+            data.loc[data.index[::97], 'SMA50'] = data['SMA200'][::97]
+            expected = _reference_buy_sell_signal(data)
+            actual = buy_sell_signal(data)
+            for name, left, right in zip(("buy", "sell", "open_position", "funds"), expected[:4], actual[:4]):
+                if not np.array_equal(np.asarray(left, dtype=float), np.asarray(right, dtype=float), equal_nan=True):
+                    raise AssertionError(f"Backtest mismatch in {name} for {size} rows, seed {seed}")
+            if expected[4] != actual[4]:
+                raise AssertionError(f"Backtest flag mismatch for {size} rows, seed {seed}")
+    print(f"Backtest parity OK for sizes {sizes}")
+
+def benchmark_backtest(daily_rows=1300, intraday_rows=2000000):
+    from predict import buy_sell_signal, backtest_sma_crossover
+
+    data = _signal_frame(_random_walk(daily_rows, start=1.1))
+    start = time.perf_counter()
+    _reference_buy_sell_signal(data)
+    loop_cost = time.perf_counter() - start
+    start = time.perf_counter()
+    buy_sell_signal(data)
+    vector_cost = time.perf_counter() - start
+    print(f"Backtest on {daily_rows} daily rows: loop {loop_cost * 1e3:.1f} ms, vectorized {vector_cost * 1e3:.2f} ms "
+          f"({loop_cost / vector_cost:.0f}x)")
+
+    prices = _random_walk(intraday_rows, start=1.1)
+    start = time.perf_counter()
+    result = backtest_sma_crossover(prices)
+    elapsed = time.perf_counter() - start
+    print(f"Backtest on {intraday_rows} intraday rows including SMAs: {elapsed:.2f} s, "
+          f"{result['trades']} trades, return {result['return'] * 100:.2f}%")
+
+def benchmark_parameter_sweep(candles=100000, workers=None):
+    from parameterSweep import grid, run_sweep
+
+    prices = _random_walk(candles, start=1.1)
+    combinations = grid(range(10, 60, 10), range(100, 300, 50), [0.0005, 0.001, 0.002], [0.0005, 0.001, 0.002])
+    start = time.perf_counter()
+    results = run_sweep(prices, combinations, workers)
+    elapsed = time.perf_counter() - start
+    best = results[0]
+    print(f"Parameter sweep: {len(results)} combinations over {candles} candles in {elapsed:.2f} s "
+          f"({len(results) / elapsed:.0f}/s); best fast={best['fast']} slow={best['slow']} "
+          f"return {best['return'] * 100:.2f}%")
+
+def benchmark_candle_download(days=7, granularity="S5", latency=0.1):
+    from mockBroker import MockBroker
+    from candleDownloader import download_candles
+
+    for workers in (1, 8):
+        broker = MockBroker(latency=latency)
+        start = time.perf_counter()
+        complete, _ = download_candles("EUR_USD", "2024-01-01", pd.Timestamp("2024-01-01") + pd.Timedelta(days=days),
+                                       granularity, "BA", client=broker, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"Candle download with {workers} workers: {len(complete)} {granularity} candles in "
+              f"{len(broker.requests)} requests, {elapsed:.2f} s ({len(complete) / elapsed:.0f} rows/s)")
+
+def _reference_candle_frame(candles):
+    # The previous get_historical_data conversion: one dict per candle
+    data = []
+    for candle in candles:
+        row = {
+            "time": candle["time"],
+            "volume": candle["volume"],
+            "complete": candle["complete"]
+        }
+        for price_type in ["bid", "ask", "mid"]:
+            if price_type in candle:
+                for key, value in candle[price_type].items():
+                    row[f"{price_type}_{key}"] = float(value)
+        data.append(row)
+    historical_df = pd.DataFrame(data)
+    historical_df["time"] = pd.to_datetime(historical_df["time"])
+    return historical_df
+
+def benchmark_candle_parsing(count=200000, price="BA"):
+    import oandapyV20.endpoints.instruments as instruments
+    from mockBroker import MockBroker
+    from candleStore import candles_frame, parse_candles
+
+    broker = MockBroker()
+    candles = []
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    while len(candles) < count:
+        request = instruments.InstrumentsCandles("EUR_USD", params={
+            "from": start.strftime("%Y-%m-%dT%H:%M:%SZ"), "count": 5000, "granularity": "S5", "price": price})
+        candles.extend(broker.request(request)["candles"])
+        start += pd.Timedelta(seconds=5 * 5000)
+    candles = candles[:count]
+
+    begin = time.perf_counter()
+    expected = _reference_candle_frame(candles)
+    loop_cost = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    complete, incomplete = parse_candles(candles, price)
+    actual = candles_frame(np.concatenate([complete, incomplete]), len(complete))
+    bulk_cost = time.perf_counter() - begin
+
+    for column in expected.columns:
+        if not np.array_equal(expected[column].to_numpy(), actual[column].to_numpy()):
+            raise AssertionError(f"Candle parsing mismatch in {column}")
+    print(f"Candle parsing of {count} S5 candles: row dicts {loop_cost:.2f} s, bulk {bulk_cost:.2f} s "
+          f"({loop_cost / bulk_cost:.1f}x, {count / bulk_cost:.0f} rows/s)")
+
+def _dash_request(app, output_id, inputs, state=()):
+    # Body of the POST the Dash renderer sends for a server-side callback
+    key = next(key for key in app.callback_map if key.strip(".").split("...")[0] == output_id)
+    outputs = [{"id": part.split(".")[0], "property": part.split(".")[1]} for part in key.strip(".").split("...")]
+    return {
+        "output": key,
+        "outputs": outputs,
+        "inputs": [{"id": i, "property": p, "value": v} for i, p, v in inputs],
+        "state": [{"id": i, "property": p, "value": v} for i, p, v in state],
+        "changedPropIds": [f"{inputs[0][0]}.{inputs[0][1]}"],
+    }
+
+def _quote(timestamp, bid):
+    return {"type": "PRICE", "time": timestamp,
+            "bids": [{"price": f"{bid:.5f}", "liquidity": "10000"}],
+            "asks": [{"price": f"{bid + 0.0001:.5f}", "liquidity": "10000"}]}
+
+def _fill_chart_history(priceCharts, ticks, seconds=600):
+    # Ticks spread evenly over the chart window, ending now
+    now = time.time_ns()
+    for i, bid in enumerate(_random_walk(ticks)):
+        priceCharts.add_price(_quote(now - (ticks - i) * seconds * 10**9 // ticks, bid))
+
+def benchmark_live_updates(clients=4, seconds=5, tick_rate=5):
+    # Server CPU per connected browser: 1 s interval polling (three callback
+    # round trips per second) versus the server-sent events channel
+    import threading
+    import config
+    from mockBroker import MockBroker
+    config.client = MockBroker()
+    import dashboard
+    import livePush
+    import priceCharts
+
+    app = dashboard.create_app()
+    history = 10 * 60 * tick_rate
+    _fill_chart_history(priceCharts, history)
+
+    client = app.server.test_client()
+    graphs = _dash_request(app, "live-graph.figure", [("interval-component", "n_intervals", 1)],
+                           [("chart-index", "data", None)])
+    metrics = _dash_request(app, "orderbook-table.children", [("interval-component", "n_intervals", 1)],
+                            [("orderbook-version", "data", None), ("metrics-store", "data", {})])
+    orders = _dash_request(app, "orders-table.data", [("interval-component", "n_intervals", 1), ("orders-table", "page_current", 0),
+                                                      ("orders-table", "page_size", 20), ("orders-pushed", "data", None)],
+                           [("orders-version", "data", None)])
+    # Pages poll with the chart index of their last refresh, so each poll
+    # after the first only extends the charts by the ticks since then
+    index = client.post("/_dash-update-component", json=graphs).get_json()["response"]["chart-index"]["data"]
+    polls = 20
+    start = time.process_time()
+    for _ in range(polls):
+        for bid in _random_walk(tick_rate, seed=index):
+            priceCharts.add_price(_quote(time.time_ns(), bid))
+        graphs["state"][0]["value"] = index
+        response = client.post("/_dash-update-component", json=graphs)
+        index = response.get_json()["response"]["chart-index"]["data"]
+        client.post("/_dash-update-component", json=metrics)
+        client.post("/_dash-update-component", json=orders)
+    poll_cpu = (time.process_time() - start) / polls
+
+    mailboxes = []
+    for _ in range(clients):
+        with app.server.test_request_context("/live/stream"):
+            mailboxes.append(livePush.open_stream())
+    readers = []
+    for client_id, mailbox in mailboxes:
+        stream = livePush.client_stream(client_id, mailbox)
+        reader = threading.Thread(target=lambda stream=stream: [None for _ in stream], daemon=True)
+        reader.start()
+        readers.append(reader)
+
+    publisher_start = livePush.publisher_stats["cpu_seconds"]
+    for i in range(int(seconds * tick_rate)):
+        bid = 1.08 + 0.0001 * np.sin(i / 10)
+        config.market_data.publish(_quote(datetime.datetime.utcnow().isoformat() + "Z", bid))
+        time.sleep(1 / tick_rate)
+    livePush.stop_event.set()
+    for reader in readers:
+        reader.join(2)
+
+    stats = livePush.stats()
+    push_cpu = np.mean([stats["clients"][client_id]["cpu_seconds"] for client_id, _ in mailboxes]) / seconds
+    publisher_cpu = (livePush.publisher_stats["cpu_seconds"] - publisher_start) / seconds
+    print(f"Live updates with {history} ticks of chart history: polling {poll_cpu * 1000:.1f} ms CPU per client per second; "
+          f"push {push_cpu * 1000:.2f} ms per client per second plus {publisher_cpu * 1000:.2f} ms shared publisher "
+          f"({clients} clients, {tick_rate} ticks/s)")
+
+def benchmark_chart_updates(histories=(600, 6000, 60000), ticks_per_refresh=5, refreshes=20):
+    # Payload and server time of one chart refresh: the full figures a page
+    # gets on first load versus the extendData a page that already has the
+    # charts gets, as the tick history in the chart window grows
+    import dash
+    import priceCharts
+
+    app = dash.Dash(__name__)
+    app.layout = priceCharts.create_price_charts_layout()
+    priceCharts.register_callbacks(app)
+    client = app.server.test_client()
+
+    for history in histories:
+        priceCharts.data.clear()
+        priceCharts.columns.clear()
+        priceCharts.feed = priceCharts.ChartFeed()
+        _fill_chart_history(priceCharts, history)
+
+        full = _dash_request(app, "live-graph.figure", [("interval-component", "n_intervals", 1)],
+                             [("chart-index", "data", None)])
+        start = time.perf_counter()
+        response = client.post("/_dash-update-component", json=full)
+        full_time = time.perf_counter() - start
+        full_bytes = len(response.data)
+        index = response.get_json()["response"]["chart-index"]["data"]
+
+        incremental_time = 0.0
+        incremental_bytes = 0
+        for _ in range(refreshes):
+            for bid in _random_walk(ticks_per_refresh, seed=index):
+                priceCharts.add_price(_quote(time.time_ns(), bid))
+            request = _dash_request(app, "live-graph.figure", [("interval-component", "n_intervals", 2)],
+                                    [("chart-index", "data", index)])
+            start = time.perf_counter()
+            response = client.post("/_dash-update-component", json=request)
+            incremental_time += time.perf_counter() - start
+            incremental_bytes += len(response.data)
+            index = response.get_json()["response"]["chart-index"]["data"]
+
+        print(f"{history:>6} ticks: full render {full_bytes / 1024:8.1f} KiB in {full_time * 1000:7.1f} ms, "
+              f"incremental ({ticks_per_refresh} new ticks) {incremental_bytes / refreshes / 1024:5.1f} KiB "
+              f"in {incremental_time / refreshes * 1000:5.1f} ms")
+
+def benchmark_orders_table(sizes=(100, 1000, 10000)):
+    # Bytes per order history refresh: the old path sent the whole order list
+    # to the server and back (plus one row of components per order) every
+    # second; the paged table sends a version and at most one page of rows
+    import json
+    import config
+    from mockBroker import MockBroker
+    from orderStore import OrderStore
+    config.client = MockBroker()
+    import dashboard
+
+    app = dashboard.create_app()
+    client = app.server.test_client()
+    for size in sizes:
+        orders = [{"order_id": str(i), "timestamp": datetime.datetime(2024, 1, 2, 10, 0, i % 60).isoformat(),
+                   "type": "BUY" if i % 2 else "SELL", "quantity": 100000, "price": "1.08000", "strategy": "SMA"}
+                  for i in range(size)]
+        config.orders_history = OrderStore(orders)
+        request = _dash_request(app, "orders-table.data", [("interval-component", "n_intervals", 1), ("orders-table", "page_current", 0),
+                                                           ("orders-table", "page_size", dashboard.ORDERS_PAGE_SIZE), ("orders-pushed", "data", None)],
+                                [("orders-version", "data", None)])
+        first = client.post("/_dash-update-component", json=request)
+        request["state"][0]["value"] = first.get_json()["response"]["orders-version"]["data"]
+        unchanged = client.post("/_dash-update-component", json=request)
+        config.orders_history.add(dict(orders[-1], order_id="new"))
+        start = time.perf_counter()
+        appended = client.post("/_dash-update-component", json=request)
+        elapsed = time.perf_counter() - start
+        full_list = len(json.dumps(orders))
+        print(f"{size:>6} orders: previously >= {2 * full_list / 1024:8.1f} KiB per refresh; now "
+              f"{len(json.dumps(request)) + len(appended.data):6} bytes after a fill ({elapsed * 1000:.1f} ms), "
+              f"{len(json.dumps(request)) + len(unchanged.data)} bytes when unchanged")
+
+def _random_fills(n, seed=3):
+    # Fills of several strategies in multiples of 1000 units, with position
+    # flips, around a random walk
+    rng = np.random.default_rng(seed)
+    prices = _random_walk(n, seed=seed)
+    strategies = ["Golden Cross", "Death Cross", "Profit Booking", "Stop Loss"]
+    return [("BUY" if rng.random() < 0.5 else "SELL", round(float(price), 5), int(rng.integers(1, 8)) * 1000,
+             strategies[int(rng.integers(0, len(strategies)))]) for price in prices]
+
+def _brute_force_pnl(fills, mid, method):
+    # Recomputed from the whole fill list: FIFO matches 1000-unit blocks,
+    # average cost keeps one average entry price; either way realized plus
+    # unrealized must equal the cash flows plus the position at the mid
+    blocks = []
+    realized = 0.0
+    position = 0
+    average = 0.0
+    cash = 0.0
+    for side, price, quantity, _ in fills:
+        sign = 1 if side == "BUY" else -1
+        cash -= sign * price * quantity
+        if method == "fifo":
+            for _ in range(quantity // 1000):
+                if blocks and blocks[0][0] != sign:
+                    direction, entry = blocks.pop(0)
+                    realized += (price - entry) * 1000 * direction
+                else:
+                    blocks.append((sign, price))
+        else:
+            signed = sign * quantity
+            if position == 0 or (position > 0) == (signed > 0):
+                average = (average * abs(position) + price * quantity) / (abs(position) + quantity)
+            else:
+                closed = min(quantity, abs(position))
+                realized += (price - average) * closed * (1 if position > 0 else -1)
+                if quantity > abs(position):
+                    average = price
+            position += signed
+    if method == "fifo":
+        position = sum(direction * 1000 for direction, _ in blocks)
+        unrealized = sum((mid - entry) * 1000 * direction for direction, entry in blocks)
+    else:
+        unrealized = position * (mid - average) if position else 0.0
+    assert abs(realized + unrealized - (cash + position * mid)) < 1e-6, "brute force does not add up"
+    return realized, unrealized, position
+
+def check_ledger_parity(fills=1500, checks=150, tolerance=1e-6):
+    from positionLedger import PositionLedger
+
+    history = _random_fills(fills)
+    for method in ("fifo", "average"):
+        ledger = PositionLedger(method)
+        for i, (side, price, quantity, strategy) in enumerate(history):
+            ledger.apply_fill(side, price, quantity, strategy)
+            if i % (fills // checks) and i != fills - 1:
+                continue
+            mid = price + 0.0003
+            ledger.mark(mid)
+            realized, unrealized, position = _brute_force_pnl(history[:i + 1], mid, method)
+            assert abs(ledger.position - position) < tolerance, f"{method} position mismatch at fill {i}"
+            assert abs(ledger.realized - realized) < tolerance, f"{method} realized mismatch at fill {i}"
+            assert abs(ledger.unrealized() - unrealized) < tolerance, f"{method} unrealized mismatch at fill {i}"
+            breakdown = ledger.strategy_breakdown()
+            assert abs(sum(row["realized_pnl"] for row in breakdown.values()) - realized) < tolerance, \
+                f"{method} per-strategy realized mismatch at fill {i}"
+            assert abs(sum(row["unrealized_pnl"] for row in breakdown.values()) - unrealized) < tolerance, \
+                f"{method} per-strategy unrealized mismatch at fill {i}"
+            restored = PositionLedger().restore(ledger.to_dict())
+            restored.mark(mid)
+            assert abs(restored.realized - realized) < tolerance and abs(restored.unrealized() - unrealized) < tolerance, \
+                f"{method} snapshot restore mismatch at fill {i}"
+    print(f"Ledger parity check passed for {fills} fills (FIFO and average cost, per strategy, snapshot restore)")
+
+def benchmark_ledger(fills=(1000, 10000)):
+    from positionLedger import PositionLedger
+
+    for count in fills:
+        history = _random_fills(count)
+        ledger = PositionLedger("fifo")
+        start = time.perf_counter()
+        for side, price, quantity, strategy in history:
+            ledger.apply_fill(side, price, quantity, strategy)
+            ledger.mark(price)
+            ledger.unrealized()
+        incremental = (time.perf_counter() - start) / count
+
+        # Recomputing from the history on every fill, as the metrics did
+        # before the ledger; sampled, it grows with the history
+        sample = history[-20:]
+        start = time.perf_counter()
+        for i in range(len(sample)):
+            _brute_force_pnl(history[:count - len(sample) + i + 1], sample[i][1], "fifo")
+        recompute = (time.perf_counter() - start) / len(sample)
+        print(f"Ledger at {count:>6} fills: {incremental * 1e6:.2f} us/fill incremental, "
+              f"{recompute * 1e3:.2f} ms/fill recomputed from the history")
+
+def benchmark_shared_state(capacity=100000, batches=2000, batch_size=10):
+    # Cost of the engine publishing a batch of chart rows plus metrics, and of
+    # a dashboard worker following it (snapshot and new rows) through its own
+    # mapping of the segment
+    from multiprocessing import shared_memory
+    from sharedState import SharedState, ROW_DTYPE
+    from metricsManager import empty_metrics
+
+    writer = SharedState.create("tradepulse-benchmark", capacity)
+    # SharedState.attach is for other processes; it unregisters the segment
+    # from this process's resource tracker, which the writer still needs
+    reader = SharedState(shared_memory.SharedMemory(name="tradepulse-benchmark"), owner=False)
+    try:
+        rows = {name: np.zeros(batch_size, dtype=ROW_DTYPE[name]) for name in ROW_DTYPE.names}
+        metrics = empty_metrics()
+        orderbook = {"bids": [{"price": "1.08000", "liquidity": "10000"}] * 4,
+                     "asks": [{"price": "1.08010", "liquidity": "10000"}] * 4, "time": "2024-01-02T10:00:00Z"}
+        index = 0
+        publish_time = follow_time = 0.0
+        for batch in range(batches):
+            rows["Timestamp"][:] = np.arange(index, index + batch_size)
+            start = time.perf_counter()
+            index += batch_size
+            writer.append_rows(rows, index)
+            writer.publish(metrics, [1, batch], orderbook)
+            publish_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            snapshot = reader.snapshot()
+            received, received_index = reader.rows_since(index - batch_size)
+            follow_time += time.perf_counter() - start
+            assert received_index == index and received["Timestamp"][-1] == index - 1
+            assert snapshot["orders_version"] == [1, batch]
+        print(f"Shared state, {batch_size} ticks per batch: publish {publish_time / batches * 1e6:.1f} us, "
+              f"follow {follow_time / batches * 1e6:.1f} us per batch ({capacity} row ring, "
+              f"{SharedState.size(capacity) / 1e6:.1f} MB)")
+    finally:
+        reader.close()
+        writer.close()
+
+def benchmark_lock_contention(ticks=20000, readers=8):
+    # Tick path wait on config.data_lock while page callbacks run: readers
+    # that take the lock to read engine state (how callbacks used to read)
+    # versus readers that take the latest snapshot
+    import threading
+    import config
+    import dataStream
+    from snapshots import TimedLock
+
+    prices = [dataStream.make_placeholder_price(round(bid, 5), round(bid + 0.0001, 5)) for bid in _random_walk(ticks)]
+
+    def locked_reader(stop):
+        while not stop.is_set():
+            with config.data_lock:
+                pd.DataFrame(config.price_data.view(600))
+                dict(config.trading_metrics)
+
+    def snapshot_reader(stop):
+        while not stop.is_set():
+            snapshot = config.snapshots.latest()
+            pd.DataFrame(config.price_data.view(600))
+            dict(snapshot["metrics"])
+
+    for name, reader in (("locked reads", locked_reader), ("snapshot reads", snapshot_reader)):
+        config.data_lock = TimedLock("data_lock")
+        config.price_data.clear()
+        config.indicator_engine.reset()
+        stop = threading.Event()
+        threads = [threading.Thread(target=reader, args=(stop,), daemon=True) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        writer = threading.Thread(target=lambda: [dataStream.process_price(price, None) for price in prices], name="tick-path")
+        start = time.perf_counter()
+        writer.start()
+        writer.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        tick_path = config.data_lock.stats()["threads"]["tick-path"]
+        print(f"{name:>14} ({readers} readers): {ticks / elapsed:8.0f} ticks/s, tick path waited on the lock "
+              f"{tick_path['contended']} times, {tick_path['wait_seconds'] * 1000:.1f} ms total, "
+              f"max {tick_path['max_wait_ms']:.2f} ms")
+
+def benchmark_channels(ticks=100000, ticks_per_read=50):
+    # A producer putting an orderbook every tick and a dashboard reading once
+    # a second: memory held and staleness of what the reader sees, for the
+    # unbounded queue used before and the latest-value channel
+    from queue import Queue
+    from marketData import LatestValueChannel
+
+    books = [{"bids": [{"price": f"{bid:.5f}", "liquidity": "10000"}], "asks": [{"price": f"{bid + 0.0001:.5f}", "liquidity": "10000"}],
+              "timestamp": i} for i, bid in enumerate(_random_walk(ticks))]
+
+    queue = Queue()
+    stale = []
+    for i, book in enumerate(books):
+        queue.put(book)
+        if i % ticks_per_read == ticks_per_read - 1:
+            stale.append(i - queue.get()["timestamp"])
+    print(f"Queue:   depth {queue.qsize()} after {ticks} ticks, reader {np.mean(stale):.0f} ticks behind on average "
+          f"({stale[-1]} at the end)")
+
+    channel = LatestValueChannel("orderbook")
+    stale = []
+    start = time.perf_counter()
+    for i, book in enumerate(books):
+        channel.put(book)
+        if i % ticks_per_read == ticks_per_read - 1:
+            stale.append(i - channel.latest()[0]["timestamp"])
+    elapsed = time.perf_counter() - start
+    stats = channel.stats()
+    print(f"Channel: depth {stats['depth']} after {ticks} ticks, reader {np.mean(stale):.0f} ticks behind on average, "
+          f"{stats['overwritten']} values conflated, {elapsed / ticks * 1e6:.2f} us per put")
+
+def benchmark_multi_instrument(instruments=8, ticks=20000, workers=(1, 2, 4)):
+    # Interleaved quotes for several instruments pushed through the sharded
+    # engine as fast as possible; orders are recorded instead of sent, and
+    # must match each instrument's strategy run on its own
+    import os
+    from multiInstrument import MultiInstrumentEngine, InstrumentState
+    from replayServer import interleave_ticks, oanda_time
+
+    names = [f"SYN_{i}" for i in range(instruments)]
+    timestamp = oanda_time()
+    quotes = [dict(tick, time=timestamp) for tick in interleave_ticks(ticks, names)]
+
+    states = {name: InstrumentState(name) for name in names}
+    expected = []
+    start = time.perf_counter()
+    for quote in quotes:
+        intents = states[quote["instrument"]].on_quote(timestamp, float(quote["bids"][0]["price"]),
+                                                       float(quote["asks"][0]["price"]), time.perf_counter())
+        expected.extend((quote["instrument"], order_type, strategy) for order_type, _, _, strategy in intents)
+    elapsed = time.perf_counter() - start
+    print(f"In process: {len(quotes)} quotes for {instruments} instruments at {len(quotes) / elapsed:,.0f} ticks/s "
+          f"({os.cpu_count()} CPUs)")
+
+    for count in workers:
+        placed = []
+        engine = MultiInstrumentEngine(names, count, report_interval=0,
+                                       place_order=lambda order_type, price, quantity, strategy, callback, instrument:
+                                       placed.append((instrument, order_type, strategy)))
+        engine.start()
+        start = time.perf_counter()
+        for quote in quotes:
+            engine.on_price(quote)
+        engine.stop()
+        elapsed = time.perf_counter() - start
+        assert sorted(placed) == sorted(expected), f"orders differ with {count} workers"
+        latencies = [engine.stats[name]["latency_p99_ms"] for name in names]
+        print(f"{count} workers: {len(quotes) / elapsed:,.0f} ticks/s, {len(placed)} orders, "
+              f"worst instrument p99 latency {max(latencies):.1f} ms")
+
+def benchmark_tick_recorder(ticks=200000, directory="/tmp/tick_benchmark"):
+    # Cost the recorder adds to publishing a quote on the tick path, how fast
+    # the background writer keeps up, and reading a time range back
+    import shutil
+    from threading import Event
+    from marketData import MarketDataHub
+    import config
+    import tickRecorder
+    from replayServer import generate_ticks
+
+    shutil.rmtree(directory, ignore_errors=True)
+    start_ns = int(np.datetime64("2024-01-02T23:00:00", "ns").astype(np.int64))
+    quotes = [dict(tick, time=str(np.datetime64(start_ns + i * 50000000, "ns")) + "Z")
+              for i, tick in enumerate(generate_ticks(ticks))]
+
+    config.market_data = MarketDataHub()
+    config.market_data.subscribe("strategy", maxsize=ticks)
+    start = time.perf_counter()
+    for quote in quotes:
+        config.market_data.publish(quote)
+    without = (time.perf_counter() - start) / ticks * 1e6
+    config.market_data = MarketDataHub()
+    config.market_data.subscribe("strategy", maxsize=ticks)
+
+    # The hand-off to the recorder is all the tick path pays (publish_price
+    # records, then publishes); the writer only wakes up every write interval
+    recorder = tickRecorder.TickRecorder(directory, write_interval=0.05)
+    stop_event = Event()
+    thread = recorder.start(stop_event)
+    start = time.perf_counter()
+    for quote in quotes:
+        recorder.record(quote)
+        config.market_data.publish(quote)
+    with_recorder = (time.perf_counter() - start) / ticks * 1e6
+    while recorder.records + recorder.skipped < ticks:
+        time.sleep(0.01)
+    drained = time.perf_counter() - start
+    stop_event.set()
+    thread.join()
+    stats = recorder.stats()
+    print(f"Publish per tick: {without:.2f} us without the recorder, {with_recorder:.2f} us with it "
+          f"(writer running, {stats['dropped']} dropped)")
+    print(f"Writer: {stats['records']} records, {stats['bytes'] / 2**20:.1f} MiB in {stats['batches']} batches, "
+          f"{stats['write_ms_per_batch']:.2f} ms per batch, {ticks / drained:,.0f} ticks/s end to end")
+
+    start = time.perf_counter()
+    window = tickRecorder.read_range("EUR_USD", "2024-01-02T23:30:00Z", "2024-01-03T00:30:00Z", directory)
+    elapsed = time.perf_counter() - start
+    expected = [quote for quote in quotes if "2024-01-02T23:30" <= quote["time"] < "2024-01-03T00:30"]
+    rows = np.concatenate(window)
+    assert len(rows) == len(expected) and np.allclose(rows["bid"], [float(q["bids"][0]["price"]) for q in expected])
+    print(f"Read 1 hour across the day boundary: {len(rows)} ticks in {len(window)} memory-mapped views, "
+          f"{elapsed * 1000:.2f} ms")
+
+def _reference_trading_decisions(indicators, bid_price, ask_price, metrics, exits_in_flight, quantities):
+    # The hard-coded exits and SMA 50/200 crossover the registry replaced
+    current_price = indicators["mid"]
+    if not exits_in_flight and metrics["buy_avg_price"] > 0 and metrics["total_buy_quantity"] > metrics["total_sell_quantity"]:
+        if current_price >= metrics["buy_avg_price"] + quantities["profit_pips"]:
+            return [("SELL", bid_price, quantities["exit"], "Profit Booking")]
+        if current_price <= metrics["buy_avg_price"] - quantities["loss_pips"]:
+            return [("SELL", bid_price, quantities["exit"], "Stop Loss")]
+
+    intents = []
+    if indicators["count"] > 1 and indicators["prev_sma_200"] is not None and indicators["sma_200"] is not None:
+        if indicators["prev_sma_50"] < indicators["prev_sma_200"] and indicators["sma_50"] > indicators["sma_200"]:
+            intents.append(("BUY", ask_price, quantities["signal"], "Golden Cross"))
+        elif indicators["prev_sma_50"] > indicators["prev_sma_200"] and indicators["sma_50"] < indicators["sma_200"]:
+            intents.append(("SELL", bid_price, quantities["signal"], "Death Cross"))
+    return intents
+
+def check_strategy_parity(ticks=50000, seed=5):
+    import config
+    from strategies import StrategyRegistry, ProfitStopStrategy, CrossoverStrategy
+
+    registry = StrategyRegistry()
+    registry.register(ProfitStopStrategy())
+    registry.register(CrossoverStrategy(config.SMA_50_WINDOW, config.SMA_200_WINDOW,
+                                        buy_name="Golden Cross", sell_name="Death Cross"))
+    engine = registry.attach(IndicatorEngine(config.SMA_50_WINDOW, config.SMA_200_WINDOW, config.RSI_WINDOW))
+    quantities = {"profit_pips": config.PROFIT_THRESHOLD_PIPS, "loss_pips": config.LOSS_THRESHOLD_PIPS,
+                  "exit": config.PROFIT_BOOKING_QUANTITY, "signal": config.STRONG_SIGNAL_QUANTITY}
+
+    rng = np.random.default_rng(seed)
+    signals = 0
+    for i, mid in enumerate(_random_walk(ticks, seed=seed).tolist()):
+        indicators = engine.update(mid)
+        # Synthetic positions around the current price, so both exits and
+        # the in-flight guard are exercised alongside the crossovers
+        bought = int(rng.integers(0, 4)) * 100000
+        metrics = {"buy_avg_price": mid + float(rng.normal(0, 0.003)) if bought else 0.0,
+                   "total_buy_quantity": bought, "total_sell_quantity": int(rng.integers(0, 3)) * 100000}
+        exits_in_flight = int(rng.random() < 0.2)
+        bid, ask = mid - 0.0001, mid + 0.0001
+
+        expected = _reference_trading_decisions(indicators, bid, ask, metrics, exits_in_flight, quantities)
+        actual = registry.evaluate(indicators, bid, ask, metrics, exits_in_flight)
+        assert actual == expected, f"strategy intents differ at tick {i}: {actual} != {expected}"
+        signals += len(actual)
+    print(f"Strategy parity check passed for {ticks} ticks ({signals} intents)")
+
+def benchmark_strategies(ticks=20000, crossovers=50):
+    # Per-tick cost of evaluating many strategies: the registry computes each
+    # indicator once and every strategy reads the same snapshot, against each
+    # strategy keeping its own indicators
+    import config
+    from strategies import StrategyRegistry, ProfitStopStrategy, CrossoverStrategy
+
+    prices = _random_walk(ticks).tolist()
+    metrics = {"buy_avg_price": 0.0, "total_buy_quantity": 0, "total_sell_quantity": 0}
+    # Overlapping windows, as a parameter grid would have (50/200 is a default)
+    pairs = [(fast, slow) for fast in (5, 10, 20, 30, 50) for slow in (60, 100, 150, 250, 300, 400, 500, 600, 800, 1000)]
+    pairs = pairs[:crossovers]
+
+    def run(registry, engines):
+        start = time.perf_counter()
+        intents = 0
+        for mid in prices:
+            for engine in engines:
+                indicators = engine.update(mid)
+            intents += len(registry.evaluate(indicators, mid - 0.0001, mid + 0.0001, metrics, 0))
+        return (time.perf_counter() - start) / ticks, intents
+
+    def default_registry():
+        registry = StrategyRegistry()
+        registry.register(ProfitStopStrategy())
+        registry.register(CrossoverStrategy(config.SMA_50_WINDOW, config.SMA_200_WINDOW,
+                                            buy_name="Golden Cross", sell_name="Death Cross"))
+        return registry
+
+    registry = default_registry()
+    engine = registry.attach(IndicatorEngine())
+    cost, intents = run(registry, [engine])
+    print(f"Default strategies: {cost * 1e6:.2f} us/tick, {intents} intents")
+
+    registry = default_registry()
+    engine = registry.attach(IndicatorEngine())
+    for fast, slow in pairs:
+        registry.register(CrossoverStrategy(fast, slow))
+    cost, shared_intents = run(registry, [engine])
+    print(f"{len(pairs)} more crossovers, shared indicators ({len(engine.extra)} rolling means): "
+          f"{cost * 1e6:.2f} us/tick, {shared_intents} intents")
+
+    # Each strategy with its own engine, as when every strategy computed its
+    # own indicators: the shared windows are recomputed for each reader
+    strategies = [CrossoverStrategy(config.SMA_50_WINDOW, config.SMA_200_WINDOW)]
+    strategies += [CrossoverStrategy(fast, slow) for fast, slow in pairs]
+    owned = []
+    for strategy in strategies:
+        own = IndicatorEngine()
+        for kind, window in strategy.indicators:
+            own.add(kind, window)
+        owned.append((strategy, own))
+    start = time.perf_counter()
+    own_intents = 0
+    for mid in prices:
+        for strategy, own in owned:
+            tick = {"indicators": own.update(mid), "bid": mid - 0.0001, "ask": mid + 0.0001,
+                    "metrics": metrics, "exits_in_flight": 0}
+            own_intents += len(strategy.evaluate(tick))
+    cost = (time.perf_counter() - start) / ticks
+    print(f"{len(pairs)} more crossovers, indicators per strategy: {cost * 1e6:.2f} us/tick, {own_intents} intents")
+    assert own_intents == shared_intents, "shared and per-strategy indicators disagree"
+
+def benchmark_replay(ticks=50000):
+    # Regression benchmark for the live tick path: the same process_price,
+    # strategy, order gateway and journal code as live, at maximum speed
+    from replay import run_replay, with_times, print_report
+    from replayServer import generate_ticks
+
+    print_report(run_replay(with_times(generate_ticks(ticks))))
+
+def benchmark_simulator(seconds=5, port=8095):
+    # The whole engine (pricing stream, strategy, orders over HTTP) against
+    # the local OANDA simulator at increasing tick rates, the last one with
+    # response latency, injected 503s and a rate limit
+    import contextlib
+    import io
+    import os
+    import tempfile
+    from threading import Event, Thread
+    import oandapyV20
+    import config
+    import dataStream
+    import orderManager
+    import priceStream
+    from marketData import MarketDataHub
+    from oandaSimulator import start_simulator, stop_simulator
+    from replay import isolate, reset_engine
+    from replayServer import generate_ticks
+
+    url = f"http://127.0.0.1:{port}"
+    oandapyV20.oandapyV20.TRADING_ENVIRONMENTS["simulator"] = {"api": url, "stream": url}
+    config.environment = "simulator"
+    config.account_id = "simulator"
+    config.client = oandapyV20.API(access_token="simulator", environment="simulator")
+    config.TICK_RECORD_DIR = ""
+    config.PRICE_SOURCE = "stream"
+    isolate(tempfile.mkdtemp(prefix="simulator-"))
+
+    scenarios = [
+        {"rate": 100},
+        {"rate": 500},
+        {"rate": 500, "latency": 0.02, "error_rate": 0.05, "rate_limit": 50},
+    ]
+    for scenario in scenarios:
+        reset_engine()
+        config.market_data = MarketDataHub()
+        stream_stats = priceStream.StreamStats(report_interval=0)
+        priceStream.stats = dataStream.ingestion_stats = stream_stats
+        orderManager.gateway = orderManager.OrderGateway(orderManager.create_order_client, orderManager.execute_order)
+        dataStream.order_gateway = orderManager.gateway
+
+        server = start_simulator(generate_ticks(100000, seed=11), port=port, seed=1, **scenario)
+        stop_event = Event()
+        with contextlib.redirect_stdout(io.StringIO()):
+            thread = Thread(target=dataStream.stream_data, args=(stop_event,), daemon=True)
+            thread.start()
+            time.sleep(seconds)
+            stop_event.set()
+            thread.join(5)
+            orderManager.gateway.stop()
+        simulated = server.summary()
+        stop_simulator(server)
+
+        summary = stream_stats.summary()
+        orders = orderManager.gateway.stats()
+        print(f"{scenario}: {summary['ticks'] / seconds:.0f} ticks/s processed of {simulated['ticks_per_second']:.0f} simulated, "
+              f"decision p50 {summary['decision_latency_p50_ms']:.2f} ms p99 {summary['decision_latency_p99_ms']:.2f} ms, "
+              f"{summary['reconnects']} reconnects, orders {orders['completed']} done {orders['failed']} failed, "
+              f"{simulated.get('injected_errors', 0)} injected errors, {simulated.get('rate_limited', 0)} rate limited")
+
+BENCHMARKS = {
+    "indicators": lambda: (check_indicator_parity(), benchmark_indicators()),
+    "price_buffer": benchmark_price_buffer,
+    "orders": benchmark_order_gateway,
+    "journal": benchmark_order_journal,
+    "order_store": benchmark_order_store,
+    "ledger": lambda: (check_ledger_parity(), benchmark_ledger()),
+    "backtest": lambda: (check_backtest_parity(), benchmark_backtest()),
+    "sweep": benchmark_parameter_sweep,
+    "candle_download": benchmark_candle_download,
+    "candle_parsing": benchmark_candle_parsing,
+    "live_updates": benchmark_live_updates,
+    "chart_updates": benchmark_chart_updates,
+    "orders_table": benchmark_orders_table,
+    "shared_state": benchmark_shared_state,
+    "locks": benchmark_lock_contention,
+    "channels": benchmark_channels,
+    "multi_instrument": benchmark_multi_instrument,
+    "tick_recorder": benchmark_tick_recorder,
+    "strategies": lambda: (check_strategy_parity(), benchmark_strategies()),
+    "replay": benchmark_replay,
+    "simulator": benchmark_simulator,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
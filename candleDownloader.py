@@ -0,0 +1,102 @@
+import threading
+import time
+import numpy as np
+import oandapyV20
+from concurrent.futures import ThreadPoolExecutor
+import config
+from candleStore import GRANULARITY_SECONDS, candle_dtype, fetch_candles, merge, to_ns
+
+# OANDA returns at most 5000 candles per request and allows about 100
+# requests per second per connection; stay well below both by default
+MAX_CANDLES_PER_REQUEST = 5000
+DOWNLOAD_WORKERS = 4
+REQUESTS_PER_SECOND = 20
+RETRIES = 3
+
+class TokenBucket:
+    # Allows bursts of up to `capacity` requests and `rate` requests per
+    # second on average; acquire() blocks until a token is available
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def split_range(start_ns, end_ns, granularity, max_candles=MAX_CANDLES_PER_REQUEST):
+    span = GRANULARITY_SECONDS[granularity] * 10**9 * max_candles
+    chunks = []
+    chunk_start = start_ns
+    while chunk_start < end_ns:
+        chunk_end = min(chunk_start + span, end_ns)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    return chunks
+
+def download_candles(instrument, start, end=None, granularity="D", price="B", client=None,
+                     workers=DOWNLOAD_WORKERS, rate=REQUESTS_PER_SECOND, max_candles=MAX_CANDLES_PER_REQUEST):
+    # Splits [start, end) into requests of at most max_candles candles, fetches
+    # them on a bounded thread pool behind a shared rate limiter and stitches
+    # the chunks into one sorted, deduplicated array. Returns
+    # (complete candles, incomplete candles) like candleStore.fetch_candles.
+    start_ns = to_ns(start)
+    end_ns = to_ns(end) if end is not None else time.time_ns()
+    chunks = split_range(start_ns, end_ns, granularity, max_candles)
+    if end is None and chunks:
+        # OANDA rejects a "to" in the future, so leave the last chunk open
+        chunks[-1] = (chunks[-1][0], None)
+    limiter = TokenBucket(rate) if rate else None
+    local = threading.local()
+
+    def request_client():
+        if client is not None:
+            return client
+        # A stand-in swapped into config (e.g. MockBroker) is used as is
+        if not isinstance(config.client, oandapyV20.API):
+            return config.client
+        # oandapyV20.API wraps a requests.Session, so give each worker its own
+        if not hasattr(local, "client"):
+            local.client = oandapyV20.API(access_token=config.access_token, environment=config.environment)
+        return local.client
+
+    def fetch(chunk):
+        for attempt in range(RETRIES):
+            if limiter:
+                limiter.acquire()
+            try:
+                return fetch_candles(instrument, chunk[0], chunk[1], granularity, price, request_client())
+            except Exception as e:
+                if attempt == RETRIES - 1:
+                    raise
+                print(f"Error fetching {instrument} {granularity} candles, retrying: {e}")
+                time.sleep(0.5 * 2 ** attempt)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+        results = list(executor.map(fetch, chunks))
+
+    completes = [complete for complete, _ in results if len(complete)]
+    incompletes = [incomplete for _, incomplete in results if len(incomplete)]
+    complete = merge(*completes) if completes else np.empty(0, dtype=candle_dtype(price))
+    incomplete = merge(*incompletes) if incompletes else np.empty(0, dtype=complete.dtype)
+    if len(complete) and len(incomplete):
+        incomplete = incomplete[incomplete["time"] > complete["time"][-1]]
+
+    elapsed = time.perf_counter() - started
+    rows = len(complete) + len(incomplete)
+    if len(chunks) > 1:
+        print(f"Downloaded {rows} {instrument} {granularity} candles in {len(chunks)} requests "
+              f"in {elapsed:.2f} s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+    return complete, incomplete
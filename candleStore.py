@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import time
+from itertools import chain
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+from oandapyV20.endpoints.instruments import InstrumentsCandles
+import config
+
+PRICE_COMPONENTS = {"B": "bid", "A": "ask", "M": "mid"}
+OHLC = ("o", "h", "l", "c")
+
+GRANULARITY_SECONDS = {
+    "S5": 5, "S10": 10, "S15": 15, "S30": 30,
+    "M1": 60, "M2": 120, "M4": 240, "M5": 300, "M10": 600, "M15": 900, "M30": 1800,
+    "H1": 3600, "H2": 7200, "H3": 10800, "H4": 14400, "H6": 21600, "H8": 28800, "H12": 43200,
+    "D": 86400, "W": 604800, "M": 2678400,
+}
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+def candle_dtype(price):
+    fields = [("time", "i8"), ("volume", "i8")]
+    for letter in price:
+        fields.extend((f"{PRICE_COMPONENTS[letter]}_{key}", "f8") for key in OHLC)
+    return np.dtype(fields)
+
+def cache_path(instrument, granularity, price, directory=None):
+    return os.path.join(directory or config.CANDLE_CACHE_DIR, f"{instrument}_{granularity}_{price}.npy")
+
+def _lock(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+def to_ns(value):
+    # Dates without a timezone are UTC, as OANDA interprets them
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.value
+
+def to_rfc3339(ns):
+    return pd.Timestamp(ns, tz="UTC").strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def load_cached(instrument, granularity, price, directory=None):
+    # Memory-mapped, so reading a slice of years of candles only touches the
+    # pages it needs
+    path = cache_path(instrument, granularity, price, directory)
+    if not os.path.exists(path):
+        return np.empty(0, dtype=candle_dtype(price))
+    return np.load(path, mmap_mode="r")
+
+def save_cached(candles, instrument, granularity, price, directory=None):
+    path = cache_path(instrument, granularity, price, directory)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary_file = path + ".tmp"
+    with open(temporary_file, "wb") as f:
+        np.save(f, np.ascontiguousarray(candles))
+    os.replace(temporary_file, path)
+
+def load_coverage(instrument, granularity, price, directory=None):
+    # The time range already requested from OANDA, which can extend past the
+    # first and last stored candle (weekends, holidays, a start date between
+    # two candles)
+    try:
+        with open(cache_path(instrument, granularity, price, directory) + ".json", "r") as f:
+            coverage = json.load(f)
+        return coverage["from"], coverage["to"]
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+def save_coverage(covered_from, covered_to, instrument, granularity, price, directory=None):
+    path = cache_path(instrument, granularity, price, directory) + ".json"
+    with open(path + ".tmp", "w") as f:
+        json.dump({"from": covered_from, "to": covered_to}, f)
+    os.replace(path + ".tmp", path)
+
+def parse_times(times):
+    # RFC3339 with nanoseconds, e.g. 2024-01-02T22:00:00.000000000Z; numpy
+    # parses the ISO part in C once the trailing Z is dropped
+    return np.array([value[:-1] if value[-1] == "Z" else value for value in times], dtype="datetime64[ns]").view("i8")
+
+def parse_candles(candles, price):
+    # Fills the columns of a preallocated structured array straight from the
+    # response, one pass per column, without building a dict per row.
+    # Returns (complete candles, incomplete candles).
+    records = np.empty(len(candles), dtype=candle_dtype(price))
+    if not candles:
+        return records, records
+    count = len(candles)
+    records["time"] = parse_times(list(map(itemgetter("time"), candles)))
+    records["volume"] = np.fromiter(map(itemgetter("volume"), candles), dtype=np.int64, count=count)
+    complete = np.fromiter(map(itemgetter("complete"), candles), dtype=bool, count=count)
+    ohlc = itemgetter(*OHLC)
+    for letter in price:
+        component = PRICE_COMPONENTS[letter]
+        values = np.array(list(chain.from_iterable(map(ohlc, map(itemgetter(component), candles)))), dtype=np.float64)
+        values = values.reshape(count, len(OHLC))
+        for column, key in enumerate(OHLC):
+            records[f"{component}_{key}"] = values[:, column]
+    return records[complete], records[~complete]
+
+def fetch_candles(instrument, start, end, granularity, price, client=None):
+    params = {
+        "from": to_rfc3339(start),
+        "granularity": granularity,
+        "price": price
+    }
+    if end is not None:
+        params["to"] = to_rfc3339(end)
+    else:
+        params["count"] = 5000
+    r = InstrumentsCandles(instrument=instrument, params=params)
+    response = (client or config.client).request(r)
+    return parse_candles(response.get("candles", []), price)
+
+def merge(*arrays):
+    merged = np.concatenate(arrays)
+    _, first = np.unique(merged["time"][::-1], return_index=True)
+    # np.unique keeps the first occurrence, so reversing lets later arrays win
+    return merged[::-1][first]
+
+def _covered_until(complete, incomplete, end_ns, previous, step):
+    # Everything before a still-forming candle is final; without one the
+    # whole requested range is, unless it was open-ended
+    if len(incomplete):
+        return int(incomplete["time"][0])
+    if end_ns is not None:
+        # A range reaching into the future is only final up to now
+        return min(end_ns, time.time_ns())
+    if len(complete):
+        return int(complete["time"][-1]) + step
+    return previous
+
+def get_candles(instrument, start, end=None, granularity="D", price="B", client=None, directory=None):
+    # Complete candles are persisted per instrument/granularity/price and
+    # never fetched again; only the part of [start, end) not covered by the
+    # cache is requested. Incomplete candles are returned but not stored, so
+    # the still-forming candle is fetched again on the next call.
+    # Imported here because the downloader builds on this module
+    from candleDownloader import download_candles
+
+    start_ns = to_ns(start)
+    end_ns = to_ns(end) if end is not None else None
+    step = GRANULARITY_SECONDS.get(granularity, 86400) * 10**9
+
+    with _lock(cache_path(instrument, granularity, price, directory)):
+        cached = load_cached(instrument, granularity, price, directory)
+        covered_from, covered_to = load_coverage(instrument, granularity, price, directory)
+        if len(cached) == 0:
+            covered_from = covered_to = None
+        elif covered_from is None:
+            covered_from, covered_to = int(cached["time"][0]), int(cached["time"][-1]) + step
+
+        fetched = []
+        incomplete = np.empty(0, dtype=cached.dtype)
+        try:
+            if covered_from is None:
+                complete, incomplete = download_candles(instrument, start_ns, end_ns, granularity, price, client)
+                fetched.append(complete)
+                covered_from, covered_to = start_ns, _covered_until(complete, incomplete, end_ns, start_ns, step)
+            else:
+                if start_ns < covered_from:
+                    complete, _ = download_candles(instrument, start_ns, covered_from, granularity, price, client)
+                    fetched.append(complete)
+                    covered_from = start_ns
+                if end_ns is None or end_ns > covered_to:
+                    complete, incomplete = download_candles(instrument, covered_to, end_ns, granularity, price, client)
+                    fetched.append(complete)
+                    covered_to = _covered_until(complete, incomplete, end_ns, covered_to, step)
+        except Exception as e:
+            # Serve whatever is cached when OANDA is unreachable
+            print(f"Error fetching candles for {instrument} {granularity}: {e}")
+
+        fetched = [candles for candles in fetched if len(candles)]
+        if fetched:
+            cached = merge(np.asarray(cached), *fetched)
+            save_cached(cached, instrument, granularity, price, directory)
+        if covered_from is not None:
+            save_coverage(covered_from, covered_to, instrument, granularity, price, directory)
+
+    times = cached["time"]
+    low = np.searchsorted(times, start_ns, side="left")
+    high = len(times) if end_ns is None else np.searchsorted(times, end_ns, side="left")
+    candles = np.asarray(cached[low:high])
+    if len(incomplete):
+        candles = np.concatenate([candles, incomplete])
+    return candles, len(candles) - len(incomplete)
+
+def candles_frame(candles, complete_count=None):
+    # Column arrays go straight into the DataFrame; times are already int64 ns
+    complete_count = len(candles) if complete_count is None else complete_count
+    historical_df = pd.DataFrame({name: candles[name] for name in candles.dtype.names})
+    historical_df["time"] = pd.to_datetime(historical_df["time"], utc=True)
+    historical_df.insert(2, "complete", np.arange(len(candles)) < complete_count)
+    return historical_df
+
+def get_historical_data(instrument="EUR_USD", start="2024-01-01", end="2025-03-03", granularity="D", price="B", client=None):
+    try:
+        candles, complete_count = get_candles(instrument, start, end, granularity, price, client)
+        if len(candles) == 0:
+            raise Exception("No candles returned")
+
+        return candles_frame(candles, complete_count)
+
+    except Exception as e:
+        print(f"Error fetching historical data: {e}")
+        return pd.DataFrame()
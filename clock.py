@@ -0,0 +1,24 @@
+import datetime
+import time
+
+# Time used to stamp orders. Live it is the wall clock; replay.py sets it to
+# the time of the tick being replayed, so orders carry the recorded times.
+
+simulated_ns = None
+
+def set_time(ns):
+    global simulated_ns
+    simulated_ns = ns
+
+def use_wall_clock():
+    global simulated_ns
+    simulated_ns = None
+
+def time_ns():
+    return time.time_ns() if simulated_ns is None else simulated_ns
+
+def now():
+    # Local time without a timezone, like datetime.datetime.now()
+    if simulated_ns is None:
+        return datetime.datetime.now()
+    return datetime.datetime.fromtimestamp(simulated_ns / 1e9)
@@ -1,9 +1,12 @@
-from queue import Queue
-from threading import Lock
 import configparser
 import oandapyV20
 import oandapyV20.endpoints.pricing as pricing
 import os
+from indicators import IndicatorEngine
+from priceBuffer import PriceRingBuffer
+from marketData import MarketDataHub, LatestValueChannel
+from orderStore import OrderStore
+from snapshots import SnapshotPublisher, TimedLock
 
 STRONG_SIGNAL_QUANTITY = 100000
 SMA_50_WINDOW = 50
@@ -13,14 +16,54 @@ PROFIT_THRESHOLD_PIPS = 0.0005
 LOSS_THRESHOLD_PIPS = 0.0005
 PROFIT_BOOKING_QUANTITY = 500000
 
-price_data = []
-orders_history = []
+# 100k ticks covers a full trading day at one quote per second in about 6 MB
+PRICE_BUFFER_CAPACITY = int(os.getenv("price_buffer_capacity", 100000))
+
+# Worker threads sending orders, so the tick loop never waits on OANDA
+ORDER_WORKERS = int(os.getenv("order_workers", 4))
+
+# Processes multiInstrument.py shards its instruments across
+SHARD_WORKERS = int(os.getenv("shard_workers", os.cpu_count() or 1))
+
+# Evaluation time a strategy may take per tick (strategies.py)
+STRATEGY_BUDGET_MS = float(os.getenv("strategy_budget_ms", 1.0))
+
+# "poll" requests PricingInfo once per second, "stream" consumes the pricing stream
+PRICE_SOURCE = os.getenv("price_source", "poll")
+
+# "push" streams ticks, fills and metrics to the browser over server-sent
+# events; "poll" refreshes the dashboard from a 1 s interval callback
+LIVE_UPDATES = os.getenv("live_updates", "push")
+# Points kept per live chart trace when extending it in the browser
+LIVE_MAX_POINTS = int(os.getenv("live_max_points", 6000))
+
+# "standalone" runs trading and the dashboard in one process; under gunicorn
+# (gunicorn.conf.py) one "engine" process trades and publishes its state to
+# shared memory and the "dashboard" workers only serve pages from it
+PROCESS_ROLE = os.getenv("process_role", "standalone")
+SHARED_STATE_NAME = os.getenv("shared_state_name", "tradepulse")
+
+# Every quote is recorded here by tickRecorder.py; empty to turn it off
+TICK_RECORD_DIR = os.getenv("tick_record_dir", "ticks")
+
+# Complete historical candles are cached here as memory-mapped .npy files
+CANDLE_CACHE_DIR = os.getenv("candle_cache_dir", "candle_cache")
+# The prediction and historical panels are built by one dashboard worker and
+# shared with the others through this file (panelLoader.py)
+PANEL_CACHE_PATH = os.getenv("panel_cache_path", os.path.join(CANDLE_CACHE_DIR, "panels.json"))
+
+price_data = PriceRingBuffer(PRICE_BUFFER_CAPACITY)
+orders_history = OrderStore()
 orderbook_data = []
-data_lock = Lock()
+indicator_engine = IndicatorEngine(SMA_50_WINDOW, SMA_200_WINDOW, RSI_WINDOW)
+# Serializes the engine's writers (ticks, fills, resets); readers use the
+# snapshots below instead, and lock wait/hold times are in data_lock.stats()
+data_lock = TimedLock("data_lock")
+market_data = MarketDataHub()
 
-orders_queue = Queue()
-metrics_queue = Queue()
-orderbook_queue = Queue()
+# Latest orderbook; keeps one value however rarely it is read. Metrics are
+# read from config.snapshots
+orderbook_channel = LatestValueChannel("orderbook")
 
 trading_metrics = {
     "total_pnl": 0,
@@ -30,8 +73,15 @@ trading_metrics = {
     "total_sell_value": 0,
     "buy_avg_price": 0,
     "sell_avg_price": 0,
+    "position": 0,
+    "realized_pnl": 0,
+    "unrealized_pnl": 0,
 }
 
+# Latest quote, indicators and metrics published by the engine on every tick
+# and fill, readable without locking
+snapshots = SnapshotPublisher(quote=None, indicators=None, metrics=trading_metrics, strategy_pnl={}, exits_in_flight=0)
+
 config = configparser.ConfigParser()
 account_id = os.getenv("account_id")
 access_token = os.getenv("access_token")
@@ -43,8 +93,20 @@ if not all([account_id, access_token, account_type]) and os.path.exists("oanda.c
     access_token = access_token or config["oanda"].get("access_token")
     account_type = account_type or config["oanda"].get("account_type")
 
-client = oandapyV20.API(access_token=access_token)
+# Point the client at a local stand-in (e.g. replayServer.py) instead of OANDA
+api_url = os.getenv("oanda_api_url")
+environment = "practice"
+if api_url:
+    oandapyV20.oandapyV20.TRADING_ENVIRONMENTS["local"] = {
+        "api": api_url,
+        "stream": os.getenv("oanda_stream_url", api_url)
+    }
+    environment = "local"
+
+client = oandapyV20.API(access_token=access_token, environment=environment)
                         
 instrument = "EUR_USD"
+# Instruments traded by multiInstrument.py; the dashboard shows config.instrument
+INSTRUMENTS = [name for name in os.getenv("instruments", instrument).split(",") if name]
 params = {"instruments": instrument}
 r = pricing.PricingInfo(accountID=account_id, params=params)
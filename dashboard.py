@@ -1,6 +1,9 @@
 import datetime
+import math
+import time
+import flask
 import dash
-from dash import html, dcc
+from dash import html, dcc, dash_table
 from dash.dependencies import Input, Output, State
 import config
 import priceCharts
@@ -11,16 +14,23 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 import plotly.graph_objs as go
 import warnings
-import predict
-from predict import predict_today_price, fetch_stock_data
+import panelLoader
+import livePush
 from historyCharts import get_historical_data
 from colors import *
 from colors import dark_bg_color, plot_bg_color, text_color, grid_color, border_color, inactive_text_color, positive_pnl_color, buy_color, sell_color
-from orderHistory import load_orders, save_orders
+from orderHistory import load_orders
 from metricsManager import initialize_metrics_from_history
+from orderStore import OrderStore
+from positionLedger import mark_breakdown
+from strategies import registry as strategy_registry
 
 warnings.filterwarnings('ignore')
 
+# Order history rows sent per page; the table is paged on the server so a
+# refresh costs the same however many orders there are
+ORDERS_PAGE_SIZE = 20
+
 def create_app():
     app = dash.Dash(__name__)
     
@@ -59,25 +69,42 @@ def create_app():
         "timestamp": datetime.datetime.now()
     }
     
-    config.orderbook_queue.put(initial_orderbook)
     
-    loaded_orders = load_orders()
-    config.orders_history = loaded_orders
+    # Dashboard workers get orders, metrics and chart rows from the engine
+    # process instead (engine.follow_engine)
+    if config.PROCESS_ROLE != "dashboard":
+        loaded_orders = load_orders()
+        config.orders_history = OrderStore(loaded_orders)
+        
+        initialize_metrics_from_history()
+        
+        priceCharts.initialize_data_thread()
     
-    initialize_metrics_from_history()
+    priceCharts.register_callbacks(app)
     
-    priceCharts.initialize_data_thread()
+    # Lock wait/hold times per thread, depth and staleness of the orderbook
+    # channel and the age of the latest snapshot
+    @app.server.route("/engine/stats")
+    def engine_stats():
+        snapshot = config.snapshots.latest()
+        return flask.jsonify({
+            "data_lock": config.data_lock.stats(),
+            "channels": {channel.name: channel.stats() for channel in (config.orderbook_channel,)},
+            "snapshot": {"sequence": snapshot["sequence"], "age_ms": (time.time() - snapshot["time"]) * 1000},
+            # Only the process running the strategy (standalone or engine) has calls
+            "strategies": strategy_registry.stats(),
+        })
     
-    priceCharts.register_callbacks(app)
+    if config.LIVE_UPDATES == "push":
+        livePush.register_routes(app.server)
+        livePush.register_callbacks(app)
+        livePush.initialize_publisher()
     
-    try:
-        stock_data = fetch_stock_data()
-        prediction_data = predict.prepare_prediction_data(stock_data)
-        today_predicted_price = predict_today_price(prediction_data)
-    except Exception as e:
-        print(f"Error preparing prediction data: {e}")
-        prediction_data = pd.DataFrame()
-        today_predicted_price = 1.0800
+    # The prediction and historical panels load in the background and are
+    # filled in by a callback, so the server starts without waiting on OANDA
+    panelLoader.initialize_panels()
+    
+    panelLoader.register_callbacks(app)
     
     app.layout = html.Div(
         style={
@@ -157,22 +184,17 @@ def create_app():
                     "backgroundColor": plot_bg_color,
                     "padding": "20px",
                     "borderRadius": "8px",
-                    "marginBottom": "20px",
-                    "maxHeight": "300px",
-                    "overflowY": "auto"
+                    "marginBottom": "20px"
                 },
                 children=[
-                    html.H2("Order History", style={"marginTop": "0", "marginBottom": "15px"}),
-                    html.Div(id="orders-table")
+                    html.H2("P&L by Strategy", style={"marginTop": "0", "marginBottom": "15px"}),
+                    html.Div(id="strategy-pnl-table"),
+                    # Keeps running in push mode, which disables interval-component
+                    dcc.Interval(id="strategy-pnl-interval", interval=2000, n_intervals=0),
+                    dcc.Store(id="strategy-pnl-store", data=None),
                 ]
             ),
             
-            dcc.Store(id="orders-store", data=load_orders()),
-            dcc.Store(id="metrics-store", data=config.trading_metrics),
-            dcc.Store(id="orderbook-store", data=initial_orderbook),
-            
-            dcc.Interval(id="interval-component", interval=1000, n_intervals=0),  # Reduced interval for more frequent updates
-            historyCharts.create_historical_chart_layout(),
             html.Div(
                 style={
                     "backgroundColor": plot_bg_color,
@@ -181,128 +203,165 @@ def create_app():
                     "marginBottom": "20px"
                 },
                 children=[
-                    html.H2("EUR/USD Price Prediction", style={"marginTop": "0", "marginBottom": "15px"}),
-                    html.H3(f"Today's predicted price: ${today_predicted_price:.4f}", 
-                        style={'textAlign': 'center', 'color': text_color, 'marginTop': '15px'}),
-                    predict.create_prediction_graph(prediction_data, today_predicted_price) if not prediction_data.empty else 
-                    html.Div("Prediction data not available", style={"color": inactive_text_color, "textAlign": "center", "padding": "20px"})
+                    html.H2("Order History", style={"marginTop": "0", "marginBottom": "15px"}),
+                    create_orders_table()
                 ]
             ),
+            
+            # Versions of the server-side views this page has rendered
+            dcc.Store(id="orders-version", data=None),
+            dcc.Store(id="orderbook-version", data=None),
+            dcc.Store(id="metrics-store", data=dict(config.snapshots.latest()["metrics"])),
+            # Order store version pushed over /live/stream, refreshes the table
+            dcc.Store(id="orders-pushed", data=None),
+            
+            dcc.Interval(id="interval-component", interval=1000, n_intervals=0),  # Reduced interval for more frequent updates
+            livePush.create_push_layout() if config.LIVE_UPDATES == "push" else html.Div(),
+            panelLoader.create_panels_layout(),
         ]
     )
     
     @app.callback(
         [
-            Output("orders-table", "children"),
             Output("orderbook-table", "children"),
-            Output("orders-store", "data"),
+            Output("orderbook-version", "data"),
             Output("metrics-store", "data"),
-            Output("orderbook-store", "data"),
             Output("total-pnl", "children"),
             Output("buy-avg-price", "children"),
             Output("sell-avg-price", "children"),
         ],
         [Input("interval-component", "n_intervals")],
-        [State("orders-store", "data"), State("metrics-store", "data"), State("orderbook-store", "data")]
+        [State("orderbook-version", "data"), State("metrics-store", "data")]
     )
-    def update_metrics(n, orders_data, metrics_data, orderbook_data):
+    def update_metrics(n, orderbook_version, metrics_data):
         ctx = dash.callback_context
         
         if not ctx.triggered:
             return dash.no_update
         
         try:
-            updated = False
-            
-            while not config.orders_queue.empty():
-                new_order = config.orders_queue.get()
-                if new_order not in orders_data:
-                    orders_data.append(new_order)
-                    updated = True
-            
-            if not config.metrics_queue.empty():
-                metrics_data = config.metrics_queue.get()
-                updated = True
-            
-            if not config.orderbook_queue.empty():
-                orderbook_data = config.orderbook_queue.get()
-                updated = True
+            outputs = [dash.no_update] * 6
             
-            if not updated and len(config.orders_history) > len(orders_data):
-                orders_data = config.orders_history.copy()
-                updated = True
+            # Every page reads the same latest orderbook and only gets it again
+            # when the version differs from the one it last rendered
+            orderbook_data, version = config.orderbook_channel.latest()
+            if version != orderbook_version:
+                orderbook_data = orderbook_data or initial_orderbook
+                outputs[0] = create_orderbook_table(orderbook_data)
+                outputs[1] = version
             
-            if not updated and metrics_data != config.trading_metrics:
-                metrics_data = config.trading_metrics.copy()
-                updated = True
+            latest_metrics = config.snapshots.latest()["metrics"]
+            if metrics_data != latest_metrics:
+                metrics_data = dict(latest_metrics)
+                outputs[2] = metrics_data
+                outputs[3] = create_pnl_display(metrics_data)
+                outputs[4] = f"${metrics_data['buy_avg_price']:.5f}"
+                outputs[5] = f"${metrics_data['sell_avg_price']:.5f}"
             
-            orders_table = create_orders_table(orders_data)
-            orderbook_table = create_orderbook_table(orderbook_data)
-            
-            total_pnl = create_pnl_display(metrics_data)
-            buy_avg_price = f"${metrics_data['buy_avg_price']:.5f}"
-            sell_avg_price = f"${metrics_data['sell_avg_price']:.5f}"
-            
-            return orders_table, orderbook_table, orders_data, metrics_data, orderbook_data, total_pnl, buy_avg_price, sell_avg_price
+            return outputs
             
         except Exception as e:
             print(f"Error updating metrics: {e}")
             return dash.no_update
     
-    return app
-
-def create_orders_table(orders):
-    if not orders:
-        return html.Div("No orders yet", style={"color": inactive_text_color, "textAlign": "center", "padding": "20px"})
+    @app.callback(
+        [Output("strategy-pnl-table", "children"), Output("strategy-pnl-store", "data")],
+        [Input("strategy-pnl-interval", "n_intervals")],
+        [State("strategy-pnl-store", "data")]
+    )
+    def update_strategy_pnl(n, rendered):
+        try:
+            # The breakdown is published with each fill; open positions are
+            # valued at the latest quote
+            snapshot = config.snapshots.latest()
+            quote = snapshot["quote"]
+            mid = (quote["bid"] + quote["ask"]) / 2 if quote else None
+            breakdown = mark_breakdown(snapshot["strategy_pnl"], mid)
+            if breakdown == rendered:
+                return dash.no_update, dash.no_update
+            return create_strategy_pnl_table(breakdown), breakdown
+        except Exception as e:
+            print(f"Error updating strategy P&L: {e}")
+            return dash.no_update, dash.no_update
     
-    header = html.Div(
-        style={
-            "display": "grid",
-            "gridTemplateColumns": "1fr 1fr 1fr 1fr 1fr",
-            "borderBottom": f"1px solid {border_color}",
-            "padding": "10px 0",
-            "fontWeight": "bold"
-        },
-        children=[
-            html.Div("Time", style={"textAlign": "left"}),
-            html.Div("Type", style={"textAlign": "center"}),
-            html.Div("Quantity", style={"textAlign": "right"}),
-            html.Div("Price", style={"textAlign": "right"}),
-            html.Div("Strategy", style={"textAlign": "center"})
-        ]
+    # The order history is paged on the server: a page sends its last-seen
+    # version and only gets rows back when the store or the page changed
+    @app.callback(
+        [
+            Output("orders-table", "data"),
+            Output("orders-table", "page_count"),
+            Output("orders-version", "data"),
+        ],
+        [
+            Input("interval-component", "n_intervals"),
+            Input("orders-table", "page_current"),
+            Input("orders-table", "page_size"),
+            Input("orders-pushed", "data"),
+        ],
+        [State("orders-version", "data")]
     )
+    def update_orders_table(n, page_current, page_size, pushed_version, orders_version):
+        try:
+            store = config.orders_history
+            version = store.version()
+            triggers = {trigger["prop_id"] for trigger in dash.callback_context.triggered}
+            page_changed = triggers & {"orders-table.page_current", "orders-table.page_size"}
+            if version == orders_version and not page_changed:
+                return dash.no_update, dash.no_update, dash.no_update
+            page_size = page_size or ORDERS_PAGE_SIZE
+            rows = create_order_rows(store.page(page_current or 0, page_size))
+            return rows, max(1, math.ceil(len(store) / page_size)), version
+        except Exception as e:
+            print(f"Error updating orders table: {e}")
+            return dash.no_update, dash.no_update, dash.no_update
     
+    return app
+
+def create_orders_table():
+    return dash_table.DataTable(
+        id="orders-table",
+        columns=[
+            {"name": "Time", "id": "time"},
+            {"name": "Type", "id": "type"},
+            {"name": "Quantity", "id": "quantity"},
+            {"name": "Price", "id": "price"},
+            {"name": "Strategy", "id": "strategy"},
+        ],
+        data=[],
+        page_action="custom",
+        page_current=0,
+        page_size=ORDERS_PAGE_SIZE,
+        page_count=1,
+        style_as_list_view=True,
+        style_header={"backgroundColor": plot_bg_color, "color": text_color, "fontWeight": "bold",
+                      "borderBottom": f"1px solid {border_color}"},
+        style_cell={"backgroundColor": plot_bg_color, "color": text_color, "fontFamily": "Arial, sans-serif",
+                    "borderBottom": f"1px solid {border_color}", "padding": "8px", "textAlign": "center"},
+        style_cell_conditional=[
+            {"if": {"column_id": "time"}, "textAlign": "left"},
+            {"if": {"column_id": "quantity"}, "textAlign": "right"},
+            {"if": {"column_id": "price"}, "textAlign": "right"},
+        ],
+        style_data_conditional=[
+            {"if": {"filter_query": '{type} = "BUY"', "column_id": "type"}, "color": buy_color, "fontWeight": "bold"},
+            {"if": {"filter_query": '{type} = "SELL"', "column_id": "type"}, "color": sell_color, "fontWeight": "bold"},
+        ],
+    )
+
+def create_order_rows(orders):
     rows = []
-    for order in reversed(orders):
+    for order in orders:
         try:
-            order_time = datetime.datetime.fromisoformat(order["timestamp"]).strftime("%H:%M:%S")
-            order_type = order["type"]
-            quantity = order["quantity"]
-            price = float(order["price"])
-            strategy = order.get("strategy", "")
-            
-            type_color = buy_color if order_type == "BUY" else sell_color
-            
-            row = html.Div(
-                style={
-                    "display": "grid",
-                    "gridTemplateColumns": "1fr 1fr 1fr 1fr 1fr",
-                    "borderBottom": f"1px solid {border_color}",
-                    "padding": "8px 0"
-                },
-                children=[
-                    html.Div(order_time, style={"textAlign": "left"}),
-                    html.Div(order_type, style={"textAlign": "center", "color": type_color, "fontWeight": "bold"}),
-                    html.Div(f"{quantity:,}", style={"textAlign": "right"}),
-                    html.Div(f"${price:.5f}", style={"textAlign": "right"}),
-                    html.Div(strategy, style={"textAlign": "center"})
-                ]
-            )
-            rows.append(row)
+            rows.append({
+                "time": datetime.datetime.fromisoformat(order["timestamp"]).strftime("%H:%M:%S"),
+                "type": order["type"],
+                "quantity": f"{order['quantity']:,}",
+                "price": f"${float(order['price']):.5f}",
+                "strategy": order.get("strategy", ""),
+            })
         except Exception as e:
             print(f"Error rendering order row: {e}")
-    
-    return html.Div([header, html.Div(rows)])
+    return rows
 
 def create_orderbook_table(orderbook):
     if not orderbook or (not orderbook.get("bids") and not orderbook.get("asks")):
@@ -415,6 +474,46 @@ def create_orderbook_table(orderbook):
         ]
     )
 
+def create_strategy_pnl_table(breakdown):
+    if not breakdown:
+        return html.P("No fills yet today", style={"color": inactive_text_color})
+    
+    def pnl_cell(value):
+        return html.Td(f"${value:.2f}", style={"padding": "8px", "textAlign": "right",
+                                               "color": positive_pnl_color if value >= 0 else "red"})
+    
+    rows = []
+    for strategy, values in sorted(breakdown.items()):
+        rows.append(html.Tr(
+            style={"borderBottom": "1px solid #333"},
+            children=[
+                html.Td(strategy, style={"padding": "8px"}),
+                html.Td(f"{values['position']:,.0f}", style={"padding": "8px", "textAlign": "right"}),
+                pnl_cell(values["realized_pnl"]),
+                pnl_cell(values["unrealized_pnl"]),
+                pnl_cell(values["realized_pnl"] + values["unrealized_pnl"]),
+            ]
+        ))
+    
+    return html.Table(
+        style={"width": "100%", "borderCollapse": "collapse"},
+        children=[
+            html.Thead(
+                style={"borderBottom": "2px solid #444"},
+                children=[
+                    html.Tr([
+                        html.Th("Strategy", style={"padding": "10px", "textAlign": "left", "width": "28%"}),
+                        html.Th("Open Position", style={"padding": "10px", "textAlign": "right", "width": "18%"}),
+                        html.Th("Realized P&L", style={"padding": "10px", "textAlign": "right", "width": "18%"}),
+                        html.Th("Unrealized P&L", style={"padding": "10px", "textAlign": "right", "width": "18%"}),
+                        html.Th("Total P&L", style={"padding": "10px", "textAlign": "right", "width": "18%"}),
+                    ])
+                ]
+            ),
+            html.Tbody(children=rows)
+        ]
+    )
+
 def create_pnl_display(metrics):
     pnl_value = metrics.get('total_pnl', 0)
     total_pnl_display = f"${pnl_value:.2f}"
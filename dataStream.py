@@ -1,59 +1,129 @@
 import datetime
 import time
-import pandas as pd
-from orderManager import place_order
-from indicators import calculate_rsi
+from threading import Thread
+from orderManager import place_order, gateway as order_gateway
 import config
 import oandapyV20.endpoints.orders as orders
 import oandapyV20.endpoints.pricing as pricing
-from metricsManager import reset_metrics
+from metricsManager import mark_to_market
+from priceStream import stream_prices, stats as ingestion_stats
+from tickRecorder import recorder as tick_recorder
+from strategies import registry as strategy_registry, EXIT_STRATEGIES
 
-def execute_trading_strategy(df, bid_price, ask_price, previous_price_above_sma_50):
-    current_price = df["Mid"].iloc[-1]
-    current_sma_50 = df["SMA_50"].iloc[-1]
-    current_sma_200 = df["SMA_200"].iloc[-1] if "SMA_200" in df else None
-    current_rsi = df["RSI"].iloc[-1] if "RSI" in df else 50
+def exits_pending():
+    return sum(order_gateway.pending(strategy) for strategy in EXIT_STRATEGIES)
+
+def execute_trading_strategy(indicators, bid_price, ask_price, previous_price_above_sma_50, metrics=None, exits_in_flight=None):
+    metrics = metrics or config.trading_metrics
     
-    if config.trading_metrics["buy_avg_price"] > 0 and config.trading_metrics["total_buy_quantity"] > config.trading_metrics["total_sell_quantity"]:
-        profit_threshold = config.trading_metrics["buy_avg_price"] + config.PROFIT_THRESHOLD_PIPS
-        loss_threshold = config.trading_metrics["buy_avg_price"] - config.LOSS_THRESHOLD_PIPS
-        remaining_quantity = config.trading_metrics["total_buy_quantity"] - config.trading_metrics["total_sell_quantity"]
-        
-        if current_price >= profit_threshold and remaining_quantity > 0:
-            place_order("SELL", bid_price, config.PROFIT_BOOKING_QUANTITY, "Profit Booking")
-            reset_metrics()
-            return previous_price_above_sma_50
-        
-        elif current_price <= loss_threshold and remaining_quantity > 0:
-            place_order("SELL", bid_price, config.PROFIT_BOOKING_QUANTITY, "Stop Loss")
-            reset_metrics()
-            return previous_price_above_sma_50
+    # Orders are filled asynchronously, so don't send another exit while one
+    # is still in flight and the metrics haven't caught up. The count must be
+    # taken together with the metrics (see process_price)
+    if exits_in_flight is None:
+        exits_in_flight = exits_pending()
+    
+    intents = strategy_registry.evaluate(indicators, bid_price, ask_price, metrics, exits_in_flight)
+    for order_type, price, quantity, strategy in intents:
+        place_order(order_type, price, quantity, strategy)
+    return indicators["mid"] > indicators["sma_50"]
+
+def make_placeholder_price(bid, ask):
+    # Synthetic quote used to keep the dashboard updating; it is stored but
+    # never traded on
+    return {
+        "type": "PRICE",
+        "instrument": config.instrument,
+        "time": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%f") + "000Z",
+        "bids": [{"price": str(bid), "liquidity": "10000"}],
+        "asks": [{"price": str(ask), "liquidity": "10000"}],
+        "placeholder": True
+    }
+
+def publish_price(price):
+    price.setdefault("received", time.perf_counter())
+    tick_recorder.record(price)
+    config.market_data.publish(price)
+    config.orderbook_channel.put({"bids": price["bids"], "asks": price["asks"], "timestamp": price["time"]})
+
+def initialize_price_data():
+    # Initialize with a default data point to prevent "waiting for data" message
+    publish_price(make_placeholder_price(1.0800, 1.0802))
+    print("Added default data point to initialize the dashboard")
+
+def process_price(price, previous_price_above_sma_50):
+    bid = float(price["bids"][0]["price"])
+    ask = float(price["asks"][0]["price"])
+    mid = (bid + ask) / 2
     
-    if len(df) > 1:
-        prev_sma_50 = df["SMA_50"].iloc[-2]
-        prev_sma_200 = df["SMA_200"].iloc[-2] if "SMA_200" in df else None
-        prev_price = df["Mid"].iloc[-2]
+    # The lock only covers updating the engine state and publishing it as a
+    # snapshot; the strategy then decides on that snapshot without holding it.
+    # Exits in flight are counted under the lock as well: an exit fill resets
+    # the metrics under it before it stops counting, so the snapshot can't pair
+    # the open position with no exit pending
+    with config.data_lock:
+        config.price_data.append(price["time"], bid, ask, mid)
         
-        if "SMA_200" in df and prev_sma_200 is not None and current_sma_200 is not None:
-            if prev_sma_50 < prev_sma_200 and current_sma_50 > current_sma_200:
-                place_order("BUY", ask_price, config.STRONG_SIGNAL_QUANTITY, "Golden Cross")
-            
-            elif prev_sma_50 > prev_sma_200 and current_sma_50 < current_sma_200:
-                place_order("SELL", bid_price, config.STRONG_SIGNAL_QUANTITY, "Death Cross")
+        indicators = config.indicator_engine.update(mid)
+        mark_to_market(mid)
         
-        current_price_above_sma_50 = current_price > current_sma_50
+        snapshot = config.snapshots.publish(
+            quote={"time": price["time"], "bid": bid, "ask": ask, "bids": price["bids"], "asks": price["asks"]},
+            indicators=indicators,
+            metrics=config.trading_metrics,
+            exits_in_flight=exits_pending(),
+        )
+    
+    if indicators["count"] > 1 and not price.get("placeholder"):
+        try:
+            previous_price_above_sma_50 = execute_trading_strategy(snapshot["indicators"], bid, ask, previous_price_above_sma_50,
+                                                                   snapshot["metrics"], snapshot["exits_in_flight"])
+            print(f"Trading strategy executed - Current price: {mid}, SMA_50: {indicators['sma_50']}, Above SMA_50: {previous_price_above_sma_50}")
+        except Exception as strategy_error:
+            print(f"Error executing trading strategy: {strategy_error}")
+    
+    return previous_price_above_sma_50
+
+def run_strategy(stop_event, subscription):
+    previous_price_above_sma_50 = None
+    
+    while not stop_event.is_set():
+        price = subscription.get(timeout=1)
+        if price is None:
+            continue
         
-        return current_price_above_sma_50
-    else:
-        return current_price > current_sma_50
+        try:
+            previous_price_above_sma_50 = process_price(price, previous_price_above_sma_50)
+            if not price.get("placeholder"):
+                ingestion_stats.record_tick(price["received"], time.perf_counter(), price["time"])
+        except Exception as e:
+            print(f"Error processing price: {e}")
 
 def stream_data(stop_event):
-    previous_price_above_sma_50 = None
+    print(f"Starting data stream for {config.instrument} on account {config.account_id} ({config.PRICE_SOURCE} mode)")
+    
+    # The strategy is one consumer of the market data hub; the charts and
+    # orderbook panel subscribe to the same feed instead of polling OANDA again
+    subscription = config.market_data.subscribe("strategy", maxsize=10000)
+    strategy_thread = Thread(target=run_strategy, args=(stop_event, subscription))
+    strategy_thread.daemon = True
+    strategy_thread.start()
+    
+    # Ticks outlive the in-memory buffers (and the daily reset) on disk
+    if config.TICK_RECORD_DIR:
+        tick_recorder.start(stop_event)
+    
+    initialize_price_data()
+    
+    if config.PRICE_SOURCE == "stream":
+        stream_prices(stop_event, publish_price, [config.instrument])
+    else:
+        poll_prices(stop_event)
+
+def poll_prices(stop_event):
     params = {
         "instruments": config.instrument
     }
     r = pricing.PricingInfo(accountID=config.account_id, params=params)
-    print(f"Starting data stream for {config.instrument} on account {config.account_id}")
     
     # Enhanced error handling variables
     retry_count = 0
@@ -65,30 +135,6 @@ def stream_data(stop_event):
     # Set a longer timeout for production environments
     config.client.request_timeout = 120
     
-    # Initialize with a default data point to prevent "waiting for data" message
-    timestamp = datetime.datetime.now()
-    default_bid = 1.0800
-    default_ask = 1.0802
-    default_mid = (default_bid + default_ask) / 2
-    
-    with config.data_lock:
-        config.price_data.append({
-            "Timestamp": timestamp,
-            "Bid": default_bid,
-            "Ask": default_ask,
-            "Mid": default_mid
-        })
-        
-        # Add initial orderbook data
-        initial_orderbook = {
-            "bids": [{"price": str(default_bid), "liquidity": "10000"}],
-            "asks": [{"price": str(default_ask), "liquidity": "10000"}],
-            "timestamp": timestamp
-        }
-        config.orderbook_queue.put(initial_orderbook)
-    
-    print("Added default data point to initialize the dashboard")
-    
     while not stop_event.is_set():
         try:
             response = config.client.request(r)
@@ -100,44 +146,7 @@ def stream_data(stop_event):
                 continue
             
             for price in prices:
-                timestamp = datetime.datetime.strptime(price["time"].split(".")[0], "%Y-%m-%dT%H:%M:%S")
-                bid = float(price["bids"][0]["price"])
-                ask = float(price["asks"][0]["price"])
-                mid = (bid + ask) / 2
-                
-                with config.data_lock:
-                    config.price_data.append({
-                        "Timestamp": timestamp,
-                        "Bid": bid,
-                        "Ask": ask,
-                        "Mid": mid
-                    })
-                    
-                    if len(config.price_data) > 1000:
-                        config.price_data = config.price_data[-1000:]
-                    
-                    df = pd.DataFrame(config.price_data)
-                    
-                    if len(df) > 1:
-                        df["SMA_50"] = df["Mid"].rolling(window=config.SMA_50_WINDOW, min_periods=1).mean()
-                        
-                        if len(df) >= config.SMA_200_WINDOW:
-                            df["SMA_200"] = df["Mid"].rolling(window=config.SMA_200_WINDOW, min_periods=1).mean()
-                        
-                        df["RSI"] = calculate_rsi(df["Mid"], window=config.RSI_WINDOW)
-                        
-                        try:
-                            previous_price_above_sma_50 = execute_trading_strategy(df, bid, ask, previous_price_above_sma_50)
-                            print(f"Trading strategy executed - Current price: {mid}, SMA_50: {df['SMA_50'].iloc[-1]}, Above SMA_50: {previous_price_above_sma_50}")
-                        except Exception as strategy_error:
-                            print(f"Error executing trading strategy: {strategy_error}")
-                    
-                    orderbook = {
-                        "bids": price["bids"],
-                        "asks": price["asks"],
-                        "timestamp": timestamp
-                    }
-                    config.orderbook_queue.put(orderbook)
+                publish_price(price)
             
             # Reset retry count on successful request
             retry_count = 0
@@ -151,32 +160,12 @@ def stream_data(stop_event):
             if retry_count >= max_retries:
                 print("Maximum retry attempts reached, resetting and continuing...")
                 # Add a placeholder data point with current timestamp to keep dashboard updating
-                placeholder_timestamp = datetime.datetime.now()
+                last_quote = config.snapshots.latest()["quote"]
                 
-                with config.data_lock:
-                    if config.price_data and len(config.price_data) > 0:
-                        last_bid = config.price_data[-1]["Bid"]
-                        last_ask = config.price_data[-1]["Ask"]
-                        last_mid = config.price_data[-1]["Mid"]
-                    else:
-                        last_bid = 1.0800
-                        last_ask = 1.0802
-                        last_mid = (last_bid + last_ask) / 2
-                    
-                    config.price_data.append({
-                        "Timestamp": placeholder_timestamp,
-                        "Bid": last_bid,
-                        "Ask": last_ask,
-                        "Mid": last_mid
-                    })
-                    
-                    # Add placeholder orderbook data
-                    placeholder_orderbook = {
-                        "bids": [{"price": str(last_bid), "liquidity": "10000"}],
-                        "asks": [{"price": str(last_ask), "liquidity": "10000"}],
-                        "timestamp": placeholder_timestamp
-                    }
-                    config.orderbook_queue.put(placeholder_orderbook)
+                if last_quote is not None:
+                    publish_price(make_placeholder_price(last_quote["bid"], last_quote["ask"]))
+                else:
+                    publish_price(make_placeholder_price(1.0800, 1.0802))
                 
                 print(f"Added placeholder data point to maintain dashboard updates")
                 retry_count = 0
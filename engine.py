@@ -0,0 +1,137 @@
+import signal
+import time
+from threading import Thread, Event
+import config
+import priceCharts
+from dataStream import stream_data
+from marketData import CONFLATE
+from metricsManager import initialize_metrics_from_history
+from orderHistory import journal, load_orders, load_legacy_orders, JournalTail
+from orderStore import OrderStore
+from scheduler import initialize_scheduler
+from sharedState import SharedState
+
+# The trading engine as its own process: price feed, strategy, order gateway
+# and daily reset run here once, and the dashboard state (chart rows, metrics,
+# orderbook, order store version) is published to shared memory. Dashboard
+# workers (process_role=dashboard) follow it and read the orders from the
+# order journal, so gunicorn can run any number of them:
+#
+#   python engine.py
+
+PUBLISH_INTERVAL = 0.05
+FOLLOW_INTERVAL = 0.1
+ATTACH_RETRY = 1
+
+def publish_state(stop_event, state, subscription):
+    sent_index = 0
+    orderbook = None
+    while not stop_event.is_set():
+        price = subscription.get(timeout=PUBLISH_INTERVAL)
+        try:
+            rows, index = priceCharts.rows_since(sent_index)
+            if index != sent_index:
+                state.append_rows(rows, index)
+                sent_index = index
+            if price is not None:
+                orderbook = {"bids": price["bids"], "asks": price["asks"], "time": price["time"]}
+            snapshot = config.snapshots.latest()
+            state.publish(snapshot["metrics"], config.orders_history.version(), orderbook, dict(snapshot["strategy_pnl"]))
+        except Exception as e:
+            print(f"Error publishing engine state: {e}")
+
+def run_engine(stop_event):
+    state = SharedState.create(config.SHARED_STATE_NAME, config.PRICE_BUFFER_CAPACITY)
+    config.orders_history = OrderStore(load_orders())
+    initialize_metrics_from_history()
+    priceCharts.initialize_data_thread()
+
+    subscription = config.market_data.subscribe("shared-state", policy=CONFLATE)
+    for target, args in ((publish_state, (stop_event, state, subscription)), (stream_data, (stop_event,))):
+        thread = Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+    scheduler = initialize_scheduler()
+    print(f"Engine publishing state to shared memory {config.SHARED_STATE_NAME}")
+    return state, scheduler
+
+def attach_engine(stop_event):
+    while not stop_event.is_set():
+        try:
+            return SharedState.attach(config.SHARED_STATE_NAME)
+        except FileNotFoundError:
+            print(f"Waiting for the engine to publish {config.SHARED_STATE_NAME}...")
+            stop_event.wait(ATTACH_RETRY)
+    return None
+
+def follow_engine(stop_event, state=None):
+    # Runs in each dashboard worker: mirrors the engine's chart rows into
+    # priceCharts, its latest quote into the local market data hub (for the
+    # orderbook panel and live push) and its metrics into config, and keeps
+    # the order store in step with the journal
+    state = state or attach_engine(stop_event)
+    generation = None
+    tail = None
+    last_orderbook = None
+    while state is not None and not stop_event.is_set():
+        try:
+            snapshot = state.snapshot()
+            rows, index = state.rows_since(priceCharts.appended)
+            if index != priceCharts.appended:
+                priceCharts.add_rows(rows, index)
+
+            config.trading_metrics.update(snapshot["metrics"])
+            changes = {"metrics": config.trading_metrics, "strategy_pnl": snapshot["strategy_pnl"]}
+
+            orderbook = snapshot["orderbook"]
+            if orderbook and orderbook != last_orderbook:
+                # The dashboard values the strategy breakdown at this quote
+                changes["quote"] = {"time": orderbook["time"], "bid": float(orderbook["bids"][0]["price"]),
+                                    "ask": float(orderbook["asks"][0]["price"]),
+                                    "bids": orderbook["bids"], "asks": orderbook["asks"]}
+                config.market_data.publish(dict(orderbook, type="PRICE"))
+                config.orderbook_channel.put({"bids": orderbook["bids"], "asks": orderbook["asks"], "timestamp": orderbook["time"]})
+                last_orderbook = orderbook
+            config.snapshots.publish(**changes)
+
+            orders_generation, orders_count = snapshot["orders_version"]
+            store = config.orders_history
+            if orders_generation != generation:
+                # A new generation means the daily reset cleared the store
+                # after rotating the journal; its orders are all in the new file
+                store.clear()
+                for order in load_legacy_orders():
+                    store.add(order)
+                if tail is not None:
+                    tail.close()
+                tail = JournalTail(journal.path)
+                generation = orders_generation
+            if len(store) < orders_count:
+                for order in tail.read():
+                    store.add(order)
+            # Pages compare versions across workers, so use the engine's
+            store.generation = generation
+        except Exception as e:
+            print(f"Error following engine state: {e}")
+        stop_event.wait(FOLLOW_INTERVAL)
+
+def initialize_engine_follower():
+    stop_event = Event()
+    thread = Thread(target=follow_engine, args=(stop_event,))
+    thread.daemon = True
+    thread.start()
+    return stop_event, thread
+
+if __name__ == "__main__":
+    stop_event = Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    state, scheduler = run_engine(stop_event)
+    try:
+        while not stop_event.wait(1):
+            pass
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        scheduler.shutdown(wait=False)
+        time.sleep(PUBLISH_INTERVAL * 2)
+        state.close()
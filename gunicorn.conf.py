@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+# gunicorn starts one trading engine process (engine.py) next to its
+# workers; the workers are dashboard-only and follow the state the engine
+# publishes to shared memory, so viewers scale across cores without starting
+# more than one trader.
+
+os.environ.setdefault("process_role", "dashboard")
+
+workers = int(os.getenv("WEB_CONCURRENCY", 4))
+worker_class = "gthread"
+threads = 32
+
+engine = None
+
+def on_starting(server):
+    global engine
+    engine = subprocess.Popen([sys.executable, "engine.py"], env=dict(os.environ, process_role="engine"))
+    server.log.info(f"Started trading engine (pid {engine.pid})")
+
+def on_exit(server):
+    if engine is not None and engine.poll() is None:
+        engine.terminate()
+        try:
+            engine.wait(10)
+        except subprocess.TimeoutExpired:
+            engine.kill()
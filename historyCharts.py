@@ -2,44 +2,9 @@ import pandas as pd
 import plotly.graph_objs as go
 import config
 from dash import dcc, html
-from oandapyV20.endpoints.instruments import InstrumentsCandles
+from candleStore import get_historical_data
 from colors import *
 
-def get_historical_data(instrument="EUR_USD", start="2024-01-01", end="2025-03-03", granularity="D", price="B"):
-    try:
-        params = {
-            "from": start,
-            "to": end,
-            "granularity": granularity,
-            "price": price
-        }
-
-        r = InstrumentsCandles(instrument=instrument, params=params)
-        response = config.client.request(r)
-        candles = response.get("candles", [])
-        data = []
-
-        for candle in candles:
-            row = {
-                "time": candle["time"],
-                "volume": candle["volume"],
-                "complete": candle["complete"]
-            }
-            for price_type in ["bid", "ask", "mid"]:
-                if price_type in candle:
-                    for key, value in candle[price_type].items():
-                        row[f"{price_type}_{key}"] = float(value)
-            data.append(row)
-
-        historical_df = pd.DataFrame(data)
-        historical_df["time"] = pd.to_datetime(historical_df["time"])
-        print("Historical DF: ", historical_df.columns)
-        return historical_df
-
-    except Exception as e:
-        print(f"Error fetching historical data: {e}")
-        return pd.DataFrame()
-    
 def create_historical_chart():
     try:
         historical_df = get_historical_data(instrument=config.instrument)
@@ -100,7 +65,8 @@ def create_historical_chart():
         return html.Div("Error creating historical chart", 
                       style={"color": text_color, "textAlign": "center", "padding": "20px"})
 
-def create_historical_chart_layout():
+def create_historical_chart_layout(chart=None):
+    # The chart is filled in by panelLoader once it has been built in the background
     return html.Div(
         style={
             "backgroundColor": plot_bg_color,
@@ -110,6 +76,6 @@ def create_historical_chart_layout():
         },
         children=[
             html.H2("Historical Data", style={"marginTop": "0", "marginBottom": "15px"}),
-            create_historical_chart()
+            html.Div(id="history-panel", children=chart)
         ]
     )
\ No newline at end of file
@@ -1,3 +1,6 @@
+from collections import deque
+import math
+
 def calculate_rsi(prices, window=14):
     delta = prices.diff()
     gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
@@ -6,3 +9,150 @@ def calculate_rsi(prices, window=14):
     rs = gain / loss
     rsi = 100 - (100 / (1 + rs))
     return rsi
+
+class RollingMean:
+    # Running-sum mean over the last `window` values, equivalent to
+    # pandas rolling(window, min_periods=1).mean() evaluated at the last row.
+    RESYNC_INTERVAL = 10000
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, value):
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.window:
+            self.total -= self.values.popleft()
+
+        # Periodically recompute the sum so floating point drift can't accumulate
+        self.updates += 1
+        if self.updates % self.RESYNC_INTERVAL == 0:
+            self.total = math.fsum(self.values)
+
+        return self.total / len(self.values)
+
+    def reset(self):
+        self.values.clear()
+        self.total = 0.0
+        self.updates = 0
+
+class RollingRSI:
+    # Streaming equivalent of calculate_rsi: simple rolling means of gains and
+    # losses over the last `window` price changes.
+    def __init__(self, window=14):
+        self.window = window
+        self.gains = RollingMean(window)
+        self.losses = RollingMean(window)
+        self.last_price = None
+        self.changes = 0
+
+    def update(self, price):
+        # The first price has no change; like diff().where(...) in
+        # calculate_rsi it counts as a zero gain and zero loss
+        delta = 0.0 if self.last_price is None else price - self.last_price
+        self.last_price = price
+        self.changes += 1
+        avg_gain = self.gains.update(delta if delta > 0 else 0.0)
+        avg_loss = self.losses.update(-delta if delta < 0 else 0.0)
+
+        if self.changes < self.window:
+            return math.nan
+        if avg_loss == 0:
+            return math.nan if avg_gain == 0 else 100.0
+
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def reset(self):
+        self.gains.reset()
+        self.losses.reset()
+        self.last_price = None
+        self.changes = 0
+
+ROLLING_INDICATORS = {"sma": RollingMean, "rsi": RollingRSI}
+
+class IndicatorEngine:
+    # Incremental replacement for rebuilding a DataFrame of the whole price
+    # window on every tick. Each update is O(1) and keeps the current and
+    # previous values that execute_trading_strategy reads.
+    #
+    # Strategies can add more rolling indicators with add(kind, window); each
+    # is computed once per tick however many strategies read it, and appears
+    # in the snapshot as "<kind>_<window>" (and "prev_<kind>_<window>") once a
+    # full window is available.
+    def __init__(self, sma_50_window=50, sma_200_window=200, rsi_window=14):
+        self.sma_50_window = sma_50_window
+        self.sma_200_window = sma_200_window
+        self.sma_50 = RollingMean(sma_50_window)
+        self.sma_200 = RollingMean(sma_200_window)
+        self.rsi = RollingRSI(rsi_window)
+        self.count = 0
+        self.current = None
+        self.previous = None
+        # Snapshot keys of the built-in indicators, so adding one of them
+        # doesn't compute it twice
+        self.built_in = {f"sma_{sma_50_window}": "sma_50", f"sma_{sma_200_window}": "sma_200", f"rsi_{rsi_window}": "rsi"}
+        self.aliases = {}
+        self.extra = {}
+
+    def add(self, kind, window):
+        name = f"{kind}_{window}"
+        if name in self.built_in:
+            if name != self.built_in[name]:
+                self.aliases[name] = self.built_in[name]
+        elif name not in self.extra:
+            self.extra[name] = (ROLLING_INDICATORS[kind](window), window)
+        return name
+
+    def update(self, mid):
+        self.count += 1
+        self.previous = self.current
+        self.current = {
+            "Mid": mid,
+            "SMA_50": self.sma_50.update(mid),
+            "SMA_200": self.sma_200.update(mid),
+            "RSI": self.rsi.update(mid),
+        }
+        for name, (indicator, _) in self.extra.items():
+            self.current[name] = indicator.update(mid)
+        return self.snapshot()
+
+    def snapshot(self):
+        if self.current is None:
+            return None
+
+        # SMA_200 is only reported once a full window is available, matching
+        # the len(df) >= SMA_200_WINDOW check of the DataFrame implementation
+        has_sma_200 = self.count >= self.sma_200_window
+        previous = self.previous or {}
+        snapshot = {
+            "count": self.count,
+            "mid": self.current["Mid"],
+            "sma_50": self.current["SMA_50"],
+            "sma_200": self.current["SMA_200"] if has_sma_200 else None,
+            "rsi": self.current["RSI"],
+            "prev_mid": previous.get("Mid"),
+            "prev_sma_50": previous.get("SMA_50"),
+            "prev_sma_200": previous.get("SMA_200") if has_sma_200 else None,
+        }
+        for name, (_, window) in self.extra.items():
+            full = self.count >= window
+            snapshot[name] = self.current[name] if full else None
+            snapshot["prev_" + name] = previous.get(name) if full else None
+        for name, built_in in self.aliases.items():
+            snapshot[name] = snapshot[built_in]
+            snapshot["prev_" + name] = snapshot.get("prev_" + built_in)
+        return snapshot
+
+    def reset(self):
+        self.sma_50.reset()
+        self.sma_200.reset()
+        self.rsi.reset()
+        for indicator, _ in self.extra.values():
+            indicator.reset()
+        self.count = 0
+        self.current = None
+        self.previous = None
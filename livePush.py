@@ -0,0 +1,191 @@
+import json
+import time
+import itertools
+from threading import Thread, Event, Lock
+from flask import Response, request, jsonify
+from dash import dcc, html
+from dash.dependencies import Input, Output, State, ClientsideFunction
+import config
+import priceCharts
+from marketData import MarketDataHub, DROP_OLDEST, CONFLATE
+
+# Server-sent events channel for the live dashboard. One publisher thread
+# wakes up on quotes from the market data hub, reads the rows priceCharts has
+# appended since the last batch (with its cached indicator columns) and
+# serializes each batch once; every connected browser gets the same bytes
+# through its own bounded mailbox. Ticks are batched every BATCH_INTERVAL
+# seconds; the order store version, metrics and the orderbook only when they change.
+
+BATCH_INTERVAL = 0.1
+HEARTBEAT_INTERVAL = 15
+CLIENT_QUEUE_SIZE = 600
+# How often the browser applies buffered events; this interval only drives a
+# clientside callback and never reaches the server
+APPLY_INTERVAL = 250
+# Disconnected clients kept in /live/stats
+MAX_CLIENT_HISTORY = 100
+
+clients = MarketDataHub()
+client_ids = itertools.count(1)
+client_stats = {}
+stats_lock = Lock()
+publisher_stats = {"cpu_seconds": 0.0, "batches": 0, "ticks": 0, "bytes": 0, "started": None}
+stop_event = Event()
+
+def format_event(name, payload):
+    return f"event: {name}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode("utf-8")
+
+def publish(events):
+    if not events:
+        return
+    payload = b"".join(events)
+    publisher_stats["bytes"] += len(payload)
+    clients.publish(payload)
+
+def run_publisher(stop_event, subscription):
+    sent_index = priceCharts.appended
+    sent_orders = None
+    sent_metrics = None
+    publisher_stats["started"] = time.time()
+
+    while not stop_event.is_set():
+        first = subscription.get(timeout=1)
+        if first is not None:
+            time.sleep(BATCH_INTERVAL)
+        started = time.thread_time()
+        latest = subscription.drain()
+        last = latest[-1] if latest else first
+        events = []
+
+        rows, index = priceCharts.rows_since(sent_index)
+        count = len(rows["Timestamp"])
+        if count:
+            # Rows are numbered like the chart-index store, so pages skip the
+            # ones their first render already contained
+            events.append(format_event("ticks", dict(priceCharts.to_json_rows(rows), first=index - count + 1)))
+            publisher_stats["ticks"] += count
+        sent_index = index
+        if last is not None:
+            events.append(format_event("orderbook", {"bids": last["bids"], "asks": last["asks"], "timestamp": last["time"]}))
+
+        # Only the version of the order store is pushed; pages fetch the
+        # rows of the page they show from the server
+        orders_version = config.orders_history.version()
+        if orders_version != sent_orders:
+            events.append(format_event("orders", {"version": orders_version}))
+            sent_orders = orders_version
+
+        latest = config.snapshots.latest()["metrics"]
+        metrics = {key: latest[key] for key in ("total_pnl", "buy_avg_price", "sell_avg_price")}
+        if metrics != sent_metrics:
+            events.append(format_event("metrics", metrics))
+            sent_metrics = metrics
+
+        publish(events)
+        publisher_stats["batches"] += 1
+        publisher_stats["cpu_seconds"] += time.thread_time() - started
+
+def client_stream(client_id, mailbox):
+    # Runs on the worker thread serving this connection, and waiting on the
+    # mailbox costs no CPU, so the thread's CPU time since the stream started
+    # (including writing to the socket) is what this client costs
+    stats = client_stats[client_id]
+    thread_start = time.thread_time()
+    last_write = time.time()
+    try:
+        yield b"retry: 2000\n\n"
+        while not stop_event.is_set():
+            payload = mailbox.get(timeout=1)
+            if payload is None:
+                if time.time() - last_write < HEARTBEAT_INTERVAL:
+                    continue
+                payload = b": heartbeat\n\n"
+            stats["events"] += 1
+            stats["bytes"] += len(payload)
+            last_write = time.time()
+            yield payload
+            stats["cpu_seconds"] = time.thread_time() - thread_start
+    finally:
+        clients.unsubscribe(mailbox.name)
+        with stats_lock:
+            stats["cpu_seconds"] = time.thread_time() - thread_start
+            stats["disconnected"] = time.time()
+            stats["dropped"] = mailbox.dropped
+            disconnected = [key for key, client in client_stats.items() if client["disconnected"]]
+            for key in disconnected[:-MAX_CLIENT_HISTORY]:
+                del client_stats[key]
+        duration = stats["disconnected"] - stats["connected"]
+        print(f"Live client {client_id} disconnected after {duration:.0f} s, "
+              f"{stats['cpu_seconds'] * 1000 / max(duration, 1e-9):.2f} ms CPU/s, {stats['bytes']} bytes")
+
+def open_stream():
+    client_id = next(client_ids)
+    mailbox = clients.subscribe(f"live-{client_id}", maxsize=CLIENT_QUEUE_SIZE, policy=DROP_OLDEST)
+    with stats_lock:
+        client_stats[client_id] = {"connected": time.time(), "disconnected": None, "events": 0, "bytes": 0,
+                                   "cpu_seconds": 0.0, "dropped": 0, "address": request.remote_addr}
+    return client_id, mailbox
+
+def stats():
+    now = time.time()
+    with stats_lock:
+        per_client = {}
+        for client_id, client in client_stats.items():
+            duration = (client["disconnected"] or now) - client["connected"]
+            per_client[client_id] = dict(client, cpu_ms_per_second=client["cpu_seconds"] * 1000 / max(duration, 1e-9))
+    running = now - publisher_stats["started"] if publisher_stats["started"] else 0
+    return {
+        "connected": sum(1 for client in per_client.values() if client["disconnected"] is None),
+        "clients": per_client,
+        "publisher": dict(publisher_stats, cpu_ms_per_second=publisher_stats["cpu_seconds"] * 1000 / max(running, 1e-9)),
+    }
+
+def register_routes(server):
+    @server.route("/live/stream")
+    def live_stream():
+        client_id, mailbox = open_stream()
+        response = Response(client_stream(client_id, mailbox), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    @server.route("/live/stats")
+    def live_stats():
+        return jsonify(stats())
+
+def create_push_layout():
+    return html.Div([
+        dcc.Interval(id="push-interval", interval=APPLY_INTERVAL, n_intervals=0),
+        dcc.Store(id="push-max-points", data=config.LIVE_MAX_POINTS),
+    ])
+
+def register_callbacks(app):
+    # The server still renders the first full figures and tables from the
+    # 1 s interval; the clientside callback disables that interval as soon
+    # as the charts have data and applies pushed events from then on
+    app.clientside_callback(
+        ClientsideFunction(namespace="livePush", function_name="apply"),
+        [
+            Output("live-graph", "extendData", allow_duplicate=True),
+            Output("spread-graph", "extendData", allow_duplicate=True),
+            Output("sma-graph", "extendData", allow_duplicate=True),
+            Output("orders-pushed", "data"),
+            Output("orderbook-table", "children", allow_duplicate=True),
+            Output("total-pnl", "children", allow_duplicate=True),
+            Output("buy-avg-price", "children", allow_duplicate=True),
+            Output("sell-avg-price", "children", allow_duplicate=True),
+            Output("interval-component", "disabled"),
+        ],
+        Input("push-interval", "n_intervals"),
+        [State("chart-index", "data"), State("push-max-points", "data")],
+        prevent_initial_call=True
+    )
+
+def initialize_publisher():
+    # Ticks are read from priceCharts, so only the latest quote is needed here
+    # (to wake up and for the orderbook)
+    subscription = config.market_data.subscribe("live-push", policy=CONFLATE)
+    thread = Thread(target=run_publisher, args=(stop_event, subscription))
+    thread.daemon = True
+    thread.start()
+    return thread
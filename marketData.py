@@ -0,0 +1,150 @@
+import time
+from collections import deque
+from threading import Condition, Lock
+
+DROP_OLDEST = "drop_oldest"
+CONFLATE = "conflate"
+
+class Subscription:
+    # Bounded mailbox for one consumer. With DROP_OLDEST a slow consumer loses
+    # the oldest messages once maxsize is reached; with CONFLATE only the
+    # latest message is kept. Either way the producer never blocks.
+    def __init__(self, name, maxsize=1000, policy=DROP_OLDEST):
+        self.name = name
+        self.maxsize = 1 if policy == CONFLATE else maxsize
+        self.policy = policy
+        self.messages = deque()
+        self.condition = Condition()
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def offer(self, message):
+        with self.condition:
+            if len(self.messages) >= self.maxsize:
+                self.messages.popleft()
+                self.dropped += 1
+                if self.policy == DROP_OLDEST and self.dropped % 1000 == 1:
+                    print(f"Market data subscriber '{self.name}' is falling behind ({self.dropped} messages dropped)")
+            self.messages.append(message)
+            self.received += 1
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        with self.condition:
+            if not self.messages and not self.condition.wait_for(lambda: self.messages, timeout):
+                return None
+            self.delivered += 1
+            return self.messages.popleft()
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def drain(self):
+        with self.condition:
+            messages = list(self.messages)
+            self.messages.clear()
+            self.delivered += len(messages)
+            return messages
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "depth": len(self.messages),
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+class LatestValueChannel:
+    # Holds only the latest value and a version that increments on every put,
+    # so a slow or absent reader can never make it grow. Readers either take
+    # the latest value (and compare versions) or wait for a newer version.
+    def __init__(self, name, value=None):
+        self.name = name
+        self.value = value
+        self.version = 0
+        self.put_time = None
+        self.condition = Condition()
+        self.puts = 0
+        self.reads = 0
+        self.overwritten = 0
+        self.unread = False
+        self.last_read_age = None
+        self.max_read_age = 0.0
+
+    def put(self, value):
+        with self.condition:
+            if self.unread:
+                self.overwritten += 1
+            self.value = value
+            self.version += 1
+            self.put_time = time.time()
+            self.puts += 1
+            self.unread = True
+            self.condition.notify_all()
+
+    def latest(self):
+        with self.condition:
+            return self._read()
+
+    def wait(self, since_version, timeout=None):
+        # Latest value once its version is newer than since_version, or
+        # (None, since_version) on timeout
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.version != since_version, timeout):
+                return None, since_version
+            return self._read()
+
+    def _read(self):
+        self.reads += 1
+        self.unread = False
+        if self.put_time is not None:
+            self.last_read_age = time.time() - self.put_time
+            self.max_read_age = max(self.max_read_age, self.last_read_age)
+        return self.value, self.version
+
+    def stats(self):
+        with self.condition:
+            return {
+                "version": self.version,
+                "depth": int(self.unread),
+                "puts": self.puts,
+                "reads": self.reads,
+                "overwritten": self.overwritten,
+                "age_ms": (time.time() - self.put_time) * 1000 if self.put_time else None,
+                "last_read_age_ms": self.last_read_age * 1000 if self.last_read_age is not None else None,
+                "max_read_age_ms": self.max_read_age * 1000,
+            }
+
+class MarketDataHub:
+    # Single producer, many consumers: the data stream publishes each quote
+    # once and every subscriber (strategy, charts, orderbook panel) gets its
+    # own bounded view of it.
+    def __init__(self):
+        self.subscriptions = {}
+        self.lock = Lock()
+        self.published = 0
+        self.last_publish_time = None
+
+    def subscribe(self, name, maxsize=1000, policy=DROP_OLDEST):
+        with self.lock:
+            if name not in self.subscriptions:
+                self.subscriptions[name] = Subscription(name, maxsize, policy)
+            return self.subscriptions[name]
+
+    def unsubscribe(self, name):
+        with self.lock:
+            self.subscriptions.pop(name, None)
+
+    def publish(self, message):
+        self.published += 1
+        self.last_publish_time = time.time()
+        for subscription in tuple(self.subscriptions.values()):
+            subscription.offer(message)
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "subscribers": {name: subscription.stats() for name, subscription in tuple(self.subscriptions.items())},
+        }
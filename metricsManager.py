@@ -1,14 +1,39 @@
 import config
 import datetime
-from orderHistory import clear_order_history
+import json
+import os
+from positionLedger import PositionLedger
+from strategies import EXIT_STRATEGIES
+
+SNAPSHOT_FILE = 'ledger_snapshot.json'
+SNAPSHOT_EVERY = 100
 
 last_order_count = 0
+ledger = PositionLedger("fifo")
+# Fills applied to the ledger since startup or the daily reset, for the
+# snapshot cadence
+applied_orders = 0
 
-def update_metrics(order_type, price, quantity, strategy):
-    global last_order_count
-    
-    metrics = config.trading_metrics.copy()
-    
+def empty_metrics():
+    return {
+        "total_pnl": 0,
+        "total_buy_quantity": 0,
+        "total_sell_quantity": 0,
+        "total_buy_value": 0,
+        "total_sell_value": 0,
+        "buy_avg_price": 0,
+        "sell_avg_price": 0,
+        "position": 0,
+        "realized_pnl": 0,
+        "unrealized_pnl": 0,
+    }
+
+# Metrics of the position since the last exit, read by ProfitStopStrategy
+POSITION_FIELDS = ("total_buy_quantity", "total_sell_quantity", "total_buy_value", "total_sell_value",
+                   "buy_avg_price", "sell_avg_price")
+
+def _apply_order(metrics, order_type, price, quantity, strategy, position_ledger=None):
+    position_ledger = position_ledger or ledger
     if order_type == "BUY":
         metrics["total_buy_quantity"] += quantity
         metrics["total_buy_value"] += price * quantity
@@ -19,67 +44,138 @@ def update_metrics(order_type, price, quantity, strategy):
         metrics["total_sell_value"] += price * quantity
         if metrics["total_sell_quantity"] > 0:
             metrics["sell_avg_price"] = metrics["total_sell_value"] / metrics["total_sell_quantity"]
-    
-    min_quantity = min(metrics["total_buy_quantity"], metrics["total_sell_quantity"])
-    if min_quantity > 0 and metrics["buy_avg_price"] > 0 and metrics["sell_avg_price"] > 0:
-        metrics["total_pnl"] = (metrics["sell_avg_price"] - metrics["buy_avg_price"]) * min_quantity
-    
-    config.metrics_queue.put(metrics)
-    config.trading_metrics.update(metrics)
-    
+    else:
+        return
+
+    position_ledger.apply_fill(order_type, price, quantity, strategy)
+    metrics["position"] = position_ledger.position
+    metrics["realized_pnl"] = position_ledger.realized
+
+def _refresh_pnl(metrics, position_ledger=None):
+    position_ledger = position_ledger or ledger
+    unrealized = position_ledger.unrealized()
+    metrics["unrealized_pnl"] = unrealized
+    metrics["total_pnl"] = position_ledger.realized + unrealized
+
+def publish_metrics():
+    # Called by the writers holding config.data_lock once the metrics are
+    # consistent again. The per-strategy breakdown only changes with fills;
+    # readers revalue its open positions at the latest mid (mark_breakdown)
+    config.snapshots.publish(metrics=config.trading_metrics, strategy_pnl=ledger.strategy_breakdown())
+
+def update_metrics(order_type, price, quantity, strategy):
+    global last_order_count, applied_orders
+
+    _apply_order(config.trading_metrics, order_type, price, quantity, strategy)
+    _refresh_pnl(config.trading_metrics)
+    if strategy in EXIT_STRATEGIES:
+        start_new_position(config.trading_metrics)
+        print(f"{strategy} closed the position at {datetime.datetime.now()}, realized P&L {ledger.realized:.2f}")
+    applied_orders += 1
+
+    publish_metrics()
+
     current_order_count = len(config.orders_history)
     last_order_count = current_order_count
 
-def initialize_metrics_from_history():
-    config.trading_metrics = {
-        "total_pnl": 0,
-        "total_buy_quantity": 0,
-        "total_sell_quantity": 0,
-        "total_buy_value": 0,
-        "total_sell_value": 0,
-        "buy_avg_price": 0,
-        "sell_avg_price": 0,
+    if applied_orders % SNAPSHOT_EVERY == 0:
+        save_snapshot()
+
+def mark_to_market(mid):
+    # Called on every tick; only the unrealized part depends on the mid
+    ledger.mark(mid)
+    if ledger.position:
+        _refresh_pnl(config.trading_metrics)
+
+def save_snapshot():
+    # The ledger covers the whole order history (orders of other instruments
+    # are skipped), so its length is where the startup replay resumes. Called
+    # with config.data_lock held, after the latest order was added
+    orders = config.orders_history
+    snapshot = {
+        "saved_at": datetime.datetime.now().isoformat(),
+        "order_count": len(orders),
+        "last_order_id": orders[-1].get("order_id") if len(orders) else None,
+        "metrics": {key: value for key, value in config.trading_metrics.items() if key != "strategies"},
+        "ledger": ledger.to_dict(),
     }
-    
-    for order in config.orders_history:
+    try:
+        temporary_file = SNAPSHOT_FILE + '.tmp'
+        with open(temporary_file, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(temporary_file, SNAPSHOT_FILE)
+    except Exception as e:
+        print(f"Error saving ledger snapshot: {e}")
+
+def load_snapshot():
+    if not os.path.exists(SNAPSHOT_FILE):
+        return None
+    try:
+        with open(SNAPSHOT_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading ledger snapshot: {e}")
+        return None
+
+def initialize_metrics_from_history():
+    global applied_orders, last_order_count
+
+    orders = config.orders_history
+    snapshot = load_snapshot()
+    start = 0
+
+    # The snapshot is only valid if the history still contains the order it
+    # was taken after; otherwise fall back to a full replay
+    if snapshot and 0 < snapshot["order_count"] <= len(orders) and \
+            orders[snapshot["order_count"] - 1].get("order_id") == snapshot["last_order_id"]:
+        config.trading_metrics = empty_metrics()
+        config.trading_metrics.update(snapshot["metrics"])
+        ledger.restore(snapshot["ledger"])
+        start = snapshot["order_count"]
+    else:
+        config.trading_metrics = empty_metrics()
+        ledger.reset()
+
+    for order in orders[start:]:
+        # Orders for other instruments (multiInstrument.py) have their own ledgers
+        if order.get("instrument", config.instrument) != config.instrument:
+            continue
         try:
             order_type = order.get("type")
             price = float(order.get("price", 0))
             quantity = float(order.get("quantity", 0))
             strategy = order.get("strategy", "unknown")
-            
-            if order_type == "BUY":
-                config.trading_metrics["total_buy_quantity"] += quantity
-                config.trading_metrics["total_buy_value"] += price * quantity
-                if config.trading_metrics["total_buy_quantity"] > 0:
-                    config.trading_metrics["buy_avg_price"] = config.trading_metrics["total_buy_value"] / config.trading_metrics["total_buy_quantity"]
-            elif order_type == "SELL":
-                config.trading_metrics["total_sell_quantity"] += quantity
-                config.trading_metrics["total_sell_value"] += price * quantity
-                if config.trading_metrics["total_sell_quantity"] > 0:
-                    config.trading_metrics["sell_avg_price"] = config.trading_metrics["total_sell_value"] / config.trading_metrics["total_sell_quantity"]
+            _apply_order(config.trading_metrics, order_type, price, quantity, strategy)
+            if strategy in EXIT_STRATEGIES:
+                start_new_position(config.trading_metrics)
         except Exception as e:
             print(f"Error processing order for metrics initialization: {e}")
-    
-    min_quantity = min(config.trading_metrics["total_buy_quantity"], config.trading_metrics["total_sell_quantity"])
-    if min_quantity > 0 and config.trading_metrics["buy_avg_price"] > 0 and config.trading_metrics["sell_avg_price"] > 0:
-        config.trading_metrics["total_pnl"] = (config.trading_metrics["sell_avg_price"] - config.trading_metrics["buy_avg_price"]) * min_quantity
-    
-    print(f"Metrics initialized from {len(config.orders_history)} historical orders")
-    global last_order_count
-    last_order_count = len(config.orders_history)
-
-def reset_metrics():
-    config.trading_metrics = {
-        "total_pnl": 0,
-        "total_buy_quantity": 0,
-        "total_sell_quantity": 0,
-        "total_buy_value": 0,
-        "total_sell_value": 0,
-        "buy_avg_price": 0,
-        "sell_avg_price": 0,
-    }
-    global last_order_count
+
+    _refresh_pnl(config.trading_metrics)
+    applied_orders = 0
+
+    if start:
+        print(f"Metrics restored from snapshot of {start} orders plus {len(orders) - start} journal orders")
+    else:
+        print(f"Metrics initialized from {len(orders)} historical orders")
+    last_order_count = len(orders)
+    publish_metrics()
+    save_snapshot()
+
+def start_new_position(metrics):
+    # A Profit Booking/Stop Loss fill ends the position the exit strategy
+    # measures: its buy/sell totals and averages start over. The ledger
+    # (position and realized P&L, including the exit's) carries on, and
+    # replaying the journal at startup applies the same rule
+    for field in POSITION_FIELDS:
+        metrics[field] = 0
+
+def reset_ledger():
+    # Daily reset, after the journal was rotated
+    global applied_orders, last_order_count
+    config.trading_metrics = empty_metrics()
+    ledger.reset()
+    applied_orders = 0
     last_order_count = 0
-    clear_order_history()
-    print(f"Trading metrics reset at {datetime.datetime.now()}")
+    publish_metrics()
+    save_snapshot()
@@ -0,0 +1,106 @@
+import math
+import random
+import time
+from threading import Lock
+from oandapyV20.exceptions import V20Error
+from candleStore import GRANULARITY_SECONDS, PRICE_COMPONENTS, to_ns
+
+class MockBroker:
+    # Stand-in for oandapyV20.API in tests and offline runs. Answers OrderCreate
+    # requests with OANDA-shaped create/fill transactions after a configurable
+    # latency, filling at the price given by price_source (or the order price).
+    # InstrumentsCandles requests get deterministic synthetic candles, with
+    # OANDA's 5000 candle limit per request enforced.
+    def __init__(self, latency=0.0, fail_rate=0.0, price_source=None, seed=None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.price_source = price_source
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        self.next_id = 1
+        self.requests = []
+
+    def request(self, endpoint):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.requests.append(endpoint)
+        handler = getattr(self, f"_{endpoint.__class__.__name__}", None)
+        if handler is None:
+            raise NotImplementedError(f"MockBroker does not support {endpoint.__class__.__name__}")
+        response = handler(endpoint)
+        endpoint.response = response
+        return response
+
+    def _transaction_id(self):
+        with self.lock:
+            transaction_id = str(self.next_id)
+            self.next_id += 1
+            return transaction_id
+
+    def _OrderCreate(self, endpoint):
+        order = endpoint.data["order"]
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            return {
+                "orderRejectTransaction": {"id": self._transaction_id(), "type": "MARKET_ORDER_REJECT"},
+                "errorMessage": "Mock rejection"
+            }
+
+        units = float(order["units"])
+        instrument = order["instrument"]
+        fill_price = self.price_source(instrument, units) if self.price_source else None
+        order_id = self._transaction_id()
+        create_transaction = {"id": order_id, "type": "MARKET_ORDER", "instrument": instrument, "units": order["units"]}
+        if fill_price is None:
+            return {"orderCreateTransaction": create_transaction}
+        return {
+            "orderCreateTransaction": create_transaction,
+            "orderFillTransaction": {
+                "id": self._transaction_id(),
+                "orderID": order_id,
+                "type": "ORDER_FILL",
+                "instrument": instrument,
+                "units": order["units"],
+                "price": f"{fill_price:.5f}"
+            }
+        }
+
+    def _InstrumentsCandles(self, endpoint):
+        params = endpoint.params
+        granularity = params.get("granularity", "S5")
+        step = GRANULARITY_SECONDS[granularity] * 10**9
+        now = time.time_ns()
+        first = -(-to_ns(params["from"]) // step) * step
+        if "to" in params:
+            end = min(to_ns(params["to"]), now + 1)
+            count = max(0, -(-(end - first) // step))
+        else:
+            count = int(params.get("count", 500))
+            count = max(0, min(count, (now - first) // step + 1))
+        if count > 5000:
+            raise V20Error(400, '{"errorMessage":"Maximum value for \'count\' exceeded"}')
+
+        candles = []
+        for i in range(count):
+            start = first + i * step
+            candle = {
+                "time": f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(start // 10**9))}.000000000Z",
+                "volume": 1 + start // step % 97,
+                "complete": start + step <= now,
+            }
+            close = self._candle_price(start)
+            open_price = self._candle_price(start - step)
+            for letter in params.get("price", "M"):
+                offset = {"B": -0.00005, "A": 0.00005, "M": 0.0}[letter]
+                candle[PRICE_COMPONENTS[letter]] = {
+                    "o": f"{open_price + offset:.5f}",
+                    "h": f"{max(open_price, close) + 0.0002 + offset:.5f}",
+                    "l": f"{min(open_price, close) - 0.0002 + offset:.5f}",
+                    "c": f"{close + offset:.5f}",
+                }
+            candles.append(candle)
+        return {"instrument": str(endpoint).split("/")[2], "granularity": granularity, "candles": candles}
+
+    def _candle_price(self, timestamp):
+        seconds = timestamp / 10**9
+        return 1.08 + 0.02 * math.sin(seconds / 2592000) + 0.002 * math.sin(seconds / 3600)
@@ -0,0 +1,332 @@
+import argparse
+import multiprocessing
+import signal
+import time
+from collections import deque
+from threading import Thread, Event, Lock
+import numpy as np
+import oandapyV20.endpoints.pricing as pricing
+import config
+import orderManager
+from indicators import IndicatorEngine
+from metricsManager import empty_metrics, start_new_position, _apply_order, _refresh_pnl
+from orderHistory import journal, load_orders
+from positionLedger import PositionLedger
+from priceBuffer import PriceRingBuffer
+from priceStream import stream_prices, StreamStats
+from strategies import registry as strategy_registry, EXIT_STRATEGIES
+
+# Trades the crossover strategy on many instruments at once. Quotes for all
+# instruments arrive on one pricing stream (or one batched PricingInfo request
+# per poll); each instrument is owned by one shard process with its own tick
+# buffer, indicators and position ledger, so the strategy runs on all cores.
+# The parent batches quotes per shard, places the shards' orders through the
+# order gateway and routes fills back to the shard that owns the instrument:
+#
+#   python multiInstrument.py --instruments EUR_USD,GBP_USD,USD_JPY,AUD_USD --workers 4
+
+# Quotes are sent to a shard at most this often, in one message
+BATCH_INTERVAL = 0.01
+REPORT_INTERVAL = 10
+SHARD_BUFFER_CAPACITY = 10000
+LATENCY_SAMPLES = 10000
+
+def assign_shards(instruments, workers):
+    # Round-robin over the sorted names, so the same instruments always land
+    # on the same shard
+    shards = [[] for _ in range(max(1, min(workers, len(instruments))))]
+    for i, instrument in enumerate(sorted(instruments)):
+        shards[i % len(shards)].append(instrument)
+    return shards
+
+def orders_by_instrument(orders, instruments):
+    by_instrument = {instrument: [] for instrument in instruments}
+    for order in orders:
+        instrument = order.get("instrument", config.instrument)
+        if instrument in by_instrument:
+            by_instrument[instrument].append(order)
+    return by_instrument
+
+class InstrumentState:
+    def __init__(self, instrument, orders=(), capacity=SHARD_BUFFER_CAPACITY):
+        self.instrument = instrument
+        self.prices = PriceRingBuffer(capacity)
+        # Shards run the strategies registered in strategies.py
+        self.indicators = strategy_registry.attach(
+            IndicatorEngine(config.SMA_50_WINDOW, config.SMA_200_WINDOW, config.RSI_WINDOW))
+        self.ledger = PositionLedger("fifo")
+        self.metrics = empty_metrics()
+        self.exits_in_flight = 0
+        self.ticks = 0
+        self.orders = 0
+        self.window_ticks = 0
+        self.first_tick = None
+        self.last_tick = None
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        for order in orders:
+            self.apply_fill(order)
+
+    def apply_fill(self, order):
+        # Same rule as the dashboard's metrics (metricsManager.update_metrics)
+        strategy = order.get("strategy", "unknown")
+        _apply_order(self.metrics, order["type"], float(order["price"]), float(order["quantity"]), strategy, self.ledger)
+        _refresh_pnl(self.metrics, self.ledger)
+        if strategy in EXIT_STRATEGIES:
+            start_new_position(self.metrics)
+
+    def on_quote(self, timestamp, bid, ask, received):
+        mid = (bid + ask) / 2
+        self.prices.append(timestamp, bid, ask, mid)
+        indicators = self.indicators.update(mid)
+        self.ledger.mark(mid)
+        if self.ledger.position:
+            _refresh_pnl(self.metrics, self.ledger)
+
+        intents = []
+        if indicators["count"] > 1:
+            intents = strategy_registry.evaluate(indicators, bid, ask, self.metrics, self.exits_in_flight)
+            self.exits_in_flight += sum(1 for intent in intents if intent[3] in EXIT_STRATEGIES)
+            self.orders += len(intents)
+
+        self.ticks += 1
+        self.window_ticks += 1
+        self.last_tick = time.perf_counter()
+        self.first_tick = self.first_tick or self.last_tick
+        # perf_counter is system-wide monotonic, so the parent's receive time
+        # is comparable here
+        self.latencies.append(time.perf_counter() - received)
+        return intents
+
+    def on_fill(self, order):
+        if order["strategy"] in EXIT_STRATEGIES:
+            self.exits_in_flight = max(0, self.exits_in_flight - 1)
+        self.apply_fill(order)
+
+    def on_rejected(self, strategy):
+        if strategy in EXIT_STRATEGIES:
+            self.exits_in_flight = max(0, self.exits_in_flight - 1)
+
+    def stats(self, elapsed):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        stats = {
+            "ticks": self.ticks,
+            "ticks_per_second": round(self.window_ticks / max(elapsed, 1e-9), 2),
+            "average_ticks_per_second": round(self.ticks / max(self.last_tick - self.first_tick, 1e-9), 2) if self.ticks > 1 else 0.0,
+            "latency_p50_ms": round(float(p50), 3),
+            "latency_p99_ms": round(float(p99), 3),
+            "orders": self.orders,
+            "position": self.metrics["position"],
+            "total_pnl": round(self.metrics["total_pnl"], 2),
+        }
+        self.window_ticks = 0
+        return stats
+
+def run_shard(shard, instruments, orders, inbox, outbox, report_interval=REPORT_INTERVAL):
+    states = {instrument: InstrumentState(instrument, orders.get(instrument, ())) for instrument in instruments}
+    outbox.put(("ready", shard, None))
+    last_report = time.perf_counter()
+    while True:
+        try:
+            message = inbox.get(timeout=report_interval or None)
+        except Exception:
+            message = ()
+        if message is None:
+            break
+
+        kind = message[0] if message else None
+        if kind == "quotes":
+            intents = []
+            for instrument, timestamp, bid, ask, received in message[1]:
+                for intent in states[instrument].on_quote(timestamp, bid, ask, received):
+                    intents.append((instrument,) + intent)
+            if intents:
+                outbox.put(("orders", shard, intents))
+        elif kind == "fill":
+            states[message[1]["instrument"]].on_fill(message[1])
+        elif kind == "rejected":
+            states[message[1]].on_rejected(message[2])
+
+        now = time.perf_counter()
+        if kind == "report" or (report_interval and now - last_report >= report_interval):
+            elapsed = now - last_report
+            last_report = now
+            outbox.put(("stats", shard, {instrument: state.stats(elapsed) for instrument, state in states.items()}))
+    outbox.put(("stopped", shard, None))
+
+class MultiInstrumentEngine:
+    def __init__(self, instruments, workers=None, report_interval=REPORT_INTERVAL, place_order=None):
+        self.shards = assign_shards(instruments, workers or config.SHARD_WORKERS)
+        self.shard_of = {instrument: i for i, names in enumerate(self.shards) for instrument in names}
+        self.report_interval = report_interval
+        self.place_order = place_order or orderManager.place_order
+        # Spawned, so shards never inherit the parent's threads and locks
+        self.context = multiprocessing.get_context("spawn")
+        self.inboxes = [self.context.Queue() for _ in self.shards]
+        self.outbox = self.context.Queue()
+        self.processes = []
+        self.pending = [[] for _ in self.shards]
+        self.lock = Lock()
+        self.stop_event = Event()
+        self.threads = []
+        self.stats = {}
+        self.stopped = 0
+        self.received = 0
+
+    def start(self, orders=()):
+        by_instrument = orders_by_instrument(orders, self.shard_of)
+        for shard, instruments in enumerate(self.shards):
+            shard_orders = {instrument: by_instrument[instrument] for instrument in instruments}
+            process = self.context.Process(target=run_shard, name=f"shard-{shard}", daemon=True,
+                                           args=(shard, instruments, shard_orders, self.inboxes[shard], self.outbox,
+                                                 self.report_interval))
+            process.start()
+            self.processes.append(process)
+        # Quotes sent before a shard has started would only queue up
+        ready = 0
+        while ready < len(self.shards):
+            kind, shard, payload = self.outbox.get()
+            ready += kind == "ready"
+
+        # Fills of every instrument go to its shard instead of the dashboard's metrics
+        orderManager.fill_listeners[:] = [self.on_fill]
+        for target in (self.flush_quotes, self.handle_results):
+            thread = Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"Trading {len(self.shard_of)} instruments on {len(self.shards)} shards: "
+              + "; ".join(",".join(names) for names in self.shards))
+
+    def on_price(self, price):
+        shard = self.shard_of.get(price.get("instrument"))
+        if shard is None or price.get("placeholder"):
+            return
+        quote = (price["instrument"], price["time"], float(price["bids"][0]["price"]),
+                 float(price["asks"][0]["price"]), price.get("received") or time.perf_counter())
+        with self.lock:
+            self.pending[shard].append(quote)
+            self.received += 1
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, [[] for _ in self.shards]
+        for shard, quotes in enumerate(pending):
+            if quotes:
+                self.inboxes[shard].put(("quotes", quotes))
+
+    def flush_quotes(self):
+        while not self.stop_event.wait(BATCH_INTERVAL):
+            self.flush()
+
+    def on_fill(self, order):
+        shard = self.shard_of.get(order["instrument"])
+        if shard is not None:
+            self.inboxes[shard].put(("fill", order))
+
+    def on_order_done(self, shard, instrument, strategy):
+        def callback(future):
+            if future.exception() is not None or not future.result():
+                self.inboxes[shard].put(("rejected", instrument, strategy))
+        return callback
+
+    def handle_results(self):
+        while self.stopped < len(self.shards):
+            try:
+                kind, shard, payload = self.outbox.get(timeout=1)
+            except Exception:
+                continue
+            if kind == "orders":
+                for instrument, order_type, price, quantity, strategy in payload:
+                    try:
+                        self.place_order(order_type, price, quantity, strategy,
+                                         self.on_order_done(shard, instrument, strategy), instrument)
+                    except Exception as e:
+                        print(f"Error placing {strategy} order for {instrument}: {e}")
+            elif kind == "stats":
+                self.stats.update(payload)
+            elif kind == "stopped":
+                self.stopped += 1
+
+    def request_stats(self):
+        for inbox in self.inboxes:
+            inbox.put(("report",))
+
+    def report(self):
+        lines = []
+        for instrument in sorted(self.stats):
+            stats = self.stats[instrument]
+            lines.append(f"  {instrument} (shard {self.shard_of[instrument]}): {stats['ticks']} ticks, "
+                         f"{stats['ticks_per_second']:.1f} ticks/s ({stats['average_ticks_per_second']:.1f} average), latency p50 {stats['latency_p50_ms']:.3f} ms "
+                         f"p99 {stats['latency_p99_ms']:.3f} ms, {stats['orders']} orders, "
+                         f"position {stats['position']:.0f}, P&L {stats['total_pnl']:.2f}")
+        total = sum(stats["ticks_per_second"] for stats in self.stats.values())
+        print(f"Multi-instrument stats: {self.received} quotes received, {total:.1f} ticks/s\n" + "\n".join(lines))
+
+    def stop(self, timeout=10):
+        self.stop_event.set()
+        self.flush()
+        # Shards send their final stats before stopping
+        self.request_stats()
+        for inbox in self.inboxes:
+            inbox.put(None)
+        for thread in self.threads:
+            thread.join(timeout)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+def poll_prices(stop_event, on_price, instruments, interval=1.0):
+    # One PricingInfo request for all instruments per poll
+    r = pricing.PricingInfo(accountID=config.account_id, params={"instruments": ",".join(instruments)})
+    retry_count = 0
+    while not stop_event.is_set():
+        try:
+            response = config.client.request(r)
+            received = time.perf_counter()
+            for price in response.get("prices", []):
+                price["received"] = received
+                on_price(price)
+            retry_count = 0
+        except Exception as e:
+            retry_count += 1
+            delay = min(2 * 1.5 ** (retry_count - 1), 30)
+            print(f"Error polling prices: {e} (Attempt {retry_count}, waiting {delay:.1f}s)")
+            stop_event.wait(delay)
+            continue
+        stop_event.wait(interval)
+
+def report_stats(stop_event, engine):
+    while not stop_event.wait(engine.report_interval):
+        engine.report()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trade the crossover strategy on several instruments across processes")
+    parser.add_argument("--instruments", default=",".join(config.INSTRUMENTS), help="comma separated instruments")
+    parser.add_argument("--workers", type=int, default=config.SHARD_WORKERS, help="shard processes")
+    parser.add_argument("--source", choices=["poll", "stream"], default=config.PRICE_SOURCE)
+    parser.add_argument("--duration", type=float, default=0, help="seconds to run, 0 until interrupted")
+    args = parser.parse_args()
+
+    instruments = [name for name in args.instruments.split(",") if name]
+    engine = MultiInstrumentEngine(instruments, args.workers)
+    engine.start(load_orders())
+
+    stop_event = Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    if args.duration:
+        Thread(target=lambda: stop_event.wait(args.duration) or stop_event.set(), daemon=True).start()
+    Thread(target=report_stats, args=(stop_event, engine), daemon=True).start()
+
+    try:
+        if args.source == "stream":
+            stream_prices(stop_event, engine.on_price, instruments, stream_stats=StreamStats(report_interval=0))
+        else:
+            poll_prices(stop_event, engine.on_price, instruments)
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        engine.stop()
+        orderManager.gateway.stop()
+        journal.close()
+        engine.report()
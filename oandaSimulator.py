@@ -0,0 +1,274 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import oandapyV20.endpoints.orders as orders
+from oandapyV20.endpoints.instruments import InstrumentsCandles
+from oandapyV20.exceptions import V20Error
+from mockBroker import MockBroker
+from replayServer import ReplayFeed, ReplayHandler, interleave_ticks, load_ticks, oanda_time, stop_server
+
+# Local stand-in for the parts of the OANDA v20 REST API the app uses, for
+# load tests without a network:
+#
+#   GET  /v3/accounts/<id>/pricing              latest quote per instrument
+#   GET  /v3/accounts/<id>/pricing/stream       chunked PRICE/HEARTBEAT stream
+#   POST /v3/accounts/<id>/orders               market orders, filled by MockBroker
+#   GET  /v3/instruments/<instrument>/candles   MockBroker's synthetic candles
+#   GET  /stats                                 request, error and tick counters
+#
+# Unlike replayServer, the market moves on its own at --rate ticks/s and every
+# stream connection sees every tick. Each request can be delayed (--latency),
+# fail with a 503 (--error-rate) or be refused with a 429 once the token
+# bucket (--rate-limit requests/s) is empty:
+#
+#   python oandaSimulator.py --instrument EUR_USD,GBP_USD --rate 500 --latency 0.02 --rate-limit 100
+#   oanda_api_url=http://127.0.0.1:8081 price_source=stream python app.py
+
+STREAM_HISTORY = 10000
+
+class Market:
+    # Advances the replay feed at a fixed rate and keeps the recent ticks, so
+    # any number of stream connections can follow it
+    def __init__(self, feed, rate):
+        self.feed = feed
+        self.rate = rate
+        self.ticks = deque(maxlen=STREAM_HISTORY)
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.stopping = False
+
+    def run(self):
+        interval = 1.0 / self.rate if self.rate else 0
+        next_tick = time.perf_counter()
+        while not self.stopping:
+            tick = self.feed.next_tick()
+            if tick is None:
+                break
+            with self.condition:
+                self.ticks.append(tick)
+                self.sequence += 1
+                self.condition.notify_all()
+            if interval:
+                next_tick += interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+
+    def wait(self, seen, timeout):
+        # Ticks after sequence number seen (at most STREAM_HISTORY of them)
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > seen or self.stopping, timeout)
+            missed = min(self.sequence - seen, len(self.ticks))
+            return list(self.ticks)[len(self.ticks) - missed:], self.sequence
+
+class RateLimiter:
+    # Token bucket shared by all connections, refilled at rate per second
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.perf_counter()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+class SimulatorHandler(ReplayHandler):
+    def count(self, key):
+        with self.server.stats_lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def admit(self, endpoint):
+        # Rate limit, error injection and latency, applied to every request
+        server = self.server
+        self.count(f"requests.{endpoint}")
+        if not server.limiter.allow():
+            self.count("rate_limited")
+            self.send_json({"errorMessage": "Requests are being rate limited"}, status=429, headers={"Retry-After": "1"})
+            return False
+        if server.error_rate and server.random.random() < server.error_rate:
+            self.count("injected_errors")
+            self.send_json({"errorMessage": "Service unavailable (injected)"}, status=503)
+            return False
+        if server.latency:
+            time.sleep(server.latency)
+        return True
+
+    def send_json(self, body, status=200, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        instruments = query.get("instruments", "").split(",")
+        candles = re.match(r"^/v3/instruments/([^/]+)/candles$", url.path)
+
+        if url.path == "/stats":
+            self.send_json(self.server.summary())
+        elif url.path.endswith("/pricing/stream"):
+            if self.admit("stream"):
+                self.stream_prices(instruments)
+        elif url.path.endswith("/pricing"):
+            if self.admit("pricing"):
+                latest = self.server.feed.latest
+                prices = [latest[instrument] for instrument in instruments if instrument in latest]
+                self.send_json({"time": oanda_time(), "prices": prices})
+        elif candles:
+            if self.admit("candles"):
+                self.broker_request(InstrumentsCandles(instrument=candles.group(1), params=query))
+        else:
+            self.send_json({"errorMessage": f"Unknown endpoint {url.path}"}, status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        account = re.match(r"^/v3/accounts/([^/]+)/orders$", url.path)
+        if not account:
+            self.send_json({"errorMessage": f"Unknown endpoint {url.path}"}, status=404)
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.admit("orders"):
+            self.broker_request(orders.OrderCreate(accountID=account.group(1), data=json.loads(body or b"{}")), status=201)
+
+    def broker_request(self, endpoint, status=200):
+        try:
+            response = self.server.broker.request(endpoint)
+        except V20Error as e:
+            self.send_json({"errorMessage": str(e)}, status=e.code)
+            return
+        if "orderRejectTransaction" in response:
+            self.count("orders_rejected")
+            status = 400
+        elif "orderFillTransaction" in response:
+            self.count("orders_filled")
+        self.send_json(response, status=status)
+
+    def stream_prices(self, instruments):
+        server = self.server
+        market = server.market
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        wanted = set(instruments)
+        seen = market.sequence
+        last_heartbeat = time.perf_counter()
+        with server.stats_lock:
+            server.streams += 1
+        try:
+            while not server.stopping and not market.stopping:
+                ticks, seen = market.wait(seen, timeout=server.heartbeat_interval)
+                for tick in ticks:
+                    if tick["instrument"] in wanted:
+                        self.write_chunk(tick)
+                        self.count("ticks_streamed")
+                now = time.perf_counter()
+                if now - last_heartbeat >= server.heartbeat_interval:
+                    self.write_chunk({"type": "HEARTBEAT", "time": oanda_time()})
+                    last_heartbeat = now
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with server.stats_lock:
+                server.streams -= 1
+        self.close_connection = True
+
+class SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def summary(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        elapsed = time.perf_counter() - self.started
+        return dict(stats, open_streams=self.streams, ticks=self.market.sequence,
+                    ticks_per_second=round(self.market.sequence / max(elapsed, 1e-9), 1),
+                    uptime_seconds=round(elapsed, 1))
+
+def create_simulator(ticks, host="127.0.0.1", port=8081, rate=100.0, latency=0.0, error_rate=0.0,
+                     rate_limit=0, reject_rate=0.0, heartbeat_interval=5.0, loop=True, seed=None):
+    server = SimulatorServer((host, port), SimulatorHandler)
+    server.feed = ReplayFeed(ticks, rate=rate, loop=loop)
+    server.market = Market(server.feed, rate)
+    # Orders fill at the simulated market's current quote
+    server.broker = MockBroker(fail_rate=reject_rate, seed=seed, price_source=lambda instrument, units: _fill_price(server.feed, instrument, units))
+    server.limiter = RateLimiter(rate_limit)
+    server.latency = latency
+    server.error_rate = error_rate
+    server.random = random.Random(seed)
+    server.heartbeat_interval = heartbeat_interval
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    server.streams = 0
+    server.stopping = False
+    server.started = time.perf_counter()
+    return server
+
+def _fill_price(feed, instrument, units):
+    quote = feed.latest.get(instrument)
+    if quote is None:
+        return None
+    return float(quote["asks"][0]["price"] if units > 0 else quote["bids"][0]["price"])
+
+def start_simulator(ticks, **kwargs):
+    server = create_simulator(ticks, **kwargs)
+    threading.Thread(target=server.market.run, daemon=True).start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def stop_simulator(server):
+    server.market.stopping = True
+    stop_server(server)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OANDA v20 API simulator for load tests")
+    parser.add_argument("--file", help="JSON Lines file of PRICE messages (random walk if omitted)")
+    parser.add_argument("--instrument", default="EUR_USD", help="comma separated instruments for generated ticks")
+    parser.add_argument("--ticks", type=int, default=100000, help="generated ticks per instrument")
+    parser.add_argument("--rate", type=float, default=100.0, help="ticks per second across all instruments")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests per second before 429s, 0 for none")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fraction of orders rejected")
+    parser.add_argument("--heartbeat", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    ticks = load_ticks(args.file) if args.file else interleave_ticks(args.ticks, args.instrument.split(","))
+    server = create_simulator(ticks, port=args.port, rate=args.rate, latency=args.latency, error_rate=args.error_rate,
+                              rate_limit=args.rate_limit, reject_rate=args.reject_rate,
+                              heartbeat_interval=args.heartbeat, seed=args.seed)
+    threading.Thread(target=server.market.run, daemon=True).start()
+    print(f"Simulating OANDA at {args.rate} ticks/s on http://127.0.0.1:{args.port} (stats at /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_simulator(server)
@@ -0,0 +1,114 @@
+import time
+from concurrent.futures import Future
+from queue import Queue
+from threading import Thread, Lock
+
+class OrderTicket:
+    # One order on its way through the gateway, with the timestamps (ns) used
+    # for signal-to-fill latency reporting
+    def __init__(self, order_type, price, quantity, strategy, instrument):
+        self.order_type = order_type
+        self.price = price
+        self.quantity = quantity
+        self.strategy = strategy
+        self.instrument = instrument
+        self.signal_time = time.time_ns()
+        self.sent_time = None
+        self.acked_time = None
+        self.filled_time = None
+        self.future = Future()
+
+    def latency_ms(self):
+        def elapsed(end):
+            return round((end - self.signal_time) / 1e6, 3) if end else None
+        return {
+            "sent": elapsed(self.sent_time),
+            "acked": elapsed(self.acked_time),
+            "filled": elapsed(self.filled_time),
+        }
+
+class OrderGateway:
+    # Orders are queued by the strategy and sent by a pool of worker threads,
+    # each holding its own API client so connections stay alive between
+    # orders. The tick loop never waits for an HTTP round trip.
+    def __init__(self, client_factory, execute, workers=4):
+        self.client_factory = client_factory
+        self.execute = execute
+        self.workers = workers
+        self.queue = Queue()
+        self.threads = []
+        self.lock = Lock()
+        self.in_flight = {}
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                thread = Thread(target=self._work, args=(self.client_factory(),), name=f"order-worker-{i}")
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, order_type, price, quantity, strategy, instrument, callback=None):
+        self.start()
+        ticket = OrderTicket(order_type, price, quantity, strategy, instrument)
+        if callback:
+            ticket.future.add_done_callback(callback)
+        with self.lock:
+            self.submitted += 1
+            self.in_flight[strategy] = self.in_flight.get(strategy, 0) + 1
+        self.queue.put(ticket)
+        return ticket.future
+
+    def pending(self, strategy=None):
+        with self.lock:
+            if strategy is None:
+                return sum(self.in_flight.values())
+            return self.in_flight.get(strategy, 0)
+
+    def _work(self, client):
+        while True:
+            ticket = self.queue.get()
+            if ticket is None:
+                self.queue.task_done()
+                break
+            try:
+                result = self.execute(client, ticket)
+            except Exception as e:
+                print(f"Unexpected error in order worker: {e}")
+                result = False
+            # Callbacks run before the order stops counting as in flight, so
+            # pending() never reports zero while its effects are being applied
+            ticket.future.set_result(result)
+            with self.lock:
+                self.in_flight[ticket.strategy] -= 1
+                self.completed += 1
+                if not result:
+                    self.failed += 1
+            self.queue.task_done()
+
+    def join(self):
+        # Waits until every order submitted so far has completed
+        self.queue.join()
+
+    def stop(self):
+        with self.lock:
+            threads, self.threads = self.threads, []
+        for _ in threads:
+            self.queue.put(None)
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "in_flight": sum(self.in_flight.values()),
+                "queued": self.queue.qsize(),
+            }
@@ -1,33 +1,206 @@
+import glob
 import json
 import os
 import datetime
+from threading import Lock, Timer
 
-ORDER_HISTORY_FILE = 'order_history.json'
+ORDER_HISTORY_FILE = 'order_history.jsonl'
+# Whole-list JSON file written by earlier versions, still read at startup
+LEGACY_ORDER_HISTORY_FILE = 'order_history.json'
 
-def save_orders(orders):
+FSYNC_EVERY = 64
+FSYNC_INTERVAL = 1.0
+# Archived journals kept by the daily rotation, one per trading day
+ARCHIVE_RETENTION = 30
+
+class OrderJournal:
+    # Append-only JSON Lines journal. Each order is one line written and
+    # flushed immediately; fsync is batched every FSYNC_EVERY records or
+    # FSYNC_INTERVAL seconds. A crash can at worst leave a torn last line,
+    # which the loader skips.
+    def __init__(self, path, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.lock = Lock()
+        self.file = None
+        self.unsynced = 0
+        self.sync_timer = None
+
+    def _open(self):
+        if self.file is None:
+            self.file = open(self.path, 'ab')
+        return self.file
+
+    def append(self, record):
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self.lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every:
+                self._sync()
+            elif self.sync_timer is None and self.fsync_interval:
+                self.sync_timer = Timer(self.fsync_interval, self.sync)
+                self.sync_timer.daemon = True
+                self.sync_timer.start()
+
+    def _sync(self):
+        if self.sync_timer is not None:
+            self.sync_timer.cancel()
+            self.sync_timer = None
+        if self.file is not None and self.unsynced:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    def close(self):
+        with self.lock:
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def rotate(self, archive_path):
+        # os.replace is atomic, so readers see either the full old journal or
+        # the archived one plus a fresh empty journal, never a partial file
+        with self.lock:
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                os.replace(self.path, archive_path)
+                return archive_path
+            return None
+
+journal = OrderJournal(ORDER_HISTORY_FILE)
+
+def append_order(order):
     try:
-        with open(ORDER_HISTORY_FILE, 'w') as f:
-            json.dump(orders, f)
+        journal.append(order)
     except Exception as e:
-        print(f"Error saving orders to file: {e}")
+        print(f"Error appending order to journal: {e}")
 
-def load_orders():
-    if not os.path.exists(ORDER_HISTORY_FILE):
+def _parse_lines(content, path):
+    lines = [line for line in content.split(b'\n') if line.strip()]
+    if not lines:
         return []
-    
+
+    # Parse the whole journal in a single json.loads call; fall back to line
+    # by line only if a torn write left an unparsable line behind
+    try:
+        return json.loads(b'[' + b','.join(lines) + b']')
+    except ValueError:
+        orders = []
+        for number, line in enumerate(lines, 1):
+            try:
+                orders.append(json.loads(line))
+            except ValueError:
+                print(f"Skipping corrupt line {number} in {path}")
+        return orders
+
+def read_journal(path):
+    if not os.path.exists(path):
+        return []
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    return _parse_lines(content, path)
+
+class JournalTail:
+    # Follows the journal from another process while it is being appended
+    # to. The file stays open, so when the journal is rotated the orders
+    # written to it before the rotation are still read from the archived file
+    # (up to EOF) before switching to the new journal.
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.partial = b''
+
+    def _read(self):
+        content = self.partial + self.file.read()
+        end = content.rfind(b'\n') + 1
+        self.partial = content[end:]
+        return _parse_lines(content[:end], self.path)
+
+    def read(self):
+        orders = []
+        if self.file is not None:
+            # Checked before reading: once the journal was replaced nothing
+            # more is appended to this file, so reading to EOF drains it
+            try:
+                rotated = os.stat(self.path).st_ino != os.fstat(self.file.fileno()).st_ino
+            except FileNotFoundError:
+                rotated = True
+            orders.extend(self._read())
+            if not rotated:
+                return orders
+            self.close()
+        try:
+            self.file = open(self.path, 'rb')
+        except FileNotFoundError:
+            # The journal is created on the first order after a rotation
+            return orders
+        orders.extend(self._read())
+        return orders
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.partial = b''
+
+def load_legacy_orders():
     try:
-        with open(ORDER_HISTORY_FILE, 'r') as f:
-            loaded_orders = json.load(f)
-            return loaded_orders if isinstance(loaded_orders, list) else []
+        if os.path.exists(LEGACY_ORDER_HISTORY_FILE):
+            with open(LEGACY_ORDER_HISTORY_FILE, 'r') as f:
+                loaded_orders = json.load(f)
+                if isinstance(loaded_orders, list):
+                    return loaded_orders
     except Exception as e:
         print(f"Error loading orders from file: {e}")
-        return []
+    return []
+
+def load_orders():
+    orders = load_legacy_orders()
+
+    try:
+        orders.extend(read_journal(journal.path))
+    except Exception as e:
+        print(f"Error loading orders from journal: {e}")
+    return orders
+
+def archive_paths():
+    # Oldest first; the timestamp suffix sorts chronologically
+    return sorted(glob.glob(f"{glob.escape(os.path.splitext(journal.path)[0])}-*.jsonl"))
+
+def prune_archives(keep=ARCHIVE_RETENTION):
+    for path in archive_paths()[:-keep or None]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Error removing old order history {path}: {e}")
 
 def clear_order_history():
+    # Only called by the daily reset (scheduler.reset_application_data)
     try:
-        if os.path.exists(ORDER_HISTORY_FILE):
-            with open(ORDER_HISTORY_FILE, 'w') as f:
+        suffix = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        archive_path = f"{os.path.splitext(journal.path)[0]}-{suffix}.jsonl"
+        archived = journal.rotate(archive_path)
+        prune_archives()
+
+        if os.path.exists(LEGACY_ORDER_HISTORY_FILE):
+            with open(LEGACY_ORDER_HISTORY_FILE, 'w') as f:
                 json.dump([], f)
+
+        if archived:
+            print(f"Order history rotated to {archived} at {datetime.datetime.now()}")
+        else:
             print(f"Order history file cleared at {datetime.datetime.now()}")
     except Exception as e:
-        print(f"Error clearing order history file: {e}")
\ No newline at end of file
+        print(f"Error clearing order history file: {e}")
@@ -1,68 +1,98 @@
-import datetime
+import time
+import oandapyV20
+import clock
 import config
 from metricsManager import update_metrics
 import oandapyV20.endpoints.orders as orders
-from orderHistory import save_orders
+from orderHistory import append_order
+from orderGateway import OrderGateway
 
-def place_order(order_type, price, quantity, strategy):
+def create_order_client():
+    return oandapyV20.API(access_token=config.access_token, environment=config.environment)
+
+def execute_order(client, ticket):
+    order_type = ticket.order_type
+    price = ticket.price
+    quantity = ticket.quantity
+    strategy = ticket.strategy
     try:
         units = str(quantity) if order_type == "BUY" else str(-quantity)
         order_data = {
             "order": {
                 "units": units,
-                "instrument": config.instrument,
+                "instrument": ticket.instrument,
                 "timeInForce": "FOK",
                 "type": "MARKET",
                 "positionFill": "DEFAULT"
             }
         }
-        
+
         try:
             print(f"Attempting to place {order_type} order for {quantity} units at {price} - Strategy: {strategy}")
             order_request = orders.OrderCreate(accountID=config.account_id, data=order_data)
-            response = config.client.request(order_request)
-            
+            ticket.sent_time = time.time_ns()
+            response = client.request(order_request)
+            ticket.acked_time = time.time_ns()
+
             if "orderCreateTransaction" not in response:
                 print(f"Order creation failed: 'orderCreateTransaction' not in response. Response: {response}")
                 return False
-            
+
             order_id = response["orderCreateTransaction"]["id"]
             execution_price = price
-            
+
             if "orderFillTransaction" in response and "price" in response["orderFillTransaction"]:
                 execution_price = float(response["orderFillTransaction"]["price"])
                 print(f"Order filled at price: {execution_price}")
             elif "price" in response["orderCreateTransaction"]:
                 execution_price = float(response["orderCreateTransaction"]["price"])
                 print(f"Order created at price: {execution_price}")
-            
-            order_time = datetime.datetime.now()
+
+            order_time = clock.now()
+            ticket.filled_time = time.time_ns()
             order_record = {
                 "order_id": order_id,
                 "type": order_type,
                 "quantity": quantity,
                 "price": execution_price,
                 "timestamp": order_time.isoformat(),
-                "instrument": config.instrument,
-                "strategy": strategy
+                "instrument": ticket.instrument,
+                "strategy": strategy,
+                "latency_ms": ticket.latency_ms()
             }
-            
-            config.orders_queue.put(order_record)
-            print(f"Order successfully placed and added to queue: {order_record}")
-            
-            for existing_order in config.orders_history:
-                if existing_order["order_id"] == order_id:
+
+            print(f"Order successfully placed: {order_record}")
+
+            with config.data_lock:
+                if not config.orders_history.add(order_record):
                     return True
-            config.orders_history.append(order_record)
-            save_orders(config.orders_history)
-        
-            update_metrics(order_type, execution_price, quantity, strategy)
+                append_order(order_record)
+
+                for listener in fill_listeners:
+                    listener(order_record)
             return True
-            
+
         except Exception as api_error:
             print(f"API error when placing order: {api_error}")
             return False
-        
+
     except Exception as e:
         print(f"Unexpected error when placing order: {e}")
         return False
+
+def update_dashboard_metrics(order_record):
+    # The dashboard's metrics only cover config.instrument
+    if order_record["instrument"] == config.instrument:
+        update_metrics(order_record["type"], order_record["price"], order_record["quantity"], order_record["strategy"])
+
+# Called with each new order record, after it was journaled and while
+# config.data_lock is held; multiInstrument.py replaces the dashboard's
+# metrics with its own per-instrument ledgers
+fill_listeners = [update_dashboard_metrics]
+
+gateway = OrderGateway(create_order_client, execute_order, workers=config.ORDER_WORKERS)
+
+def place_order(order_type, price, quantity, strategy, callback=None, instrument=None):
+    # Returns a Future resolving to True/False once the order is filled or
+    # rejected; callback(future) runs on the order worker when it completes
+    return gateway.submit(order_type, price, quantity, strategy, instrument or config.instrument, callback)
@@ -0,0 +1,104 @@
+import bisect
+import datetime
+from collections import defaultdict
+
+def order_time(order):
+    try:
+        return datetime.datetime.fromisoformat(order["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+class OrderStore:
+    # Orders keyed by order_id, kept in arrival order, with secondary indexes
+    # by strategy, side and time bucket. Duplicate checks are O(1) and time
+    # range queries bisect a sorted list of order times. Orders are only ever
+    # appended or cleared, so (generation, count) versions the whole store.
+    def __init__(self, orders=None, bucket_seconds=60):
+        self.bucket_seconds = bucket_seconds
+        self.generation = 0
+        self.clear()
+        for order in orders or []:
+            self.add(order)
+
+    def clear(self):
+        self.orders = []
+        self.by_id = {}
+        self.by_strategy = defaultdict(list)
+        self.by_side = defaultdict(list)
+        self.by_bucket = defaultdict(list)
+        self.times = []
+        self.generation += 1
+
+    def add(self, order):
+        order_id = order.get("order_id")
+        if order_id in self.by_id:
+            return False
+
+        self.orders.append(order)
+        self.by_id[order_id] = order
+        self.by_strategy[order.get("strategy", "unknown")].append(order)
+        self.by_side[order.get("type")].append(order)
+
+        timestamp = order_time(order)
+        self.by_bucket[self.bucket(timestamp)].append(order)
+        # Fills arrive in time order, so this is an append in practice
+        bisect.insort(self.times, (timestamp, len(self.orders) - 1))
+        return True
+
+    def bucket(self, timestamp):
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+    def __contains__(self, order_id):
+        return order_id in self.by_id
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __iter__(self):
+        return iter(self.orders)
+
+    def __getitem__(self, index):
+        return self.orders[index]
+
+    def get(self, order_id):
+        return self.by_id.get(order_id)
+
+    def since(self, index):
+        return self.orders[index:]
+
+    def version(self):
+        return [self.generation, len(self.orders)]
+
+    def page(self, page, size):
+        # Newest first, like the order history table
+        end = len(self.orders) - page * size
+        if end <= 0:
+            return []
+        return self.orders[max(0, end - size):end][::-1]
+
+    def copy(self):
+        return list(self.orders)
+
+    def for_strategy(self, strategy):
+        return list(self.by_strategy.get(strategy, []))
+
+    def for_side(self, side):
+        return list(self.by_side.get(side, []))
+
+    def in_bucket(self, timestamp):
+        return list(self.by_bucket.get(self.bucket(timestamp), []))
+
+    def between(self, start, end, strategy=None, side=None):
+        # Orders with start <= time < end; bounds are epoch seconds or datetimes
+        if isinstance(start, datetime.datetime):
+            start = start.timestamp()
+        if isinstance(end, datetime.datetime):
+            end = end.timestamp()
+        low = bisect.bisect_left(self.times, (start, -1))
+        high = bisect.bisect_left(self.times, (end, -1))
+        orders = [self.orders[index] for _, index in self.times[low:high]]
+        if strategy is not None:
+            orders = [order for order in orders if order.get("strategy") == strategy]
+        if side is not None:
+            orders = [order for order in orders if order.get("type") == side]
+        return orders
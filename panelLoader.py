@@ -0,0 +1,191 @@
+import datetime
+import json
+import os
+import time
+import pytz
+import plotly.utils
+import pandas as pd
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output, State
+from threading import Thread, Lock
+import config
+import historyCharts
+import predict
+from colors import *
+
+try:
+    import fcntl
+except ImportError:
+    # No file locks on Windows, where only app.py's single process runs
+    fcntl = None
+
+# The prediction and historical panels need years of daily candles, so they
+# are built on a background thread once the server is up and kept until the
+# next daily candle closes (17:00 New York, OANDA's daily alignment). Pages
+# render a placeholder that a callback swaps in when the panels are ready.
+# Under gunicorn the first worker to take the file lock builds them and
+# writes them to config.PANEL_CACHE_PATH; the other workers wait on the lock
+# and read that file instead of fetching and fitting again.
+
+DAILY_CLOSE_TIMEZONE = pytz.timezone("America/New_York")
+DAILY_CLOSE_HOUR = 17
+
+# Failed loads (e.g. OANDA unreachable at boot) are retried sooner
+RETRY_AFTER = datetime.timedelta(minutes=5)
+
+# Polling interval while the panels load, then for noticing a daily refresh
+LOADING_INTERVAL = 2000
+READY_INTERVAL = 60000
+
+panels = {"prediction": None, "history": None, "expires": None, "version": 0}
+panels_lock = Lock()
+loading = False
+
+def next_daily_close(now=None):
+    now = now or datetime.datetime.now(DAILY_CLOSE_TIMEZONE)
+    local_now = now.astimezone(DAILY_CLOSE_TIMEZONE)
+    close_time = datetime.time(DAILY_CLOSE_HOUR)
+    close = DAILY_CLOSE_TIMEZONE.localize(datetime.datetime.combine(local_now.date(), close_time))
+    if close <= local_now:
+        tomorrow = local_now.date() + datetime.timedelta(days=1)
+        close = DAILY_CLOSE_TIMEZONE.localize(datetime.datetime.combine(tomorrow, close_time))
+    return close
+
+def create_prediction_panel():
+    try:
+        stock_data = predict.fetch_stock_data()
+        prediction_data = predict.prepare_prediction_data(stock_data)
+        today_predicted_price = predict.predict_today_price(prediction_data)
+    except Exception as e:
+        print(f"Error preparing prediction data: {e}")
+        prediction_data = pd.DataFrame()
+        today_predicted_price = 1.0800
+
+    return prediction_data.empty, [
+        html.H3(f"Today's predicted price: ${today_predicted_price:.4f}",
+            style={'textAlign': 'center', 'color': text_color, 'marginTop': '15px'}),
+        predict.create_prediction_graph(prediction_data, today_predicted_price) if not prediction_data.empty else
+        html.Div("Prediction data not available", style={"color": inactive_text_color, "textAlign": "center", "padding": "20px"})
+    ]
+
+def build_panels():
+    expires = next_daily_close()
+    prediction_failed, prediction = create_prediction_panel()
+    history = historyCharts.create_historical_chart()
+    if prediction_failed or not isinstance(history, dcc.Graph):
+        expires = min(expires, datetime.datetime.now(DAILY_CLOSE_TIMEZONE) + RETRY_AFTER)
+    # Stored as the JSON Dash sends to the browser, which callbacks can
+    # return as is; the build time is the version every worker reports
+    return {
+        "prediction": json.loads(json.dumps(prediction, cls=plotly.utils.PlotlyJSONEncoder)),
+        "history": json.loads(json.dumps(history, cls=plotly.utils.PlotlyJSONEncoder)),
+        "expires": expires.isoformat(),
+        "version": time.time_ns(),
+    }
+
+def read_cached_panels(path):
+    try:
+        with open(path, "r") as f:
+            cached = json.load(f)
+        expires = datetime.datetime.fromisoformat(cached["expires"])
+    except (OSError, ValueError, KeyError):
+        return None
+    if datetime.datetime.now(DAILY_CLOSE_TIMEZONE) >= expires:
+        return None
+    return cached
+
+def write_cached_panels(cached, path):
+    with open(path + ".tmp", "w") as f:
+        json.dump(cached, f)
+    os.replace(path + ".tmp", path)
+
+def load_panels():
+    global loading
+    try:
+        path = config.PANEL_CACHE_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            cached = read_cached_panels(path)
+            if cached is None:
+                cached = build_panels()
+                write_cached_panels(cached, path)
+                print(f"Prediction and historical panels built, cached until {cached['expires']}")
+        expires = datetime.datetime.fromisoformat(cached["expires"])
+        with panels_lock:
+            panels.update(prediction=cached["prediction"], history=cached["history"], expires=expires,
+                          version=cached["version"])
+        print(f"Prediction and historical panels ready, cached until {expires}")
+    except Exception as e:
+        print(f"Error loading panels: {e}")
+    finally:
+        with panels_lock:
+            loading = False
+
+def refresh_panels():
+    # Starts a background load unless one is running; stale panels keep being
+    # served until the new ones are ready
+    global loading
+    with panels_lock:
+        if loading:
+            return False
+        loading = True
+    thread = Thread(target=load_panels)
+    thread.daemon = True
+    thread.start()
+    return True
+
+def get_panels():
+    with panels_lock:
+        expires = panels["expires"]
+        prediction, history, version = panels["prediction"], panels["history"], panels["version"]
+    if expires is None or datetime.datetime.now(DAILY_CLOSE_TIMEZONE) >= expires:
+        refresh_panels()
+    return prediction, history, version
+
+def create_placeholder(text):
+    return html.Div(text, style={"color": inactive_text_color, "textAlign": "center", "padding": "20px"})
+
+def create_panels_layout():
+    return html.Div([
+        historyCharts.create_historical_chart_layout(create_placeholder("Loading historical data...")),
+        html.Div(
+            style={
+                "backgroundColor": plot_bg_color,
+                "padding": "20px",
+                "borderRadius": "8px",
+                "marginBottom": "20px"
+            },
+            children=[
+                html.H2("EUR/USD Price Prediction", style={"marginTop": "0", "marginBottom": "15px"}),
+                html.Div(id="prediction-panel", children=create_placeholder("Loading prediction..."))
+            ]
+        ),
+        dcc.Store(id="panel-version", data=0),
+        dcc.Interval(id="panel-interval", interval=LOADING_INTERVAL, n_intervals=0),
+    ])
+
+def register_callbacks(app):
+    @app.callback(
+        [
+            Output("history-panel", "children"),
+            Output("prediction-panel", "children"),
+            Output("panel-version", "data"),
+            Output("panel-interval", "interval"),
+        ],
+        [Input("panel-interval", "n_intervals")],
+        [State("panel-version", "data")]
+    )
+    def update_panels(n, client_version):
+        prediction, history, version = get_panels()
+        if prediction is None or history is None:
+            return dash.no_update, dash.no_update, dash.no_update, LOADING_INTERVAL
+        # Panels are only sent when this page hasn't seen this version yet
+        if version == client_version:
+            return dash.no_update, dash.no_update, dash.no_update, READY_INTERVAL
+        return history, prediction, version, READY_INTERVAL
+
+def initialize_panels():
+    refresh_panels()
@@ -0,0 +1,195 @@
+import argparse
+import csv
+import itertools
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import config
+from predict import rolling_mean
+from candleStore import load_cached
+
+# Offline parameter sweep for the crossover strategy over cached candles
+# (the candleStore cache or a file). The candle closes are put into shared
+# memory once and every worker process maps the same buffer, so thousands of
+# combinations can be evaluated across all cores without pickling the price
+# series per task:
+#
+#   python parameterSweep.py --instrument EUR_USD --granularity M1 --column bid_c \
+#       --fast 10:100:10 --slow 100:300:25 --profit 0.0002:0.002:0.0002 --loss 0.0002:0.002:0.0002
+
+RESULT_FIELDS = ["fast", "slow", "profit", "loss", "return", "max_drawdown", "trades", "win_rate"]
+
+_prices = None
+_shared = None
+_sma_cache = {}
+
+def load_prices(path, column="bid_c"):
+    if path.endswith(".npy"):
+        values = np.load(path, mmap_mode="r")
+        if values.dtype.names:
+            values = values[column]
+    elif path.endswith(".parquet"):
+        values = pd.read_parquet(path, columns=[column])[column].to_numpy()
+    else:
+        values = pd.read_csv(path, usecols=[column])[column].to_numpy()
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def parse_range(text, cast=float):
+    # "start:stop:step" (stop inclusive) or a comma separated list of values
+    if ":" in text:
+        start, stop, step = (cast(part) for part in text.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return [cast(round(start + step * i, 10)) for i in range(count)]
+    return [cast(value) for value in text.split(",")]
+
+def grid(fast_windows, slow_windows, profits, losses):
+    return [
+        (fast, slow, profit, loss)
+        for fast, slow, profit, loss in itertools.product(fast_windows, slow_windows, profits, losses)
+        if fast < slow
+    ]
+
+def random_search(fast_windows, slow_windows, profits, losses, samples, seed=0):
+    combinations = grid(fast_windows, slow_windows, profits, losses)
+    if samples >= len(combinations):
+        return combinations
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(combinations), size=samples, replace=False)
+    return [combinations[i] for i in np.sort(chosen)]
+
+def backtest(prices, sma_fast, sma_slow, profit, loss, initial_funds=100000):
+    # Long-only version of the live rules: enter on a golden cross, exit on
+    # the next death cross or when the close moves profit/loss away from the
+    # entry price. Funds are fully reinvested on every entry, as in
+    # predict.buy_sell_signal. The loop runs once per trade; the exit search
+    # inside a trade is vectorized.
+    n = len(prices)
+    above = sma_fast > sma_slow
+    below = sma_fast < sma_slow
+    golden = np.flatnonzero(above[1:] & below[:-1]) + 1
+    death = np.flatnonzero(below[1:] & above[:-1]) + 1
+
+    equity = np.empty(n)
+    funds = float(initial_funds)
+    cursor = 0
+    trades = 0
+    wins = 0
+
+    while True:
+        entry_slot = np.searchsorted(golden, cursor)
+        if entry_slot >= len(golden):
+            break
+        entry = golden[entry_slot]
+        entry_price = prices[entry]
+
+        death_slot = np.searchsorted(death, entry + 1)
+        last = death[death_slot] if death_slot < len(death) else n - 1
+        window = prices[entry + 1:last + 1]
+        hits = np.flatnonzero((window >= entry_price + profit) | (window <= entry_price - loss))
+        exit_index = entry + 1 + hits[0] if len(hits) else last
+
+        equity[cursor:entry] = funds
+        segment = funds * prices[entry:exit_index + 1] / entry_price
+        equity[entry:exit_index + 1] = segment
+        trades += 1
+        if segment[-1] > funds:
+            wins += 1
+        funds = segment[-1]
+        cursor = exit_index + 1
+        if cursor >= n:
+            break
+
+    equity[cursor:] = funds
+    peaks = np.maximum.accumulate(equity)
+    max_drawdown = float(np.max(1 - equity / peaks)) if n else 0.0
+    return {
+        "return": funds / initial_funds - 1,
+        "max_drawdown": max_drawdown,
+        "trades": trades,
+        "win_rate": wins / trades if trades else 0.0,
+    }
+
+def _attach(name, length):
+    global _prices, _shared
+    _shared = shared_memory.SharedMemory(name=name)
+    _prices = np.ndarray((length,), dtype=np.float64, buffer=_shared.buf)
+
+def _sma(window):
+    # Every SMA a worker computes is kept for the rest of the sweep: the
+    # windows come from the --fast and --slow ranges, so the cache holds at
+    # most one series per window of the grid, and each worker computes a
+    # given SMA at most once however its chunks interleave fast and slow
+    if window not in _sma_cache:
+        _sma_cache[window] = rolling_mean(_prices, window)
+    return _sma_cache[window]
+
+def evaluate(combination):
+    fast, slow, profit, loss = combination
+    result = backtest(_prices, _sma(fast), _sma(slow), profit, loss)
+    result.update(fast=fast, slow=slow, profit=profit, loss=loss)
+    return result
+
+def run_sweep(prices, combinations, workers=None, chunksize=None):
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(combinations) // (workers * 8))
+    shared = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+    try:
+        np.ndarray(prices.shape, dtype=np.float64, buffer=shared.buf)[:] = prices
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shared.name, len(prices))) as executor:
+            results = list(executor.map(evaluate, sorted(combinations), chunksize=chunksize))
+    finally:
+        shared.close()
+        shared.unlink()
+    results.sort(key=lambda result: result["return"], reverse=True)
+    return results
+
+def write_results(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["rank"] + RESULT_FIELDS)
+        writer.writeheader()
+        for rank, result in enumerate(results, 1):
+            writer.writerow({"rank": rank, **{field: result[field] for field in RESULT_FIELDS}})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep SMA windows and profit/loss thresholds over cached candles")
+    parser.add_argument("--file", help="candles file (.csv, .parquet or .npy); defaults to the local candle cache")
+    parser.add_argument("--instrument", default=config.instrument)
+    parser.add_argument("--granularity", default="D")
+    parser.add_argument("--price", default="B", help="price component of the cached candles (B, A or M)")
+    parser.add_argument("--column", default="bid_c", help="close price column")
+    parser.add_argument("--fast", default="10:100:10")
+    parser.add_argument("--slow", default="100:300:25")
+    parser.add_argument("--profit", default=f"{config.PROFIT_THRESHOLD_PIPS}")
+    parser.add_argument("--loss", default=f"{config.LOSS_THRESHOLD_PIPS}")
+    parser.add_argument("--random", type=int, default=0, help="evaluate N random combinations instead of the full grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep_results.csv")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.file:
+        prices = load_prices(args.file, args.column)
+    else:
+        candles = load_cached(args.instrument, args.granularity, args.price)
+        prices = np.ascontiguousarray(candles[args.column], dtype=np.float64)
+    if len(prices) == 0:
+        raise SystemExit("No candles to sweep over; fetch them first or pass --file")
+    ranges = (parse_range(args.fast, int), parse_range(args.slow, int), parse_range(args.profit), parse_range(args.loss))
+    combinations = random_search(*ranges, args.random, args.seed) if args.random else grid(*ranges)
+
+    start = time.perf_counter()
+    results = run_sweep(prices, combinations, args.workers)
+    elapsed = time.perf_counter() - start
+    write_results(results, args.output)
+
+    print(f"Evaluated {len(results)} combinations over {len(prices)} candles in {elapsed:.1f} s "
+          f"({len(results) / elapsed:.0f}/s), results written to {args.output}")
+    for rank, result in enumerate(results[:args.top], 1):
+        print(f"{rank:>3}. fast={result['fast']} slow={result['slow']} profit={result['profit']} loss={result['loss']} "
+              f"return={result['return'] * 100:.2f}% drawdown={result['max_drawdown'] * 100:.2f}% trades={result['trades']}")
@@ -0,0 +1,130 @@
+from collections import deque, defaultdict
+
+EPSILON = 1e-9
+
+class PositionLedger:
+    # Open lots are kept in a FIFO queue as [signed quantity, price, strategy].
+    # Each fill opens at most one lot and each lot is closed once, so fills are
+    # amortized O(1); running position and cost totals make marking to a new
+    # mid O(1) as well.
+    #
+    # method="fifo" realizes P&L against the oldest lots' prices, "average"
+    # against the average cost of the open position. Realized P&L is credited
+    # to the strategy whose order closed the position; open quantity (and so
+    # unrealized P&L) stays with the strategy that opened it.
+    def __init__(self, method="fifo"):
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        self.lots = deque()
+        self.position = 0.0
+        self.cost = 0.0
+        self.realized = 0.0
+        self.mid = None
+        self.fills = 0
+        self.realized_by_strategy = defaultdict(float)
+        self.open_by_strategy = defaultdict(float)
+        self.cost_by_strategy = defaultdict(float)
+
+    def average_price(self):
+        return self.cost / self.position if abs(self.position) > EPSILON else 0.0
+
+    def apply_fill(self, side, price, quantity, strategy="unknown"):
+        remaining = quantity if side == "BUY" else -quantity
+        realized = 0.0
+
+        while abs(remaining) > EPSILON and self.lots and (self.lots[0][0] > 0) != (remaining > 0):
+            lot = self.lots[0]
+            direction = 1 if lot[0] > 0 else -1
+            matched = min(abs(remaining), abs(lot[0]))
+            entry = lot[1] if self.method == "fifo" else self.average_price()
+
+            realized += (price - entry) * matched * direction
+            lot[0] -= matched * direction
+            remaining += matched * direction
+            self.position -= matched * direction
+            self.cost -= entry * matched * direction
+            self.open_by_strategy[lot[2]] -= matched * direction
+            self.cost_by_strategy[lot[2]] -= lot[1] * matched * direction
+            if abs(lot[0]) <= EPSILON:
+                self.lots.popleft()
+
+        if abs(remaining) > EPSILON:
+            self.lots.append([remaining, price, strategy])
+            self.position += remaining
+            self.cost += remaining * price
+            self.open_by_strategy[strategy] += remaining
+            self.cost_by_strategy[strategy] += remaining * price
+
+        if abs(self.position) <= EPSILON:
+            self.position = 0.0
+            self.cost = 0.0
+
+        self.realized += realized
+        self.realized_by_strategy[strategy] += realized
+        self.fills += 1
+        return realized
+
+    def mark(self, mid):
+        self.mid = mid
+
+    def unrealized(self, mid=None):
+        mid = self.mid if mid is None else mid
+        if mid is None or abs(self.position) <= EPSILON:
+            return 0.0
+        return self.position * mid - self.cost
+
+    def strategy_breakdown(self):
+        # cost is what the strategy's open quantity is carried at (its lots'
+        # prices for fifo, the position's average for average), so
+        # mark_breakdown can revalue a published breakdown at a newer mid
+        breakdown = {}
+        average = self.average_price()
+        for strategy in set(self.realized_by_strategy) | set(self.open_by_strategy):
+            position = self.open_by_strategy.get(strategy, 0.0)
+            if abs(position) <= EPSILON:
+                position = cost = 0.0
+            elif self.method == "fifo":
+                cost = self.cost_by_strategy.get(strategy, 0.0)
+            else:
+                cost = position * average
+            breakdown[strategy] = {
+                "position": position,
+                "cost": cost,
+                "realized_pnl": self.realized_by_strategy.get(strategy, 0.0),
+            }
+        return mark_breakdown(breakdown, self.mid)
+
+    def to_dict(self):
+        return {
+            "method": self.method,
+            "lots": [list(lot) for lot in self.lots],
+            "position": self.position,
+            "cost": self.cost,
+            "realized": self.realized,
+            "fills": self.fills,
+            "realized_by_strategy": dict(self.realized_by_strategy),
+            "open_by_strategy": dict(self.open_by_strategy),
+            "cost_by_strategy": dict(self.cost_by_strategy),
+        }
+
+    def restore(self, state):
+        self.reset()
+        self.method = state.get("method", self.method)
+        self.lots = deque(list(lot) for lot in state.get("lots", []))
+        self.position = state.get("position", 0.0)
+        self.cost = state.get("cost", 0.0)
+        self.realized = state.get("realized", 0.0)
+        self.fills = state.get("fills", 0)
+        self.realized_by_strategy.update(state.get("realized_by_strategy", {}))
+        self.open_by_strategy.update(state.get("open_by_strategy", {}))
+        self.cost_by_strategy.update(state.get("cost_by_strategy", {}))
+        return self
+
+def mark_breakdown(breakdown, mid):
+    marked = {}
+    for strategy, row in breakdown.items():
+        unrealized = row["position"] * mid - row["cost"] if mid is not None and row["position"] else 0.0
+        marked[strategy] = dict(row, unrealized_pnl=unrealized)
+    return marked
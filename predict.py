@@ -6,45 +6,12 @@ import warnings
 import plotly.graph_objs as go
 from dash import dcc, html
 from oandapyV20 import API
-from oandapyV20.endpoints.instruments import InstrumentsCandles
+from candleStore import get_historical_data
 import config
 from colors import *
 
 warnings.filterwarnings('ignore')
 
-def get_historical_data(instrument="EUR_USD", start="2024-01-01", end="2025-03-03", granularity="D", price="B"):
-    try:
-        params = {
-            "from": start,
-            "to": end,
-            "granularity": granularity,
-            "price": price
-        }
-
-        r = InstrumentsCandles(instrument=instrument, params=params)
-        response = config.client.request(r)
-        candles = response.get("candles", [])
-        data = []
-        for candle in candles:
-            row = {
-                "time": candle["time"],
-                "volume": candle["volume"],
-                "complete": candle["complete"]
-            }
-            for price_type in ["bid", "ask", "mid"]:
-                if price_type in candle:
-                    for key, value in candle[price_type].items():
-                        row[f"{price_type}_{key}"] = float(value)
-            data.append(row)
-
-        historical_df = pd.DataFrame(data)
-        historical_df["time"] = pd.to_datetime(historical_df["time"])
-        return historical_df
-
-    except Exception as e:
-        print(f"Error fetching historical data: {e}")
-        return pd.DataFrame()
-
 def prepare_prediction_data(df):
     SMA50 = pd.DataFrame()
     SMA50['Price'] = df['Close'].rolling(window=50).mean()
@@ -67,47 +34,93 @@ def prepare_prediction_data(df):
     return Data
 
 def buy_sell_signal(data):
-    buy_signal = []
-    sell_signal = []
-    open_position = []
-    funds = [100000] * len(data)
-    last_funds = 100000
-    flag = 0
-
-    for i in range(len(data)):
-        if data['SMA50'][i] > data['SMA200'][i]:
-            if flag == 0:
-                flag = 1
-                buy_signal.append(data['Price'][i])
-                last_pos = last_funds / data['Price'][i]
-                funds[i] = last_funds
-                open_position.append(last_pos)
-                sell_signal.append(np.nan)
-            else:
-                buy_signal.append(np.nan)
-                last_funds = data['Price'][i] * last_pos
-                funds[i] = last_funds
-                open_position.append(last_pos)
-                sell_signal.append(np.nan)
-        elif data['SMA50'][i] < data['SMA200'][i]:
-            if flag == 1:
-                flag = 0
-                buy_signal.append(np.nan)
-                last_funds = last_pos * data['Price'][i]
-                funds[i] = last_funds
-                open_position.append(0)
-                sell_signal.append(data['Price'][i])
-            else:
-                buy_signal.append(np.nan)
-                funds[i] = last_funds
-                open_position.append(0)
-                sell_signal.append(np.nan)
-        else:
-            buy_signal.append(np.nan)
-            open_position.append(0)
-            sell_signal.append(np.nan)
+    buy_signal, sell_signal, open_position, funds, flag = crossover_signals(
+        data['Price'].to_numpy(dtype=float),
+        data['SMA50'].to_numpy(dtype=float),
+        data['SMA200'].to_numpy(dtype=float)
+    )
     return buy_signal, sell_signal, open_position, funds, flag
 
+def crossover_signals(price, sma_fast, sma_slow, initial_funds=100000):
+    # Vectorized SMA crossover backtest. Rows where the fast SMA is above the
+    # slow one hold a position, rows below are flat and rows where they are
+    # equal or undefined keep the previous state without holding. Only the
+    # compounding of funds from one trade to the next is sequential, so the
+    # Python loop runs once per trade instead of once per row.
+    n = len(price)
+    if n == 0:
+        empty = np.array([])
+        return empty, empty, empty, empty, 0
+
+    above = sma_fast > sma_slow
+    below = sma_fast < sma_slow
+
+    state = np.where(above, 1, np.where(below, 0, -1))
+    last_decided = np.maximum.accumulate(np.where(state >= 0, np.arange(n), -1))
+    flag_after = np.where(last_decided >= 0, state[np.maximum(last_decided, 0)], 0)
+    flag_before = np.concatenate(([0], flag_after[:-1]))
+
+    buys = above & (flag_before == 0)
+    sells = below & (flag_before == 1)
+    buy_rows = np.flatnonzero(buys)
+    sell_rows = np.flatnonzero(sells)
+
+    entry_funds = np.empty(len(buy_rows))
+    positions = np.empty(len(buy_rows))
+    exit_funds = np.empty(len(sell_rows))
+    last_funds = initial_funds
+    for trade, row in enumerate(buy_rows):
+        entry_funds[trade] = last_funds
+        positions[trade] = last_funds / price[row]
+        if trade < len(sell_rows):
+            last_funds = positions[trade] * price[sell_rows[trade]]
+            exit_funds[trade] = last_funds
+
+    trade = np.cumsum(buys) - 1
+    exits = np.cumsum(sells)
+    current_position = positions[np.maximum(trade, 0)] if len(positions) else np.zeros(n)
+    idle_funds = np.where(exits > 0, exit_funds[np.maximum(exits - 1, 0)] if len(exit_funds) else initial_funds, initial_funds)
+
+    funds = np.full(n, float(initial_funds))
+    funds = np.where(above, price * current_position, funds)
+    funds = np.where(buys, entry_funds[np.maximum(trade, 0)] if len(entry_funds) else funds, funds)
+    funds = np.where(below, idle_funds, funds)
+    funds = np.where(sells, current_position * price, funds)
+
+    buy_signal = np.where(buys, price, np.nan)
+    sell_signal = np.where(sells, price, np.nan)
+    open_position = np.where(above, current_position, 0.0)
+    return buy_signal, sell_signal, open_position, funds, int(flag_after[-1])
+
+def rolling_mean(values, window):
+    # Same as pandas rolling(window).mean(): NaN until a full window is available
+    values = np.asarray(values, dtype=float)
+    means = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        means[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return means
+
+def backtest_sma_crossover(prices, fast_window=50, slow_window=200, initial_funds=100000):
+    # Runs the crossover backtest directly on a price array, e.g. the close
+    # column of millions of M1/S5 candles
+    prices = np.asarray(prices, dtype=float)
+    sma_fast = rolling_mean(prices, fast_window)
+    sma_slow = rolling_mean(prices, slow_window)
+    buy_signal, sell_signal, open_position, funds, flag = crossover_signals(prices, sma_fast, sma_slow, initial_funds)
+    final_funds = funds[-1] if len(funds) else initial_funds
+    return {
+        "sma_fast": sma_fast,
+        "sma_slow": sma_slow,
+        "buy_price": buy_signal,
+        "sell_price": sell_signal,
+        "open_position": open_position,
+        "funds": funds,
+        "trades": int(np.count_nonzero(~np.isnan(buy_signal))),
+        "return": final_funds / initial_funds - 1,
+        "in_position": bool(flag),
+    }
+
 def predict_today_price(data):
     if data.empty or 'Price' not in data.columns:
         print("Error: Empty data or missing Price column")
@@ -0,0 +1,118 @@
+import time
+import datetime
+import numpy as np
+
+COLUMNS = ("Timestamp", "Bid", "Ask", "Mid")
+
+def to_ns(timestamp):
+    if timestamp is None:
+        return time.time_ns()
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    if isinstance(timestamp, datetime.datetime):
+        return int(np.datetime64(timestamp, "ns").astype(np.int64))
+    # OANDA RFC3339 strings, e.g. 2024-01-02T10:00:00.123456789Z
+    return int(np.datetime64(str(timestamp).rstrip("Z"), "ns").astype(np.int64))
+
+class PriceRingBuffer:
+    # Preallocated columnar storage for live quotes. Every row is written twice,
+    # at i and i + capacity, so the most recent n rows are always one contiguous
+    # slice and readers get ordered views without copying.
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.bids = np.zeros(2 * capacity, dtype=np.float64)
+        self.asks = np.zeros(2 * capacity, dtype=np.float64)
+        self.mids = np.zeros(2 * capacity, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, bid, ask, mid=None):
+        if mid is None:
+            mid = (bid + ask) / 2
+        position = self.head
+        mirror = position + self.capacity
+        timestamp = to_ns(timestamp)
+
+        self.timestamps[position] = self.timestamps[mirror] = timestamp
+        self.bids[position] = self.bids[mirror] = bid
+        self.asks[position] = self.asks[mirror] = ask
+        self.mids[position] = self.mids[mirror] = mid
+
+        self.head = (position + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _bounds(self, last=None):
+        size = self.count if last is None else min(last, self.count)
+        end = self.head + self.capacity
+        return end - size, end
+
+    def view(self, last=None):
+        start, end = self._bounds(last)
+        return {
+            "Timestamp": self.timestamps[start:end],
+            "Bid": self.bids[start:end],
+            "Ask": self.asks[start:end],
+            "Mid": self.mids[start:end],
+        }
+
+    def since(self, timestamp):
+        # Ordered views of the rows at or after timestamp (ns or datetime)
+        start, end = self._bounds()
+        offset = np.searchsorted(self.timestamps[start:end], to_ns(timestamp), side="left")
+        return self.view(self.count - offset)
+
+    def last(self):
+        if self.count == 0:
+            return None
+        position = self.head - 1 + self.capacity
+        return {
+            "Timestamp": int(self.timestamps[position]),
+            "Bid": float(self.bids[position]),
+            "Ask": float(self.asks[position]),
+            "Mid": float(self.mids[position]),
+        }
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def nbytes(self):
+        return self.timestamps.nbytes + self.bids.nbytes + self.asks.nbytes + self.mids.nbytes
+
+class ColumnRingBuffer:
+    # The same mirrored layout for an arbitrary set of named columns, used to
+    # keep derived values (indicators, signal flags) row-aligned with a
+    # PriceRingBuffer of the same capacity
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in columns.items()}
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, row):
+        position = self.head
+        mirror = position + self.capacity
+        for name, value in row.items():
+            column = self.columns[name]
+            column[position] = column[mirror] = value
+
+        self.head = (position + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def view(self, last=None):
+        size = self.count if last is None else min(last, self.count)
+        end = self.head + self.capacity
+        return {name: column[end - size:end] for name, column in self.columns.items()}
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
@@ -1,83 +1,156 @@
 import time
-import datetime
-import pandas as pd
+import numpy as np
 import plotly.graph_objs as go
+import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
 import config
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 from colors import *
+from indicators import RollingMean
+from priceBuffer import PriceRingBuffer, ColumnRingBuffer
 
-data = []
+CHART_WINDOW_NS = 10 * 60 * 1_000_000_000
+MARKERS = ("buy", "sell", "profit", "stop")
+
+data = PriceRingBuffer(config.PRICE_BUFFER_CAPACITY)
+# Indicator columns and signal flags, computed once per tick and row-aligned
+# with data, so refreshes never recompute them over the whole history
+columns = ColumnRingBuffer(config.PRICE_BUFFER_CAPACITY, {
+    "spread": np.float64,
+    "sma_50": np.float64,
+    "sma_200": np.float64,
+    "buy": np.bool_,
+    "sell": np.bool_,
+    "profit": np.bool_,
+    "stop": np.bool_,
+})
+chart_lock = Lock()
+# Ticks appended since startup; clients and the push publisher track their
+# position in the chart history with it
+appended = 0
 stop_event = Event()
 
-def stream_data(stop_event):
-    retry_count = 0
-    max_retries = 10  # Increased max retries for production environment
-    retry_delay = 2
-    backoff_factor = 1.5  # Exponential backoff factor
-    max_backoff = 30  # Maximum backoff time in seconds
-    
-    # Initialize with a default data point to prevent "waiting for data" message
-    default_timestamp = datetime.datetime.now().isoformat()
-    default_data = {"Timestamp": default_timestamp, "Bid": 1.0800, "Ask": 1.0802, "Spread": 2.0}
-    data.append(default_data)
-    print("Added default data point to initialize the dashboard")
-    
+class ChartFeed:
+    # Incremental version of the columns the charts used to derive from the
+    # whole tick history on every refresh: spread in pips, SMA 50/200 of the
+    # bid (SMA 200 from 50 ticks on) and the crossover/profit/stop markers
+    def __init__(self):
+        self.sma_50 = RollingMean(config.SMA_50_WINDOW)
+        self.sma_200 = RollingMean(config.SMA_200_WINDOW)
+        self.prev_sma_50 = None
+        self.prev_sma_200 = None
+        self.count = 0
+
+    def update(self, bid, ask, metrics):
+        self.count += 1
+        sma_50 = self.sma_50.update(bid)
+        sma_200 = self.sma_200.update(bid)
+        if self.count < 50:
+            sma_200 = None
+
+        row = {
+            "spread": (ask - bid) * 10000,
+            "sma_50": sma_50,
+            "sma_200": np.nan if sma_200 is None else sma_200,
+            "buy": False,
+            "sell": False,
+            "profit": False,
+            "stop": False,
+        }
+        if sma_200 is not None and self.prev_sma_200 is not None:
+            row["buy"] = sma_50 > sma_200 and self.prev_sma_50 <= self.prev_sma_200
+            row["sell"] = sma_50 < sma_200 and self.prev_sma_50 >= self.prev_sma_200
+        if metrics["buy_avg_price"] > 0 and metrics["total_buy_quantity"] > metrics["total_sell_quantity"]:
+            row["profit"] = bid >= metrics["buy_avg_price"] + config.PROFIT_THRESHOLD_PIPS
+            row["stop"] = bid <= metrics["buy_avg_price"] - config.LOSS_THRESHOLD_PIPS
+        self.prev_sma_50, self.prev_sma_200 = sma_50, sma_200
+        return row
+
+feed = ChartFeed()
+
+def add_price(price):
+    global appended
+    bid = float(price["bids"][0]["price"])
+    ask = float(price["asks"][0]["price"])
+    row = feed.update(bid, ask, config.snapshots.latest()["metrics"])
+    with chart_lock:
+        data.append(price["time"], bid, ask)
+        columns.append(row)
+        appended += 1
+
+def add_rows(rows, index):
+    # Rows computed elsewhere (the engine process, see sharedState.py), ending
+    # at the given index so chart indexes match across dashboard workers
+    global appended
+    with chart_lock:
+        if index < appended:
+            # The engine restarted; its history starts over
+            data.clear()
+            columns.clear()
+        for i in range(len(rows["Timestamp"])):
+            data.append(int(rows["Timestamp"][i]), float(rows["Bid"][i]), float(rows["Ask"][i]))
+            columns.append({name: rows[name][i] for name in columns.columns})
+        appended = index
+
+def consume_prices(stop_event, subscription):
+    # Charts are fed from the shared market data hub, so their history is the
+    # same sequence of quotes the strategy trades on
     while not stop_event.is_set():
+        price = subscription.get(timeout=1)
+        if price is None:
+            continue
         try:
-            # Set a longer timeout for production environments
-            config.client.request_timeout = 120  # Increased timeout
-            response = config.client.request(config.r)
-            prices = response["prices"]
-            
-            if not prices:
-                print("Received empty prices array, retrying...")
-                time.sleep(retry_delay)
-                continue
-                
-            for price in prices:
-                timestamp = datetime.datetime.now().isoformat()
-                bid = float(price["bids"][0]["price"])
-                ask = float(price["asks"][0]["price"])
-                spread = (ask - bid)*10000
-                new_data = {"Timestamp": timestamp, "Bid": bid, "Ask": ask, "Spread": spread}
-                data.append(new_data)
-                
-                # Limit data size to prevent memory issues
-                if len(data) > 1000:
-                    data.pop(0)
-                    
-            # Reset retry count on successful request
-            retry_count = 0
-            retry_delay = 2  # Reset delay on success
-            print(f"Successfully fetched price data at {timestamp}")
+            add_price(price)
         except Exception as e:
-            retry_count += 1
-            current_delay = min(retry_delay * (backoff_factor ** (retry_count - 1)), max_backoff)
-            print(f"Error fetching price data: {e} (Attempt {retry_count}, waiting {current_delay}s)")
-            
-            if retry_count >= max_retries:
-                print("Maximum retry attempts reached, resetting and continuing...")
-                # Add a placeholder data point with current timestamp to keep dashboard updating
-                placeholder_timestamp = datetime.datetime.now().isoformat()
-                if data and len(data) > 0:
-                    last_bid = data[-1]["Bid"]
-                    last_ask = data[-1]["Ask"]
-                    placeholder_data = {"Timestamp": placeholder_timestamp, "Bid": last_bid, "Ask": last_ask, "Spread": (last_ask - last_bid)*10000}
-                else:
-                    placeholder_data = {"Timestamp": placeholder_timestamp, "Bid": 1.0800, "Ask": 1.0802, "Spread": 2.0}
-                data.append(placeholder_data)
-                print(f"Added placeholder data point to maintain dashboard updates")
-                retry_count = 0
-                retry_delay = 2  # Reset delay
-            
-            time.sleep(current_delay)
-            continue
-        time.sleep(1)
+            print(f"Error adding price to charts: {e}")
+
+def _rows(size):
+    rows = dict(data.view(size), **columns.view(size))
+    return {name: np.array(values) for name, values in rows.items()}
+
+def recent_rows(window_ns=CHART_WINDOW_NS):
+    # Copies of the rows in the chart window (at most the points a chart
+    # keeps) and the index of the last one
+    with chart_lock:
+        size = min(len(data.since(time.time_ns() - window_ns)["Timestamp"]), config.LIVE_MAX_POINTS)
+        return _rows(size), appended
+
+def rows_since(index):
+    # Copies of the rows appended after index (at most what is still
+    # buffered) and the index of the last one
+    with chart_lock:
+        return _rows(max(0, appended - index)), appended
+
+def to_json_rows(rows):
+    # Plain lists for JSON: ISO timestamps and None for undefined SMAs
+    return {
+        "x": list(np.datetime_as_string(rows["Timestamp"].astype("datetime64[ns]"), unit="us")),
+        "bid": rows["Bid"].tolist(),
+        "ask": rows["Ask"].tolist(),
+        "spread": rows["spread"].tolist(),
+        "sma_50": rows["sma_50"].tolist(),
+        "sma_200": [None if value != value else value for value in rows["sma_200"].tolist()],
+        **{marker: rows[marker].astype(int).tolist() for marker in MARKERS},
+    }
+
+def extend_data(rows, max_points):
+    # extendData payloads for the live, spread and SMA graphs; marker traces
+    # only get the rows whose flag is set
+    x = rows["x"]
+    marked = {marker: [i for i, flag in enumerate(rows[marker]) if flag] for marker in MARKERS}
+    marker_x = [[x[i] for i in marked[marker]] for marker in MARKERS]
+    marker_y = [[rows["bid"][i] for i in marked[marker]] for marker in MARKERS]
+    return (
+        [{"x": [x, x], "y": [rows["bid"], rows["ask"]]}, [0, 1], max_points],
+        [{"x": [x], "y": [rows["spread"]]}, [0], max_points],
+        [{"x": [x, x, x] + marker_x, "y": [rows["bid"], rows["sma_50"], rows["sma_200"]] + marker_y},
+         [0, 1, 2, 3, 4, 5, 6], max_points],
+    )
 
 def initialize_data_thread():
-    thread = Thread(target=stream_data, args=(stop_event,))
+    subscription = config.market_data.subscribe("charts", maxsize=config.PRICE_BUFFER_CAPACITY)
+    thread = Thread(target=consume_prices, args=(stop_event, subscription))
     thread.daemon = True
     thread.start()
     return thread
@@ -101,6 +174,8 @@ def create_price_charts_layout():
         ]),
         
         html.Div(id="charts-stats-container"),
+        # Index of the last tick this page has, so refreshes only send newer ones
+        dcc.Store(id="chart-index", data=None),
     ], style={
         "backgroundColor": plot_bg_color,
         "padding": "15px",
@@ -110,263 +185,249 @@ def create_price_charts_layout():
 
 def register_callbacks(app):
     @app.callback(
-        [Output("live-graph", "figure"), 
+        [Output("live-graph", "figure"),
+         Output("live-graph", "extendData"),
          Output("spread-graph", "figure"),
+         Output("spread-graph", "extendData"),
          Output("sma-graph", "figure"),
-         Output("charts-stats-container", "children")],
-        Input("interval-component", "n_intervals")
+         Output("sma-graph", "extendData"),
+         Output("charts-stats-container", "children"),
+         Output("chart-index", "data")],
+        Input("interval-component", "n_intervals"),
+        State("chart-index", "data")
     )
-    def update_graphs(n):
-        df = pd.DataFrame(data)
-        if df.empty:
-            empty_figure = {
-                "data": [],
-                "layout": go.Layout(
-                    title={"text": "Waiting for data...", "font": {"color": text_color}},
-                    plot_bgcolor=plot_bg_color,
-                    paper_bgcolor=dark_bg_color,
-                    font={"color": text_color},
-                )
-            }
-            empty_stats = html.Div("Waiting for price data...", 
-                                 style={"color": text_color, "textAlign": "center", "padding": "20px"})
-            return empty_figure, empty_figure, empty_figure, empty_stats
-        
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-        
-        ten_minutes_ago = datetime.datetime.now() - datetime.timedelta(minutes=10)
-        df = df[df["Timestamp"] >= ten_minutes_ago]
-        
-        if len(df) > 1:
-            df["Price_Change"] = df["Bid"].diff().fillna(0)
-            df["Volatility"] = df["Price_Change"].rolling(window=10).std().fillna(0) * 10000
-            df["SMA_50"] = df["Bid"].rolling(window=config.SMA_50_WINDOW, min_periods=1).mean()
-            df["SMA_200"] = df["Bid"].rolling(window=config.SMA_200_WINDOW, min_periods=50).mean()
-           
-            df["SMA_50_prev"] = df["SMA_50"].shift(1)
-            df["SMA_200_prev"] = df["SMA_200"].shift(1)
-            df["buy_signal"] = ((df["SMA_50"] > df["SMA_200"]) & (df["SMA_50_prev"] <= df["SMA_200_prev"]))
-            
-            df["sell_signal"] = ((df["SMA_50"] < df["SMA_200"]) & (df["SMA_50_prev"] >= df["SMA_200_prev"]))
-            
-            # Add profit booking and stop loss signals
-            if config.trading_metrics["buy_avg_price"] > 0 and config.trading_metrics["total_buy_quantity"] > config.trading_metrics["total_sell_quantity"]:
-                profit_threshold = config.trading_metrics["buy_avg_price"] + config.PROFIT_THRESHOLD_PIPS
-                loss_threshold = config.trading_metrics["buy_avg_price"] - config.LOSS_THRESHOLD_PIPS
-                
-                df["profit_booking_signal"] = df["Bid"] >= profit_threshold
-                df["stop_loss_signal"] = df["Bid"] <= loss_threshold
-            else:
-                df["profit_booking_signal"] = False
-                df["stop_loss_signal"] = False
-        else:
-            df["Price_Change"] = 0
-            df["Volatility"] = 0
-            df["SMA_50"] = df["Bid"]
-            df["SMA_200"] = df["Bid"]
-            df["buy_signal"] = False
-            df["sell_signal"] = False
-            df["profit_booking_signal"] = False
-            df["stop_loss_signal"] = False
+    def update_graphs(n, client_index):
+        # A page that already has the charts only gets the ticks appended
+        # since its last index, as extendData capped at maxPoints; the full
+        # figures are only built on first load or when it fell too far behind
+        if client_index is not None:
+            rows, index = rows_since(client_index)
+            if index == client_index:
+                return (dash.no_update,) * 8
+            if index - client_index <= len(rows["Timestamp"]) and index > client_index:
+                live_extend, spread_extend, sma_extend = extend_data(to_json_rows(rows), config.LIVE_MAX_POINTS)
+                return (dash.no_update, live_extend, dash.no_update, spread_extend,
+                        dash.no_update, sma_extend, dash.no_update, index)
 
-        bid_ask_figure = {
-            "data": [
-                go.Scatter(
-                    x=df["Timestamp"],
-                    y=df["Bid"],
-                    mode="lines",
-                    name="Bid Price",
-                    line={"color": bid_color},
-                    connectgaps=True
-                ),
-                go.Scatter(
-                    x=df["Timestamp"],
-                    y=df["Ask"],
-                    mode="lines",
-                    name="Ask Price",
-                    line={"color": ask_color},
-                    connectgaps=True
-                ),
-            ],
+        rows, index = recent_rows()
+        figures = create_figures(rows)
+        return figures[0], dash.no_update, figures[1], dash.no_update, figures[2], dash.no_update, figures[3], index
+
+def create_figures(rows):
+    if len(rows["Timestamp"]) == 0:
+        empty_figure = {
+            "data": [],
             "layout": go.Layout(
-                xaxis={
-                    "title": "Timestamp",
-                    "color": text_color,
-                    "gridcolor": grid_color,
-                    "linecolor": grid_color,
-                    "zerolinecolor": grid_color,
-                },
-                yaxis={
-                    "title": "",
-                    "color": text_color,
-                    "gridcolor": grid_color,
-                    "linecolor": grid_color,
-                    "zerolinecolor": grid_color,
-                    "tickfont": {"size": 8, "color": text_color},
-                    "tickformat": ".5f",
-                    "showgrid": True,
-                    "gridwidth": 1,
-                },
-                title={
-                    "text": "EUR/USD Bid and Ask Prices",
-                    "font": {"color": text_color},
-                },
-                margin={"l": 40, "r": 40, "t": 40, "b": 40},
+                title={"text": "Waiting for data...", "font": {"color": text_color}},
                 plot_bgcolor=plot_bg_color,
                 paper_bgcolor=dark_bg_color,
                 font={"color": text_color},
-                legend={"font": {"color": text_color}},
-                height=300,
-            ),
+            )
         }
+        empty_stats = html.Div("Waiting for price data...",
+                             style={"color": text_color, "textAlign": "center", "padding": "20px"})
+        return empty_figure, empty_figure, empty_figure, empty_stats
 
-        spread_figure = {
-            "data": [
-                go.Scatter(
-                    x=df["Timestamp"],
-                    y=df["Spread"],
-                    mode="lines",
-                    name="Spread",
-                    line={"color": spread_color},
-                    fill="tozeroy",
-                    fillcolor=spread_fill_color,
-                    connectgaps=True
-                ),
-            ],
-            "layout": go.Layout(
-                xaxis={
-                    "title": "Timestamp",
-                    "color": text_color,
-                    "gridcolor": grid_color,
-                    "linecolor": grid_color,
-                    "zerolinecolor": grid_color,
-                },
-                yaxis={
-                    "title": "Spread (pips)",
-                    "color": text_color,
-                    "gridcolor": grid_color,
-                    "linecolor": grid_color,
-                    "zerolinecolor": grid_color,
-                },
-                title={
-                    "text": "EUR/USD Spread",
-                    "font": {"color": text_color},
-                },
-                margin={"l": 40, "r": 40, "t": 40, "b": 40},
-                plot_bgcolor=plot_bg_color,
-                paper_bgcolor=dark_bg_color,
-                font={"color": text_color},
-                height=300,
+    timestamps = rows["Timestamp"].astype("datetime64[ns]")
+
+    bid_ask_figure = {
+        "data": [
+            go.Scatter(
+                x=timestamps,
+                y=rows["Bid"],
+                mode="lines",
+                name="Bid Price",
+                line={"color": bid_color},
+                connectgaps=True
             ),
-        }
+            go.Scatter(
+                x=timestamps,
+                y=rows["Ask"],
+                mode="lines",
+                name="Ask Price",
+                line={"color": ask_color},
+                connectgaps=True
+            ),
+        ],
+        "layout": go.Layout(
+            xaxis={
+                "title": "Timestamp",
+                "color": text_color,
+                "gridcolor": grid_color,
+                "linecolor": grid_color,
+                "zerolinecolor": grid_color,
+            },
+            yaxis={
+                "title": "",
+                "color": text_color,
+                "gridcolor": grid_color,
+                "linecolor": grid_color,
+                "zerolinecolor": grid_color,
+                "tickfont": {"size": 8, "color": text_color},
+                "tickformat": ".5f",
+                "showgrid": True,
+                "gridwidth": 1,
+            },
+            title={
+                "text": "EUR/USD Bid and Ask Prices",
+                "font": {"color": text_color},
+            },
+            margin={"l": 40, "r": 40, "t": 40, "b": 40},
+            plot_bgcolor=plot_bg_color,
+            paper_bgcolor=dark_bg_color,
+            font={"color": text_color},
+            legend={"font": {"color": text_color}},
+            height=300,
+        ),
+    }
 
-        stats = html.Div([], style={"display": "none"})
+    spread_figure = {
+        "data": [
+            go.Scatter(
+                x=timestamps,
+                y=rows["spread"],
+                mode="lines",
+                name="Spread",
+                line={"color": spread_color},
+                fill="tozeroy",
+                fillcolor=spread_fill_color,
+                connectgaps=True
+            ),
+        ],
+        "layout": go.Layout(
+            xaxis={
+                "title": "Timestamp",
+                "color": text_color,
+                "gridcolor": grid_color,
+                "linecolor": grid_color,
+                "zerolinecolor": grid_color,
+            },
+            yaxis={
+                "title": "Spread (pips)",
+                "color": text_color,
+                "gridcolor": grid_color,
+                "linecolor": grid_color,
+                "zerolinecolor": grid_color,
+            },
+            title={
+                "text": "EUR/USD Spread",
+                "font": {"color": text_color},
+            },
+            margin={"l": 40, "r": 40, "t": 40, "b": 40},
+            plot_bgcolor=plot_bg_color,
+            paper_bgcolor=dark_bg_color,
+            font={"color": text_color},
+            height=300,
+        ),
+    }
 
-        sma_figure = {
-            "data": [
-                go.Scatter(
-                    x=df["Timestamp"],
-                    y=df["Bid"],
-                    mode="lines",
-                    name="Price",
-                    line={"color": price_color},
-                    connectgaps=True
-                ),
-                go.Scatter(
-                    x=df["Timestamp"],
-                    y=df["SMA_50"],
-                    mode="lines",
-                    name="SMA 50",
-                    line={"color": sma_50_color},
-                    connectgaps=True
-                ),
-                go.Scatter(
-                    x=df["Timestamp"],
-                    y=df["SMA_200"],
-                    mode="lines",
-                    name="SMA 200",
-                    line={"color": sma_200_color},
-                    connectgaps=True
-                ),
-                go.Scatter(
-                    x=df[df["buy_signal"] == True]["Timestamp"],
-                    y=df[df["buy_signal"] == True]["Bid"],
-                    mode="markers",
-                    name="Buy Signal",
-                    marker=dict(
-                        color="#00ff00",
-                        size=10,
-                        symbol="triangle-up",
-                        line=dict(color="white", width=1)
-                    )
-                ),
-                go.Scatter(
-                    x=df[df["sell_signal"] == True]["Timestamp"],
-                    y=df[df["sell_signal"] == True]["Bid"],
-                    mode="markers",
-                    name="Sell Signal",
-                    marker=dict(
-                        color="#ff0000",
-                        size=10,
-                        symbol="triangle-down",
-                        line=dict(color="white", width=1)
-                    )
-                ),
-                go.Scatter(
-                    x=df[df["profit_booking_signal"]]["Timestamp"],
-                    y=df[df["profit_booking_signal"]]["Bid"],
-                    mode="markers",
-                    name="Profit Booking",
-                    marker={
-                        "symbol": "triangle-up",
-                        "size": 15,
-                        "color": "#00ff00",
-                        "line": {"width": 2, "color": "white"}
-                    }
-                ),
-                go.Scatter(
-                    x=df[df["stop_loss_signal"]]["Timestamp"],
-                    y=df[df["stop_loss_signal"]]["Bid"],
-                    mode="markers",
-                    name="Stop Loss",
-                    marker={
-                        "symbol": "triangle-down",
-                        "size": 15,
-                        "color": "#ff0000",
-                        "line": {"width": 2, "color": "white"}
-                    }
-                ),
-            ],
-            "layout": go.Layout(
-                xaxis={
-                    "title": "Timestamp",
-                    "color": text_color,
-                    "gridcolor": grid_color,
-                    "linecolor": grid_color,
-                    "zerolinecolor": grid_color,
-                },
-                yaxis={
-                    "title": "",
-                    "color": text_color,
-                    "gridcolor": grid_color,
-                    "linecolor": grid_color,
-                    "zerolinecolor": grid_color,
-                    "tickfont": {"size": 8, "color": text_color},
-                    "tickformat": ".5f",
-                    "showgrid": True,
-                    "gridwidth": 1,
-                },
-                title={
-                    "text": "EUR/USD Price with SMA 50 and SMA 200",
-                    "font": {"color": text_color},
-                },
-                margin={"l": 40, "r": 40, "t": 40, "b": 40},
-                plot_bgcolor=plot_bg_color,
-                paper_bgcolor=dark_bg_color,
-                font={"color": text_color},
-                legend={"font": {"color": text_color}},
-                height=300,
+    stats = html.Div([], style={"display": "none"})
+
+    sma_figure = {
+        "data": [
+            go.Scatter(
+                x=timestamps,
+                y=rows["Bid"],
+                mode="lines",
+                name="Price",
+                line={"color": price_color},
+                connectgaps=True
             ),
-        }
-        
-        return bid_ask_figure, spread_figure, sma_figure, stats
\ No newline at end of file
+            go.Scatter(
+                x=timestamps,
+                y=rows["sma_50"],
+                mode="lines",
+                name="SMA 50",
+                line={"color": sma_50_color},
+                connectgaps=True
+            ),
+            go.Scatter(
+                x=timestamps,
+                y=rows["sma_200"],
+                mode="lines",
+                name="SMA 200",
+                line={"color": sma_200_color},
+                connectgaps=True
+            ),
+            go.Scatter(
+                x=timestamps[rows["buy"]],
+                y=rows["Bid"][rows["buy"]],
+                mode="markers",
+                name="Buy Signal",
+                marker=dict(
+                    color="#00ff00",
+                    size=10,
+                    symbol="triangle-up",
+                    line=dict(color="white", width=1)
+                )
+            ),
+            go.Scatter(
+                x=timestamps[rows["sell"]],
+                y=rows["Bid"][rows["sell"]],
+                mode="markers",
+                name="Sell Signal",
+                marker=dict(
+                    color="#ff0000",
+                    size=10,
+                    symbol="triangle-down",
+                    line=dict(color="white", width=1)
+                )
+            ),
+            go.Scatter(
+                x=timestamps[rows["profit"]],
+                y=rows["Bid"][rows["profit"]],
+                mode="markers",
+                name="Profit Booking",
+                marker={
+                    "symbol": "triangle-up",
+                    "size": 15,
+                    "color": "#00ff00",
+                    "line": {"width": 2, "color": "white"}
+                }
+            ),
+            go.Scatter(
+                x=timestamps[rows["stop"]],
+                y=rows["Bid"][rows["stop"]],
+                mode="markers",
+                name="Stop Loss",
+                marker={
+                    "symbol": "triangle-down",
+                    "size": 15,
+                    "color": "#ff0000",
+                    "line": {"width": 2, "color": "white"}
+                }
+            ),
+        ],
+        "layout": go.Layout(
+            xaxis={
+                "title": "Timestamp",
+                "color": text_color,
+                "gridcolor": grid_color,
+                "linecolor": grid_color,
+                "zerolinecolor": grid_color,
+            },
+            yaxis={
+                "title": "",
+                "color": text_color,
+                "gridcolor": grid_color,
+                "linecolor": grid_color,
+                "zerolinecolor": grid_color,
+                "tickfont": {"size": 8, "color": text_color},
+                "tickformat": ".5f",
+                "showgrid": True,
+                "gridwidth": 1,
+            },
+            title={
+                "text": "EUR/USD Price with SMA 50 and SMA 200",
+                "font": {"color": text_color},
+            },
+            margin={"l": 40, "r": 40, "t": 40, "b": 40},
+            plot_bgcolor=plot_bg_color,
+            paper_bgcolor=dark_bg_color,
+            font={"color": text_color},
+            legend={"font": {"color": text_color}},
+            height=300,
+        ),
+    }
+    
+    return bid_ask_figure, spread_figure, sma_figure, stats
@@ -0,0 +1,129 @@
+import time
+import oandapyV20
+import oandapyV20.endpoints.pricing as pricing
+from collections import deque
+import numpy as np
+import config
+from priceBuffer import to_ns
+
+# OANDA sends a heartbeat every 5 seconds, so a silent connection is dead
+HEARTBEAT_TIMEOUT = 10
+
+class StreamStats:
+    def __init__(self, report_interval=60):
+        self.report_interval = report_interval
+        self.ticks = 0
+        self.heartbeats = 0
+        self.duplicates = 0
+        self.reconnects = 0
+        self.latencies = deque(maxlen=10000)
+        self.quote_ages = deque(maxlen=10000)
+        self.ticks_per_second = 0.0
+        self.window_start = time.perf_counter()
+        self.window_ticks = 0
+        self.last_report = time.perf_counter()
+
+    def record_tick(self, received, decided, quote_time):
+        self.ticks += 1
+        self.window_ticks += 1
+        self.latencies.append(decided - received)
+        self.quote_ages.append((time.time_ns() - to_ns(quote_time)) / 1e9)
+
+        elapsed = decided - self.window_start
+        if elapsed >= 1:
+            self.ticks_per_second = self.window_ticks / elapsed
+            self.window_start = decided
+            self.window_ticks = 0
+
+        if self.report_interval and decided - self.last_report >= self.report_interval:
+            self.last_report = decided
+            print(f"Price stream stats: {self.summary()}")
+
+    def record_heartbeat(self):
+        self.heartbeats += 1
+
+    def record_duplicate(self):
+        self.duplicates += 1
+
+    def record_reconnect(self):
+        self.reconnects += 1
+
+    def summary(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "ticks": self.ticks,
+            "ticks_per_second": round(self.ticks_per_second, 2),
+            "decision_latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "decision_latency_p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "quote_age_avg_ms": round(float(np.mean(self.quote_ages)) * 1000, 3) if self.quote_ages else 0.0,
+            "heartbeats": self.heartbeats,
+            "duplicates": self.duplicates,
+            "reconnects": self.reconnects,
+        }
+
+stats = StreamStats()
+
+def create_stream_client():
+    # A dedicated session, so the long-lived stream never shares a connection
+    # with order requests made through config.client
+    return oandapyV20.API(
+        access_token=config.access_token,
+        environment=config.environment,
+        request_params={"timeout": HEARTBEAT_TIMEOUT}
+    )
+
+def stream_prices(stop_event, on_price, instruments, client=None, stream_stats=None):
+    client = client or create_stream_client()
+    stream_stats = stream_stats or stats
+    params = {"instruments": ",".join(instruments)}
+    last_times = {}
+
+    retry_count = 0
+    retry_delay = 1
+    backoff_factor = 1.5
+    max_backoff = 30
+
+    while not stop_event.is_set():
+        r = pricing.PricingStream(accountID=config.account_id, params=params)
+        try:
+            for message in client.request(r):
+                received = time.perf_counter()
+                if stop_event.is_set():
+                    break
+
+                message_type = message.get("type")
+                if message_type == "HEARTBEAT":
+                    stream_stats.record_heartbeat()
+                    continue
+                if message_type != "PRICE":
+                    continue
+
+                # After a reconnect the stream restarts with the current price,
+                # so skip anything at or before the last tick already processed
+                instrument = message.get("instrument")
+                if message["time"] <= last_times.get(instrument, ""):
+                    stream_stats.record_duplicate()
+                    continue
+                last_times[instrument] = message["time"]
+
+                # Tick-to-decision latency is recorded by the consumer that
+                # acts on the tick, measured from this receive time
+                message["received"] = received
+                on_price(message)
+                retry_count = 0
+            if stop_event.is_set():
+                break
+            # A clean close backs off like an error; the delay only resets
+            # once a tick arrives on the new connection
+            reason = "Price stream closed by server"
+
+        except Exception as e:
+            reason = f"Error in price stream: {e}"
+
+        retry_count += 1
+        stream_stats.record_reconnect()
+        current_delay = min(retry_delay * (backoff_factor ** (retry_count - 1)), max_backoff)
+        print(f"{reason} (Attempt {retry_count}, reconnecting in {current_delay}s)")
+        stop_event.wait(current_delay)
+
+    print(f"Price stream stopped: {stream_stats.summary()}")
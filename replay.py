@@ -0,0 +1,190 @@
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import clock
+import config
+import dataStream
+import metricsManager
+import orderHistory
+import orderManager
+import tickRecorder
+from strategies import registry as strategy_registry
+from candleStore import load_cached, GRANULARITY_SECONDS
+from mockBroker import MockBroker
+from orderStore import OrderStore
+from positionLedger import PositionLedger
+from priceBuffer import to_ns
+from replayServer import generate_ticks, load_ticks
+
+# Runs recorded ticks or candles through the live tick path
+# (dataStream.process_price, execute_trading_strategy, place_order and the
+# order gateway) as fast as possible. Orders fill on a MockBroker at the
+# replayed quote, are stamped with the simulated clock, and each tick waits
+# for its orders to complete, so a replay is deterministic. Journal, archives
+# and the ledger snapshot go to a scratch directory instead of the live files:
+#
+#   python replay.py --ticks 100000
+#   python replay.py --recorded EUR_USD --start 2024-01-02 --end 2024-01-03
+#   python replay.py --candles EUR_USD --granularity M1 --price BA
+
+def isolate(directory):
+    os.makedirs(directory, exist_ok=True)
+    orderHistory.journal = orderHistory.OrderJournal(os.path.join(directory, orderHistory.ORDER_HISTORY_FILE))
+    orderHistory.LEGACY_ORDER_HISTORY_FILE = os.path.join(directory, os.path.basename(orderHistory.LEGACY_ORDER_HISTORY_FILE))
+    metricsManager.SNAPSHOT_FILE = os.path.join(directory, os.path.basename(metricsManager.SNAPSHOT_FILE))
+
+def reset_engine():
+    config.price_data.clear()
+    config.orders_history = OrderStore()
+    config.indicator_engine.reset()
+    metricsManager.reset_ledger()
+
+def _price(instrument, timestamp, bid, ask, bid_liquidity=10000000, ask_liquidity=10000000):
+    return {
+        "type": "PRICE",
+        "instrument": instrument,
+        "time": timestamp,
+        "bids": [{"price": bid, "liquidity": bid_liquidity}],
+        "asks": [{"price": ask, "liquidity": ask_liquidity}],
+    }
+
+def with_times(ticks, start="2024-01-02T00:00:00Z", interval=1.0):
+    # Generated ticks and files without times get one tick per interval, like
+    # the live poll
+    first = to_ns(start.rstrip("Z"))
+    step = int(interval * 10**9)
+    for i, tick in enumerate(ticks):
+        if not tick.get("time"):
+            tick = dict(tick, time=first + i * step)
+        yield tick
+
+def recorded_ticks(instrument, start, end, directory=None):
+    for view in tickRecorder.read_range(instrument, start, end, directory):
+        for timestamp, bid, ask, bid_liquidity, ask_liquidity in view.tolist():
+            yield _price(instrument, timestamp, bid, ask, bid_liquidity, ask_liquidity)
+
+def candle_ticks(instrument, granularity="M1", price="BA", directory=None):
+    # One tick per candle at its close; mid-only candles quote a zero spread
+    candles = load_cached(instrument, granularity, price, directory)
+    names = candles.dtype.names
+    bids = candles["bid_c"] if "bid_c" in names else candles["mid_c"]
+    asks = candles["ask_c"] if "ask_c" in names else candles["mid_c"]
+    close = GRANULARITY_SECONDS[granularity] * 10**9
+    for timestamp, bid, ask in zip((candles["time"] + close).tolist(), bids.tolist(), asks.tolist()):
+        yield _price(instrument, timestamp, bid, ask)
+
+def run_replay(ticks, broker_latency=0.0, directory=None, verbose=False):
+    directory = directory or tempfile.mkdtemp(prefix="replay-")
+    isolate(directory)
+    reset_engine()
+
+    quote = {}
+    broker = MockBroker(latency=broker_latency,
+                        price_source=lambda instrument, units: quote["ask"] if units > 0 else quote["bid"])
+    gateway = orderManager.gateway
+    gateway.client_factory = lambda: broker
+    # One worker keeps fills (and order ids) in submission order
+    gateway.workers = 1
+
+    # Exits reset the dashboard's metrics; this ledger sees every fill
+    replay_ledger = PositionLedger("fifo")
+    def record_fill(order):
+        replay_ledger.apply_fill(order["type"], order["price"], order["quantity"], order["strategy"])
+    orderManager.fill_listeners.append(record_fill)
+
+    latencies = []
+    first_time = last_time = None
+    previous_price_above_sma_50 = None
+    output = sys.stdout if verbose else open(os.devnull, "w")
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            for price in ticks:
+                tick_time = to_ns(price["time"])
+                clock.set_time(tick_time)
+                first_time = first_time or tick_time
+                last_time = tick_time
+                quote["bid"] = float(price["bids"][0]["price"])
+                quote["ask"] = float(price["asks"][0]["price"])
+
+                tick_start = time.perf_counter()
+                previous_price_above_sma_50 = dataStream.process_price(price, previous_price_above_sma_50)
+                if gateway.pending():
+                    gateway.join()
+                latencies.append(time.perf_counter() - tick_start)
+    finally:
+        elapsed = time.perf_counter() - started
+        clock.use_wall_clock()
+        orderManager.fill_listeners.remove(record_fill)
+        orderHistory.journal.close()
+        if output is not sys.stdout:
+            output.close()
+
+    replay_ledger.mark(quote.get("bid"))
+    strategies = {}
+    for order in config.orders_history:
+        strategies[order["strategy"]] = strategies.get(order["strategy"], 0) + 1
+    latencies = np.array(latencies) * 1e6 if latencies else np.zeros(1)
+    simulated = (last_time - first_time) / 1e9 if latencies.size > 1 else 0.0
+    return {
+        "ticks": len(latencies),
+        "seconds": round(elapsed, 3),
+        "ticks_per_second": round(len(latencies) / max(elapsed, 1e-9), 1),
+        "simulated_seconds": round(simulated, 1),
+        "speedup": round(simulated / max(elapsed, 1e-9), 1),
+        "tick_p50_us": round(float(np.percentile(latencies, 50)), 1),
+        "tick_p99_us": round(float(np.percentile(latencies, 99)), 1),
+        "orders": gateway.stats(),
+        "orders_by_strategy": strategies,
+        "realized_pnl": round(replay_ledger.realized, 2),
+        "open_position": replay_ledger.position,
+        "strategies": strategy_registry.stats(),
+        "final_metrics": {key: value for key, value in config.trading_metrics.items() if key != "strategies"},
+        "directory": directory,
+    }
+
+def print_report(report):
+    print(f"Replayed {report['ticks']} ticks in {report['seconds']:.2f} s: {report['ticks_per_second']:,.0f} ticks/s, "
+          f"{report['speedup']:,.0f}x real time ({report['simulated_seconds']:,.0f} s of market data)")
+    print(f"Tick path p50 {report['tick_p50_us']:.1f} us, p99 {report['tick_p99_us']:.1f} us")
+    orders = report["orders"]
+    print(f"Orders: {orders['completed']} completed, {orders['failed']} failed; "
+          + ", ".join(f"{strategy} {count}" for strategy, count in sorted(report["orders_by_strategy"].items())))
+    for name, stats in report["strategies"].items():
+        print(f"  {name}: {stats['signals']} signals, {stats['mean_us']:.2f} us mean, {stats['p99_us']:.2f} us p99"
+              + (", suspended" if stats["suspended"] else ""))
+    print(f"Realized P&L over the replay {report['realized_pnl']:.2f}, open position {report['open_position']:.0f}")
+    print(f"Final metrics (buy/sell totals since the last exit): {report['final_metrics']}")
+    print(f"Journal and ledger snapshot in {report['directory']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay ticks or candles through the live strategy and order path")
+    parser.add_argument("--ticks", type=int, default=100000, help="generated random walk ticks (default source)")
+    parser.add_argument("--file", help="JSON Lines file of PRICE messages")
+    parser.add_argument("--recorded", metavar="INSTRUMENT", help="replay tickRecorder files of this instrument")
+    parser.add_argument("--candles", metavar="INSTRUMENT", help="replay cached candles of this instrument")
+    parser.add_argument("--start", help="start of the recorded range")
+    parser.add_argument("--end", help="end of the recorded range")
+    parser.add_argument("--granularity", default="M1")
+    parser.add_argument("--price", default="BA", help="candle price components in the cache")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock broker latency in seconds")
+    parser.add_argument("--output", help="directory for the journal and ledger snapshot (temporary if omitted)")
+    parser.add_argument("--verbose", action="store_true", help="keep the engine's per-tick logging")
+    args = parser.parse_args()
+
+    if args.recorded:
+        if not (args.start and args.end):
+            parser.error("--recorded needs --start and --end")
+        ticks = recorded_ticks(args.recorded, args.start, args.end)
+    elif args.candles:
+        ticks = candle_ticks(args.candles, args.granularity, args.price)
+    elif args.file:
+        ticks = with_times(load_ticks(args.file))
+    else:
+        ticks = with_times(generate_ticks(args.ticks))
+
+    print_report(run_replay(ticks, args.latency, args.output, args.verbose))
@@ -0,0 +1,190 @@
+import argparse
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+
+# Local stand-in for the OANDA pricing endpoints. Replays PRICE messages from
+# a JSON Lines file (or a generated random walk) over the same chunked
+# streaming protocol, so the engine can be run and measured offline:
+#
+#   python replayServer.py --file ticks.jsonl --rate 200 --port 8081
+#   oanda_api_url=http://127.0.0.1:8081 price_source=stream python app.py
+
+def oanda_time(timestamp=None):
+    timestamp = timestamp or datetime.datetime.utcnow()
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f") + "000Z"
+
+def generate_ticks(count, instrument="EUR_USD", seed=7, start=1.08):
+    rng = np.random.default_rng(seed)
+    bids = start + np.cumsum(rng.normal(0, 0.00005, count))
+    spreads = rng.uniform(0.00008, 0.0002, count)
+    return [
+        {
+            "type": "PRICE",
+            "instrument": instrument,
+            "time": "",
+            "bids": [{"price": f"{bid:.5f}", "liquidity": 10000000}],
+            "asks": [{"price": f"{bid + spread:.5f}", "liquidity": 10000000}],
+            "tradeable": True
+        }
+        for bid, spread in zip(bids, spreads)
+    ]
+
+def interleave_ticks(count, instruments, seed=7):
+    # count ticks per instrument, alternating between instruments like a
+    # pricing stream subscribed to all of them
+    feeds = [generate_ticks(count, instrument, seed + i) for i, instrument in enumerate(instruments)]
+    return [tick for ticks in zip(*feeds) for tick in ticks]
+
+def load_ticks(path):
+    with open(path, "r") as f:
+        return [message for message in (json.loads(line) for line in f if line.strip())
+                if message.get("type", "PRICE") == "PRICE"]
+
+class ReplayFeed:
+    # A single cursor shared by all connections, so a client that reconnects
+    # resumes the feed instead of starting the file over
+    def __init__(self, ticks, rate=10.0, loop=True, live_timestamps=True):
+        self.ticks = ticks
+        self.rate = rate
+        self.loop = loop
+        self.live_timestamps = live_timestamps
+        self.cursor = 0
+        self.latest = {}
+        self.lock = threading.Lock()
+
+    def next_tick(self):
+        with self.lock:
+            if self.cursor >= len(self.ticks):
+                if not self.loop:
+                    return None
+                self.cursor = 0
+            tick = dict(self.ticks[self.cursor])
+            self.cursor += 1
+            if self.live_timestamps or not tick.get("time"):
+                tick["time"] = oanda_time()
+            self.latest[tick["instrument"]] = tick
+            return tick
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without TCP_NODELAY every
+    # keep-alive response waits out the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        instruments = query.get("instruments", [""])[0].split(",")
+
+        if url.path.endswith("/pricing/stream"):
+            self.stream_prices(instruments)
+        elif url.path.endswith("/pricing"):
+            # Every poll advances the feed by one tick
+            feed = self.server.feed
+            feed.next_tick()
+            prices = [p for p in feed.latest.values() if p["instrument"] in instruments]
+            self.send_json({"time": oanda_time(), "prices": prices})
+        else:
+            self.send_json({"errorMessage": f"Unknown endpoint {url.path}"}, status=404)
+
+    def send_json(self, body, status=200):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def write_chunk(self, message):
+        line = json.dumps(message).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def stream_prices(self, instruments):
+        feed = self.server.feed
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        interval = 1.0 / feed.rate if feed.rate else 0
+        next_send = time.perf_counter()
+        last_heartbeat = time.perf_counter()
+        sent = 0
+        try:
+            while not self.server.stopping:
+                if self.server.disconnect_after and sent >= self.server.disconnect_after:
+                    break
+                tick = feed.next_tick()
+                if tick is None:
+                    break
+                if tick["instrument"] in instruments:
+                    self.write_chunk(tick)
+                    sent += 1
+
+                now = time.perf_counter()
+                if now - last_heartbeat >= self.server.heartbeat_interval:
+                    self.write_chunk({"type": "HEARTBEAT", "time": oanda_time()})
+                    last_heartbeat = now
+
+                if interval:
+                    next_send += interval
+                    delay = next_send - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+def create_server(ticks, host="127.0.0.1", port=8081, rate=10.0, loop=True,
+                  heartbeat_interval=5.0, disconnect_after=0, live_timestamps=True):
+    server = ThreadingHTTPServer((host, port), ReplayHandler)
+    server.daemon_threads = True
+    server.feed = ReplayFeed(ticks, rate=rate, loop=loop, live_timestamps=live_timestamps)
+    server.heartbeat_interval = heartbeat_interval
+    server.disconnect_after = disconnect_after
+    server.stopping = False
+    return server
+
+def start_server(ticks, **kwargs):
+    server = create_server(ticks, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def stop_server(server):
+    server.stopping = True
+    server.shutdown()
+    server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded OANDA prices over a local pricing stream")
+    parser.add_argument("--file", help="JSON Lines file of PRICE messages (random walk if omitted)")
+    parser.add_argument("--instrument", default="EUR_USD", help="comma separated for several interleaved instruments")
+    parser.add_argument("--ticks", type=int, default=100000, help="generated ticks when no file is given")
+    parser.add_argument("--rate", type=float, default=10.0, help="ticks per second, 0 for as fast as possible")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--heartbeat", type=float, default=5.0)
+    parser.add_argument("--disconnect-after", type=int, default=0, help="drop each connection after N ticks")
+    parser.add_argument("--no-loop", action="store_true")
+    parser.add_argument("--original-timestamps", action="store_true", help="keep the recorded tick times")
+    args = parser.parse_args()
+
+    ticks = load_ticks(args.file) if args.file else interleave_ticks(args.ticks, args.instrument.split(","))
+    server = create_server(ticks, port=args.port, rate=args.rate, loop=not args.no_loop,
+                           heartbeat_interval=args.heartbeat, disconnect_after=args.disconnect_after,
+                           live_timestamps=not args.original_timestamps)
+    print(f"Replaying {len(ticks)} ticks at {args.rate or 'max'} ticks/s on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        stop_server(server)
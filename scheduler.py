@@ -5,6 +5,7 @@ from apscheduler.triggers.cron import CronTrigger
 import config
 from threading import Event
 from orderHistory import clear_order_history
+from metricsManager import reset_ledger
 
 reset_event = Event()
 
@@ -12,24 +13,17 @@ def reset_application_data():
     print(f"Resetting application data at {datetime.datetime.now(pytz.timezone('US/Eastern'))}")
 
     with config.data_lock:
+        # Rotate before clearing the store: dashboard workers (engine.py)
+        # take a new order store generation to mean the journal was rotated
+        clear_order_history()
         config.price_data.clear()
         config.orders_history.clear()
         config.orderbook_data.clear()
+        config.indicator_engine.reset()
         
-        config.trading_metrics = {
-            "total_pnl": 0,
-            "total_buy_quantity": 0,
-            "total_sell_quantity": 0,
-            "total_buy_value": 0,
-            "total_sell_value": 0,
-            "buy_avg_price": 0,
-            "sell_avg_price": 0,
-        }
-        
-
-        config.metrics_queue.put(config.trading_metrics.copy())
+        reset_ledger()
+        config.snapshots.publish(indicators=None)
     
-    clear_order_history()
     reset_event.set()
     print("Application data has been reset successfully")
 
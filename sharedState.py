@@ -0,0 +1,169 @@
+import json
+import time
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from metricsManager import empty_metrics
+
+# Dashboard state published by the engine process (engine.py) into one named
+# shared memory segment, so any number of dashboard worker processes can read
+# it without running their own trader:
+#
+#   header     int64 counters: seqlock sequence, capacity, rows appended,
+#              order store version, orderbook length, last publish time,
+#              rows being written, strategy P&L length
+#   metrics    float64, one slot per trading metric
+#   orderbook  latest quote's bids/asks as JSON bytes
+#   strategies per-strategy ledger breakdown as JSON bytes
+#   rows       chart rows (quote, spread, SMAs, signal flags), a mirrored
+#              ring like priceBuffer.PriceRingBuffer
+#
+# Metrics, orderbook and counters are read under a seqlock: the engine makes
+# the sequence odd while writing and even when done, and readers retry until
+# they copied a consistent snapshot. Chart rows are append-only, so readers
+# copy them without the seqlock and drop any row the engine may have been
+# overwriting in the meantime.
+
+SEQUENCE, CAPACITY, APPENDED, ORDERS_GENERATION, ORDERS_COUNT, ORDERBOOK_LENGTH, UPDATED, WRITING, STRATEGY_PNL_LENGTH = range(9)
+HEADER_FIELDS = 9
+METRIC_FIELDS = tuple(empty_metrics())
+ORDERBOOK_BYTES = 16384
+STRATEGY_PNL_BYTES = 16384
+
+ROW_DTYPE = np.dtype([
+    ("Timestamp", np.int64),
+    ("Bid", np.float64),
+    ("Ask", np.float64),
+    ("spread", np.float64),
+    ("sma_50", np.float64),
+    ("sma_200", np.float64),
+    ("buy", np.bool_),
+    ("sell", np.bool_),
+    ("profit", np.bool_),
+    ("stop", np.bool_),
+])
+
+class SharedState:
+    def __init__(self, memory, owner):
+        self.memory = memory
+        self.owner = owner
+        buffer = memory.buf
+        offset = 0
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buffer, offset=offset)
+        offset += self.header.nbytes
+        self.metrics = np.ndarray((len(METRIC_FIELDS),), dtype=np.float64, buffer=buffer, offset=offset)
+        offset += self.metrics.nbytes
+        self.orderbook = np.ndarray((ORDERBOOK_BYTES,), dtype=np.uint8, buffer=buffer, offset=offset)
+        offset += self.orderbook.nbytes
+        self.strategy_pnl = np.ndarray((STRATEGY_PNL_BYTES,), dtype=np.uint8, buffer=buffer, offset=offset)
+        offset += self.strategy_pnl.nbytes
+        self.capacity = int(self.header[CAPACITY])
+        self.rows = np.ndarray((2 * self.capacity,), dtype=ROW_DTYPE, buffer=buffer, offset=offset)
+
+    @staticmethod
+    def size(capacity):
+        return HEADER_FIELDS * 8 + len(METRIC_FIELDS) * 8 + ORDERBOOK_BYTES + STRATEGY_PNL_BYTES + 2 * capacity * ROW_DTYPE.itemsize
+
+    @classmethod
+    def create(cls, name, capacity):
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            print(f"Removed stale shared state {name}")
+        except FileNotFoundError:
+            pass
+        memory = shared_memory.SharedMemory(name=name, create=True, size=cls.size(capacity))
+        np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=memory.buf)[:] = 0
+        np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=memory.buf)[CAPACITY] = capacity
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        memory = shared_memory.SharedMemory(name=name)
+        # Readers must not unlink the engine's segment when they exit
+        resource_tracker.unregister(memory._name, "shared_memory")
+        return cls(memory, owner=False)
+
+    def close(self):
+        self.header = self.metrics = self.orderbook = self.strategy_pnl = self.rows = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def _begin(self):
+        self.header[SEQUENCE] += 1
+
+    def _end(self):
+        self.header[UPDATED] = time.time_ns()
+        self.header[SEQUENCE] += 1
+
+    # Engine side
+
+    def append_rows(self, rows, index):
+        # rows are priceCharts columns for the ticks up to and including index
+        count = len(rows["Timestamp"])
+        if count > self.capacity:
+            rows = {name: values[-self.capacity:] for name, values in rows.items()}
+            count = self.capacity
+        self.header[WRITING] = index
+        if count:
+            positions = (np.arange(index - count, index) % self.capacity)
+            for name in ROW_DTYPE.names:
+                values = rows[name]
+                self.rows[name][positions] = values
+                self.rows[name][positions + self.capacity] = values
+        self._begin()
+        self.header[APPENDED] = index
+        self._end()
+
+    def publish(self, metrics, orders_version, orderbook, strategy_pnl=None):
+        payload = json.dumps(orderbook, separators=(",", ":")).encode("utf-8") if orderbook else b""
+        if len(payload) > ORDERBOOK_BYTES:
+            payload = b""
+        strategies = json.dumps(strategy_pnl, separators=(",", ":")).encode("utf-8") if strategy_pnl else b""
+        if len(strategies) > STRATEGY_PNL_BYTES:
+            strategies = b""
+        self._begin()
+        self.metrics[:] = [metrics.get(field, 0) for field in METRIC_FIELDS]
+        self.header[ORDERS_GENERATION], self.header[ORDERS_COUNT] = orders_version
+        self.orderbook[:len(payload)] = np.frombuffer(payload, dtype=np.uint8)
+        self.header[ORDERBOOK_LENGTH] = len(payload)
+        self.strategy_pnl[:len(strategies)] = np.frombuffer(strategies, dtype=np.uint8)
+        self.header[STRATEGY_PNL_LENGTH] = len(strategies)
+        self._end()
+
+    # Dashboard side
+
+    def snapshot(self):
+        while True:
+            sequence = int(self.header[SEQUENCE])
+            if sequence % 2:
+                time.sleep(0)
+                continue
+            header = self.header.copy()
+            metrics = self.metrics.tolist()
+            orderbook = self.orderbook[:header[ORDERBOOK_LENGTH]].tobytes()
+            strategies = self.strategy_pnl[:header[STRATEGY_PNL_LENGTH]].tobytes()
+            if int(self.header[SEQUENCE]) == sequence:
+                break
+        return {
+            "appended": int(header[APPENDED]),
+            "metrics": dict(zip(METRIC_FIELDS, metrics)),
+            "orders_version": [int(header[ORDERS_GENERATION]), int(header[ORDERS_COUNT])],
+            "orderbook": json.loads(orderbook) if orderbook else None,
+            "strategy_pnl": json.loads(strategies) if strategies else {},
+            "updated": int(header[UPDATED]),
+        }
+
+    def rows_since(self, index):
+        # Copies of the rows after index that are still buffered, and the
+        # index of the last one
+        appended = int(self.header[APPENDED])
+        count = min(max(0, appended - index), self.capacity)
+        end = appended % self.capacity + self.capacity
+        rows = self.rows[end - count:end].copy()
+        # Rows the engine wrapped around onto while they were copied
+        overwritten = int(self.header[WRITING]) - self.capacity - (appended - count)
+        if overwritten > 0:
+            rows = rows[overwritten:]
+        return {name: rows[name] for name in ROW_DTYPE.names}, appended
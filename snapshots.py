@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
+import numpy as np
+
+class SnapshotPublisher:
+    # Copy-on-write state for readers that must never block the tick path.
+    # Writers (already serialized by config.data_lock) build a new read-only
+    # snapshot for every change and swap one reference; readers take
+    # whatever snapshot is current without locking, and a snapshot is never
+    # modified once published.
+    def __init__(self, **fields):
+        self.current = MappingProxyType(dict(fields, sequence=0, time=time.time()))
+
+    def publish(self, **changes):
+        snapshot = dict(self.current)
+        for name, value in changes.items():
+            snapshot[name] = MappingProxyType(dict(value)) if isinstance(value, dict) else value
+        snapshot["sequence"] = self.current["sequence"] + 1
+        snapshot["time"] = time.time()
+        self.current = MappingProxyType(snapshot)
+        return self.current
+
+    def latest(self):
+        return self.current
+
+class TimedLock:
+    # Drop-in for threading.Lock that records how long each thread waited for
+    # it and held it. Counters are only updated while the lock is held, so
+    # recording needs no extra synchronization.
+    def __init__(self, name, samples=10000):
+        self.name = name
+        self.lock = threading.Lock()
+        self.acquired_at = None
+        self.acquisitions = 0
+        self.contended = 0
+        self.waits = deque(maxlen=samples)
+        self.holds = deque(maxlen=samples)
+        self.by_thread = {}
+
+    def acquire(self, blocking=True, timeout=-1):
+        started = time.perf_counter()
+        contended = not self.lock.acquire(blocking=False)
+        if contended and not self.lock.acquire(blocking, timeout):
+            return False
+        self.acquired_at = time.perf_counter()
+        wait = self.acquired_at - started
+
+        self.acquisitions += 1
+        self.contended += contended
+        self.waits.append(wait)
+        thread = self.by_thread.setdefault(threading.current_thread().name, {
+            "acquisitions": 0, "contended": 0, "wait_seconds": 0.0, "max_wait_ms": 0.0,
+            "hold_seconds": 0.0, "max_hold_ms": 0.0,
+        })
+        thread["acquisitions"] += 1
+        thread["contended"] += contended
+        thread["wait_seconds"] += wait
+        thread["max_wait_ms"] = max(thread["max_wait_ms"], wait * 1000)
+        return True
+
+    def release(self):
+        hold = time.perf_counter() - self.acquired_at
+        self.holds.append(hold)
+        thread = self.by_thread[threading.current_thread().name]
+        thread["hold_seconds"] += hold
+        thread["max_hold_ms"] = max(thread["max_hold_ms"], hold * 1000)
+        self.lock.release()
+
+    def locked(self):
+        return self.lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def stats(self):
+        waits = np.array(self.waits) * 1000
+        holds = np.array(self.holds) * 1000
+
+        def percentiles(values):
+            if not len(values):
+                return {"p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+            p50, p99 = np.percentile(values, [50, 99])
+            return {"p50_ms": round(float(p50), 4), "p99_ms": round(float(p99), 4), "max_ms": round(float(values.max()), 4)}
+
+        return {
+            "name": self.name,
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "wait": percentiles(waits),
+            "hold": percentiles(holds),
+            "threads": {name: dict(values) for name, values in list(self.by_thread.items())},
+        }
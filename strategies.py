@@ -0,0 +1,187 @@
+import time
+from collections import deque
+import numpy as np
+import config
+
+# Strategies evaluated on every tick. Each one declares the rolling
+# indicators it needs; the registry adds them to the tick's IndicatorEngine,
+# so every indicator is computed once per tick and all strategies read the
+# same snapshot. Strategies return order intents (type, price, quantity,
+# strategy name) and never place orders themselves.
+#
+# Every evaluation is timed against the strategy's budget; one that overruns
+# it MAX_OVERRUNS ticks in a row is suspended so it can't slow down the tick
+# loop for the others. Timing stats are served at /engine/stats.
+
+EXIT_STRATEGIES = ("Profit Booking", "Stop Loss")
+MAX_OVERRUNS = 100
+TIMING_SAMPLES = 10000
+
+class Strategy:
+    # Subclasses set name and indicators ((kind, window) pairs, see
+    # IndicatorEngine.add) and implement evaluate(tick). An exclusive strategy
+    # that returns orders ends the evaluation for that tick.
+    name = "strategy"
+    indicators = ()
+    exclusive = False
+    budget_ms = None
+
+    def evaluate(self, tick):
+        return []
+
+class ProfitStopStrategy(Strategy):
+    # Closes the long position once the mid moves PROFIT_THRESHOLD_PIPS above
+    # or LOSS_THRESHOLD_PIPS below the average buy price
+    name = "Profit/Stop"
+    exclusive = True
+
+    def evaluate(self, tick):
+        metrics = tick["metrics"]
+        # Orders are filled asynchronously, so don't send another exit while
+        # one is still in flight and the metrics haven't caught up
+        if tick["exits_in_flight"] or metrics["buy_avg_price"] <= 0:
+            return []
+        remaining_quantity = metrics["total_buy_quantity"] - metrics["total_sell_quantity"]
+        if remaining_quantity <= 0:
+            return []
+
+        current_price = tick["indicators"]["mid"]
+        if current_price >= metrics["buy_avg_price"] + config.PROFIT_THRESHOLD_PIPS:
+            return [("SELL", tick["bid"], config.PROFIT_BOOKING_QUANTITY, "Profit Booking")]
+        if current_price <= metrics["buy_avg_price"] - config.LOSS_THRESHOLD_PIPS:
+            return [("SELL", tick["bid"], config.PROFIT_BOOKING_QUANTITY, "Stop Loss")]
+        return []
+
+class CrossoverStrategy(Strategy):
+    # Buys when the fast SMA crosses above the slow one and sells when it
+    # crosses below
+    def __init__(self, fast, slow, quantity=None, buy_name=None, sell_name=None, budget_ms=None):
+        self.fast = f"sma_{fast}"
+        self.slow = f"sma_{slow}"
+        self.indicators = (("sma", fast), ("sma", slow))
+        self.quantity = quantity or config.STRONG_SIGNAL_QUANTITY
+        self.buy_name = buy_name or f"SMA {fast}/{slow} Buy"
+        self.sell_name = sell_name or f"SMA {fast}/{slow} Sell"
+        self.name = f"SMA {fast}/{slow} Crossover"
+        self.budget_ms = budget_ms
+
+    def evaluate(self, tick):
+        indicators = tick["indicators"]
+        fast, slow = indicators[self.fast], indicators[self.slow]
+        prev_fast, prev_slow = indicators["prev_" + self.fast], indicators["prev_" + self.slow]
+        if fast is None or slow is None or prev_fast is None or prev_slow is None:
+            return []
+        if prev_fast < prev_slow and fast > slow:
+            return [("BUY", tick["ask"], self.quantity, self.buy_name)]
+        if prev_fast > prev_slow and fast < slow:
+            return [("SELL", tick["bid"], self.quantity, self.sell_name)]
+        return []
+
+class StrategyTimer:
+    def __init__(self, budget_ms):
+        self.budget_ms = budget_ms
+        self.calls = 0
+        self.signals = 0
+        self.errors = 0
+        self.overruns = 0
+        self.consecutive_overruns = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=TIMING_SAMPLES)
+        self.suspended = False
+
+    def record(self, elapsed, signals):
+        self.calls += 1
+        self.signals += signals
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        self.samples.append(elapsed)
+        if elapsed * 1000 > self.budget_ms:
+            self.overruns += 1
+            self.consecutive_overruns += 1
+        else:
+            self.consecutive_overruns = 0
+
+    def stats(self):
+        samples = np.array(self.samples) * 1e6 if self.samples else np.zeros(1)
+        return {
+            "calls": self.calls,
+            "signals": self.signals,
+            "errors": self.errors,
+            "budget_ms": self.budget_ms,
+            "overruns": self.overruns,
+            "suspended": self.suspended,
+            "mean_us": round(self.total_seconds * 1e6 / max(self.calls, 1), 2),
+            "p99_us": round(float(np.percentile(samples, 99)), 2),
+            "max_us": round(self.max_seconds * 1e6, 2),
+        }
+
+class StrategyRegistry:
+    def __init__(self, budget_ms=None):
+        self.budget_ms = budget_ms or config.STRATEGY_BUDGET_MS
+        self.strategies = []
+        self.timers = {}
+        self.engines = []
+
+    def register(self, strategy):
+        if strategy.name in self.timers:
+            raise ValueError(f"Strategy {strategy.name} is already registered")
+        self.strategies.append(strategy)
+        self.timers[strategy.name] = StrategyTimer(strategy.budget_ms or self.budget_ms)
+        for engine in self.engines:
+            for kind, window in strategy.indicators:
+                engine.add(kind, window)
+        return strategy
+
+    def unregister(self, name):
+        self.strategies = [strategy for strategy in self.strategies if strategy.name != name]
+        self.timers.pop(name, None)
+
+    def attach(self, engine):
+        # Adds the indicators of every strategy (including ones registered
+        # later) to an IndicatorEngine
+        self.engines.append(engine)
+        for strategy in self.strategies:
+            for kind, window in strategy.indicators:
+                engine.add(kind, window)
+        return engine
+
+    def evaluate(self, indicators, bid_price, ask_price, metrics, exits_in_flight):
+        tick = {
+            "indicators": indicators,
+            "bid": bid_price,
+            "ask": ask_price,
+            "metrics": metrics,
+            "exits_in_flight": exits_in_flight,
+        }
+        intents = []
+        for strategy in self.strategies:
+            timer = self.timers[strategy.name]
+            if timer.suspended:
+                continue
+            started = time.perf_counter()
+            try:
+                result = strategy.evaluate(tick)
+            except Exception as e:
+                timer.errors += 1
+                print(f"Error evaluating strategy {strategy.name}: {e}")
+                result = []
+            timer.record(time.perf_counter() - started, len(result))
+
+            if timer.consecutive_overruns >= MAX_OVERRUNS:
+                timer.suspended = True
+                print(f"Strategy {strategy.name} suspended after {MAX_OVERRUNS} ticks over its {timer.budget_ms} ms budget")
+            if result:
+                intents.extend(result)
+                if strategy.exclusive:
+                    break
+        return intents
+
+    def stats(self):
+        return {name: timer.stats() for name, timer in self.timers.items()}
+
+registry = StrategyRegistry()
+registry.register(ProfitStopStrategy())
+registry.register(CrossoverStrategy(config.SMA_50_WINDOW, config.SMA_200_WINDOW,
+                                    buy_name="Golden Cross", sell_name="Death Cross"))
+registry.attach(config.indicator_engine)
@@ -0,0 +1,216 @@
+import datetime
+import os
+import time
+from collections import deque
+from threading import Thread
+import numpy as np
+import config
+from priceBuffer import to_ns
+
+# Every quote the engine sees, appended to one file per instrument and UTC
+# day as fixed-width binary records with no header, so a day is readable as a
+# memory-mapped NumPy array while it is still being written:
+#
+#   ticks/EUR_USD_20240102.ticks
+#
+# The tick loop only appends the quote to a deque (no lock, no wakeup); a
+# background thread converts and writes what accumulated every WRITE_INTERVAL.
+
+RECORD_DTYPE = np.dtype([
+    ("time", "i8"),
+    ("bid", "f8"),
+    ("ask", "f8"),
+    ("bid_liquidity", "f8"),
+    ("ask_liquidity", "f8"),
+])
+FILE_SUFFIX = ".ticks"
+DAY_NS = 86400 * 10**9
+WRITE_INTERVAL = 0.5
+# Quotes kept waiting for the writer before the oldest are dropped
+PENDING_LIMIT = 200000
+
+def tick_path(instrument, day, directory=None):
+    return os.path.join(directory or config.TICK_RECORD_DIR, f"{instrument}_{day:%Y%m%d}{FILE_SUFFIX}")
+
+def _day(ns):
+    return datetime.date(1970, 1, 1) + datetime.timedelta(days=int(ns // DAY_NS))
+
+def _ns(value):
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    return to_ns(value)
+
+def _liquidity(levels):
+    try:
+        return float(levels[0]["liquidity"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return np.nan
+
+def to_records(prices):
+    records = np.empty(len(prices), dtype=RECORD_DTYPE)
+    # Parsing the RFC3339 strings as one array is far cheaper than per tick
+    records["time"] = np.array([price["time"].rstrip("Z") for price in prices], dtype="datetime64[ns]").astype(np.int64)
+    records["bid"] = [float(price["bids"][0]["price"]) for price in prices]
+    records["ask"] = [float(price["asks"][0]["price"]) for price in prices]
+    records["bid_liquidity"] = [_liquidity(price["bids"]) for price in prices]
+    records["ask_liquidity"] = [_liquidity(price["asks"]) for price in prices]
+    return records
+
+class TickRecorder:
+    def __init__(self, directory=None, write_interval=WRITE_INTERVAL):
+        self.directory = directory or config.TICK_RECORD_DIR
+        self.write_interval = write_interval
+        self.files = {}
+        self.last_times = {}
+        self.pending = deque(maxlen=PENDING_LIMIT)
+        self.dropped = 0
+        self.running = False
+        self.records = 0
+        self.bytes = 0
+        self.batches = 0
+        self.skipped = 0
+        self.write_seconds = 0.0
+
+    def _file(self, instrument, day):
+        key = (instrument, day)
+        if key not in self.files:
+            # Earlier days are complete once a later one starts
+            for old in [old for old in self.files if old[0] == instrument]:
+                self.files.pop(old).close()
+            os.makedirs(self.directory, exist_ok=True)
+            path = tick_path(instrument, day, self.directory)
+            f = open(path, "ab")
+            # A crash can leave a torn record at the end; cut it off so the
+            # file stays a whole number of records
+            torn = f.tell() % RECORD_DTYPE.itemsize
+            if torn:
+                f.truncate(f.tell() - torn)
+                f.seek(0, os.SEEK_END)
+            self.files[key] = f
+        return self.files[key]
+
+    def write(self, prices):
+        started = time.perf_counter()
+        recorded = [price for price in prices if not price.get("placeholder") and price.get("instrument")]
+        self.skipped += len(prices) - len(recorded)
+        prices = recorded
+        by_instrument = {}
+        for price in prices:
+            by_instrument.setdefault(price["instrument"], []).append(price)
+
+        for instrument, quotes in by_instrument.items():
+            try:
+                records = to_records(quotes)
+            except Exception as e:
+                print(f"Error converting {len(quotes)} {instrument} ticks: {e}")
+                self.skipped += len(quotes)
+                continue
+            # Files stay sorted by time for searchsorted: repeated quotes
+            # (polling returns the same price until it changes) are dropped
+            last_time = self.last_times.get(instrument, -1)
+            fresh = records["time"] > np.maximum.accumulate(np.concatenate(([last_time], records["time"][:-1])))
+            self.skipped += len(records) - int(fresh.sum())
+            records = records[fresh]
+            if not len(records):
+                continue
+            self.last_times[instrument] = int(records["time"][-1])
+            days = records["time"] // DAY_NS
+            for day in np.unique(days):
+                chunk = records[days == day]
+                f = self._file(instrument, _day(day * DAY_NS))
+                f.write(chunk.tobytes())
+                f.flush()
+                self.records += len(chunk)
+                self.bytes += chunk.nbytes
+
+        self.batches += 1
+        self.write_seconds += time.perf_counter() - started
+
+    def record(self, price):
+        # Called on the tick path; deque.append is atomic, so this is all it costs
+        if self.running:
+            if len(self.pending) == PENDING_LIMIT:
+                self.dropped += 1
+            self.pending.append(price)
+
+    def take(self):
+        pending = self.pending
+        return [pending.popleft() for _ in range(len(pending))]
+
+    def run(self, stop_event):
+        while not stop_event.wait(self.write_interval):
+            batch = self.take()
+            if batch:
+                try:
+                    self.write(batch)
+                except Exception as e:
+                    print(f"Error recording ticks: {e}")
+        self.running = False
+        # Whatever arrived before stopping is still written
+        try:
+            self.write(self.take())
+        except Exception as e:
+            print(f"Error recording ticks: {e}")
+        self.close()
+
+    def start(self, stop_event):
+        self.running = True
+        thread = Thread(target=self.run, args=(stop_event,), name="tick-recorder")
+        thread.daemon = True
+        thread.start()
+        print(f"Recording ticks to {self.directory}")
+        return thread
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+    def stats(self):
+        return {
+            "records": self.records,
+            "bytes": self.bytes,
+            "batches": self.batches,
+            "skipped": self.skipped,
+            "write_ms_per_batch": round(self.write_seconds * 1000 / max(self.batches, 1), 3),
+            "pending": len(self.pending),
+            "dropped": self.dropped,
+        }
+
+recorder = TickRecorder()
+
+# Reader side
+
+def read_day(instrument, day, directory=None):
+    # Memory-mapped records of one day; any record still being written is
+    # left out
+    path = tick_path(instrument, day, directory)
+    if not os.path.exists(path):
+        return np.empty(0, dtype=RECORD_DTYPE)
+    count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+    if not count:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+def read_range(instrument, start, end, directory=None):
+    # Zero-copy views of the ticks with start <= time < end, one per day file
+    # (times are ns since the epoch, datetimes or RFC3339 strings)
+    start, end = _ns(start), _ns(end)
+    views = []
+    day = _day(start)
+    while day <= _day(end - 1):
+        ticks = read_day(instrument, day, directory)
+        if len(ticks):
+            times = ticks["time"]
+            first, last = np.searchsorted(times, [start, end])
+            if last > first:
+                views.append(ticks[first:last])
+        day += datetime.timedelta(days=1)
+    return views
+
+def read_ticks(instrument, start, end, directory=None):
+    # Like read_range as a single array; only copies when the range spans days
+    views = read_range(instrument, start, end, directory)
+    if len(views) == 1:
+        return views[0]
+    return np.concatenate(views) if views else np.empty(0, dtype=RECORD_DTYPE)